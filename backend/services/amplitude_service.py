@@ -1,19 +1,41 @@
 # amplitude_service.py
 
+import logging
 import os
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import zipfile
 import io
 import gzip
-import json
-from typing import Optional
+import shutil
+import tempfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, Optional
+
+from json_encoder import fast_loads_lines
+
+logger = logging.getLogger(__name__)
+
+# Exports larger than this spill from memory to a temporary file on disk.
+SPOOL_MAX_BYTES = 64 << 20
+DOWNLOAD_CHUNK_BYTES = 1 << 20
+GZIP_READ_BUFFER_BYTES = 128 * 1024
+# Approximate number of bytes of JSON lines handed to the decoder per batch.
+PARSE_BATCH_BYTES = 4 << 20
+MAX_DECODE_WORKERS = min(8, os.cpu_count() or 1)
+# (connect, read) timeouts in seconds; exports can take minutes to stream.
+REQUEST_TIMEOUT = (10, 300)
 
 class AmplitudeService:
     """
     A service to connect to the Amplitude API and fetch event data.
     """
     API_URL = "https://amplitude.com/api/2/export"
-
+    # Export windows cover whole days: from hour 00 of the start date through hour 23 of the end date.
+    START_HOUR_SUFFIX = "T00"
+    END_HOUR_SUFFIX = "T23"
 
     def __init__(self, api_key: Optional[str] = None, secret_key: Optional[str] = None):
         """
@@ -30,81 +52,143 @@ class AmplitudeService:
                 "AMPLITUDE_API_KEY and AMPLITUDE_SECRET_KEY environment variables must be set."
             )
 
-    def export_events(self, start_date: str, end_date: str) -> list[dict]:
-        """
-        Fetches event data from Amplitude for a given date range.
+        self._auth = (self.api_key, self.secret_key)
 
-        Args:
-            start_date: The start date in 'YYYYMMDD' format (e.g., '20240101').
-            end_date: The end date in 'YYYYMMDD' format (e.g., '20240131').
+        # Reused across exports so repeated calls share pooled TCP/TLS connections.
+        self._session = requests.Session()
+        self._session.mount(
+            "https://",
+            HTTPAdapter(
+                pool_connections=4,
+                pool_maxsize=16,
+                max_retries=Retry(
+                    total=3,
+                    backoff_factor=0.5,
+                    status_forcelist=[429, 500, 502, 503, 504],
+                ),
+            ),
+        )
+        self._session.headers.update({"Accept-Encoding": "gzip"})
 
-        Returns:
-            A list of event data dictionaries.
+    def _open_export_archive(self, start_date: str, end_date: str):
+        """
+        Requests an export and spools the zip payload to a temporary file so the
+        archive is never held in memory as a single bytes object.
         """
-        print(f"Requesting data export from {start_date} to {end_date}...")
-
-        # The API expects dates in YYYYMMDDTHH format, we'll use midnight.
         params = {
-            "start": f"{start_date}T00",
-            "end": f"{end_date}T23",
+            "start": start_date + self.START_HOUR_SUFFIX,
+            "end": end_date + self.END_HOUR_SUFFIX,
         }
-
+        response = self._session.get(
+            self.API_URL,
+            params=params,
+            auth=self._auth,
+            stream=True,
+            timeout=REQUEST_TIMEOUT,
+        )
         try:
-            response = requests.get(
-                self.API_URL,
-                params=params,
-                auth=(self.api_key, self.secret_key),
-                stream=True
-            )
             response.raise_for_status()  # Raises an HTTPError for bad responses (4xx or 5xx)
+        except requests.exceptions.HTTPError as http_err:
+            logger.error("HTTP error occurred: %s", http_err)
+            logger.error("Response content: %s", response.text)
+            raise
 
-            print("Export successful. Unzipping and processing data...")
+        spooled = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+        try:
+            # Copy straight from the socket stream; decode_content undoes any
+            # transfer-level gzip the server applied on top of the zip payload.
+            response.raw.decode_content = True
+            shutil.copyfileobj(response.raw, spooled, DOWNLOAD_CHUNK_BYTES)
+            spooled.seek(0)
+        except Exception:
+            spooled.close()
+            raise
+        finally:
+            response.close()
+        return spooled
 
-            # The data is returned as a zip archive in memory
-            with zipfile.ZipFile(io.BytesIO(response.content)) as z:
-                # The archive contains one or more gzipped JSON line files.
-                # We can process them more concisely with a list comprehension.
-                all_events = [json.loads(line) for filename in z.namelist() for line in gzip.open(z.open(filename), 'rt')]
-            
-            print(f"Successfully processed {len(all_events)} events.")
-            return all_events
+    @staticmethod
+    def _iter_member_events(archive: zipfile.ZipFile, filename: str) -> Iterator[dict]:
+        """Yields parsed events from one gzipped JSON-lines member of the archive."""
+        with archive.open(filename) as raw:
+            with io.BufferedReader(gzip.GzipFile(fileobj=raw), buffer_size=GZIP_READ_BUFFER_BYTES) as fh:
+                while True:
+                    lines = fh.readlines(PARSE_BATCH_BYTES)
+                    if not lines:
+                        break
+                    yield from fast_loads_lines(lines)
 
-        except requests.exceptions.HTTPError as http_err:
-            print(f"HTTP error occurred: {http_err}")
-            print(f"Response content: {response.text}")
+    @classmethod
+    def _decode_member(cls, archive: zipfile.ZipFile, filename: str) -> list[dict]:
+        return list(cls._iter_member_events(archive, filename))
+
+    @classmethod
+    def _iter_archive_events(cls, spooled) -> Iterator[dict]:
+        """
+        Yields parsed events from every gzipped JSON-lines member of the archive.
+        Members are decompressed on a thread pool (zlib releases the GIL); at most
+        one member per worker is held decoded in memory at a time, and events are
+        yielded in archive order.
+        """
+        with zipfile.ZipFile(spooled) as archive:
+            filenames = archive.namelist()
+            max_workers = min(MAX_DECODE_WORKERS, len(filenames))
+            if max_workers <= 1:
+                for filename in filenames:
+                    yield from cls._iter_member_events(archive, filename)
+                return
+
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                pending = deque()
+                for filename in filenames:
+                    pending.append(executor.submit(cls._decode_member, archive, filename))
+                    if len(pending) >= max_workers:
+                        yield from pending.popleft().result()
+                while pending:
+                    yield from pending.popleft().result()
+
+    def export_events(self, start_date: str, end_date: str) -> Iterator[dict]:
+        """
+        Streams event data from Amplitude for a given date range.
+
+        Args:
+            start_date: The start date in 'YYYYMMDD' format (e.g., '20240101').
+            end_date: The end date in 'YYYYMMDD' format (e.g., '20240131').
+
+        Yields:
+            Event data dictionaries, parsed lazily from the export archive.
+        """
+        logger.info("Requesting data export from %s to %s...", start_date, end_date)
+
+        try:
+            spooled = self._open_export_archive(start_date, end_date)
+        except requests.exceptions.HTTPError:
             raise
         except Exception as err:
-            print(f"An other error occurred: {err}")
+            logger.error("An other error occurred: %s", err)
             raise
 
+        logger.info("Export successful. Unzipping and processing data...")
+        event_count = 0
+        with spooled:
+            for event in self._iter_archive_events(spooled):
+                event_count += 1
+                yield event
+        logger.info("Successfully processed %d events.", event_count)
+
     def iter_export_event_pages(self, start_date: str, end_date: str, page_size: int = 1000):
         """
         Streams Amplitude export data and yields bounded pages without materializing
         the full payload in memory first.
         """
-        print(f"Streaming data export from {start_date} to {end_date} in pages of {page_size}...")
-        params = {
-            "start": f"{start_date}T00",
-            "end": f"{end_date}T23",
-        }
-        response = requests.get(
-            self.API_URL,
-            params=params,
-            auth=(self.api_key, self.secret_key),
-            stream=True,
-        )
-        response.raise_for_status()
-
+        logger.info("Streaming data export from %s to %s in pages of %s...", start_date, end_date, page_size)
+        page_size = max(1, int(page_size))
         page = []
-        with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
-            for filename in archive.namelist():
-                with gzip.open(archive.open(filename), "rt") as fh:
-                    for line in fh:
-                        if not line.strip():
-                            continue
-                        page.append(json.loads(line))
-                        if len(page) >= max(1, int(page_size)):
-                            yield page
-                            page = []
+        with self._open_export_archive(start_date, end_date) as spooled:
+            for event in self._iter_archive_events(spooled):
+                page.append(event)
+                if len(page) >= page_size:
+                    yield page
+                    page = []
         if page:
             yield page
@@ -1,3 +1,11 @@
-from .main import app, create_app
-
 __all__ = ["app", "create_app"]
+
+
+def __getattr__(name):
+    # Resolved on first access so importing a submodule (e.g. app.core.runtime from
+    # gemini_client) does not pull in the whole FastAPI app and its routers.
+    if name in __all__:
+        from . import main
+
+        return getattr(main, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -7,6 +7,8 @@ from app.application.connectors import ConnectorService
 from app.core.deps import get_connector_service
 
 
+# Every route here declares a response_model, so the default response class is kept
+# and FastAPI serializes responses straight to bytes through Pydantic (see FastJSONResponse).
 router = APIRouter(prefix="/connectors", tags=["connectors"])
 
 
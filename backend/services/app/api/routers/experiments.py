@@ -5,9 +5,10 @@ from fastapi import APIRouter, Depends
 from app.api.schemas.experiments import ExperimentConfigRequest
 from app.application.experiments import ExperimentConfigService
 from app.core.deps import get_experiment_service
+from app.core.responses import FastJSONResponse
 
 
-router = APIRouter(prefix="/experiments", tags=["experiments"])
+router = APIRouter(prefix="/experiments", tags=["experiments"], default_response_class=FastJSONResponse)
 
 
 @router.get("/config")
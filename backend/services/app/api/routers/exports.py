@@ -6,14 +6,16 @@ from app.api.schemas.exports import ExportJobCreateRequest
 from app.api.schemas.jobs import build_job_response
 from app.application.exports import ExportService
 from app.core.deps import get_export_service
+from app.core.responses import FastJSONResponse, stream_json_list
+from app.core.runtime import run_in_job_executor
 
 
-router = APIRouter(prefix="/exports", tags=["exports"])
+router = APIRouter(prefix="/exports", tags=["exports"], default_response_class=FastJSONResponse)
 
 
 @router.get("")
 def list_export_jobs(service: ExportService = Depends(get_export_service)):
-    return {"items": [build_job_response(job, base_path="/api/v1/exports") for job in service.list_jobs()]}
+    return stream_json_list(build_job_response(job, base_path="/api/v1/exports") for job in service.list_jobs())
 
 
 @router.post("", status_code=status.HTTP_201_CREATED)
@@ -34,7 +36,11 @@ def get_export_job(job_id: str, service: ExportService = Depends(get_export_serv
 
 
 @router.post("/{job_id}/run")
-def run_export_job(job_id: str, service: ExportService = Depends(get_export_service)):
+async def run_export_job(job_id: str, service: ExportService = Depends(get_export_service)):
+    return await run_in_job_executor(_run_export_job, job_id, service)
+
+
+def _run_export_job(job_id: str, service: ExportService):
     try:
         job = service.run_job(job_id)
     except KeyError:
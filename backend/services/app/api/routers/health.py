@@ -2,11 +2,12 @@ from __future__ import annotations
 
 from fastapi import APIRouter
 
+from app.core.responses import FastJSONResponse
 from app.core.settings import get_settings
 from bigquery_service import get_shared_bigquery_service
 
 
-router = APIRouter(tags=["health"])
+router = APIRouter(tags=["health"], default_response_class=FastJSONResponse)
 
 
 @router.get("/health")
@@ -7,6 +7,8 @@ from pydantic import BaseModel
 from app.api.schemas.jobs import build_job_response
 from app.application.imports import ImportService
 from app.core.deps import get_import_service
+from app.core.responses import FastJSONResponse, stream_json_list
+from app.core.runtime import run_in_job_executor
 
 
 class ImportJobCreateRequest(BaseModel):
@@ -16,20 +18,20 @@ class ImportJobCreateRequest(BaseModel):
     page_size: int | None = None
 
 
-router = APIRouter(prefix="/imports", tags=["imports"])
+router = APIRouter(prefix="/imports", tags=["imports"], default_response_class=FastJSONResponse)
 
 
 @router.get("")
 def list_imports(service: ImportService = Depends(get_import_service)):
-    jobs = [
+    jobs = (
         build_job_response(
             job,
             base_path="/api/v1/imports",
             extra_links={"checkpoints": f"/api/v1/imports/{job['id']}/checkpoints"},
         )
         for job in service.list_jobs()
-    ]
-    return {"items": jobs}
+    )
+    return stream_json_list(jobs)
 
 
 @router.post("", status_code=status.HTTP_201_CREATED)
@@ -50,7 +52,11 @@ def get_import(job_id: str, service: ImportService = Depends(get_import_service)
 
 
 @router.post("/{job_id}/run")
-def run_import(job_id: str, service: ImportService = Depends(get_import_service)):
+async def run_import(job_id: str, service: ImportService = Depends(get_import_service)):
+    return await run_in_job_executor(_run_import, job_id, service)
+
+
+def _run_import(job_id: str, service: ImportService):
     try:
         job = service.run_job(job_id)
     except KeyError:
@@ -7,23 +7,23 @@ from app.api.schemas.jobs import build_job_response
 from app.api.schemas.predictions import PredictionJobCreateRequest, PredictionResultsPage
 from app.application.predictions import PredictionService
 from app.core.deps import get_prediction_service, get_settings_dependency
+from app.core.responses import FastJSONResponse, stream_json_list
+from app.core.runtime import run_in_job_executor
 
 
-router = APIRouter(prefix="/predictions", tags=["predictions"])
+router = APIRouter(prefix="/predictions", tags=["predictions"], default_response_class=FastJSONResponse)
 
 
 @router.get("")
 def list_prediction_jobs(service: PredictionService = Depends(get_prediction_service)):
-    return {
-        "items": [
-            build_job_response(
-                job,
-                base_path="/api/v1/predictions",
-                extra_links={"results": f"/api/v1/predictions/{job['id']}/results"},
-            )
-            for job in service.list_jobs()
-        ]
-    }
+    return stream_json_list(
+        build_job_response(
+            job,
+            base_path="/api/v1/predictions",
+            extra_links={"results": f"/api/v1/predictions/{job['id']}/results"},
+        )
+        for job in service.list_jobs()
+    )
 
 
 @router.post("", status_code=status.HTTP_201_CREATED)
@@ -44,7 +44,11 @@ def get_prediction_job(job_id: str, service: PredictionService = Depends(get_pre
 
 
 @router.post("/{job_id}/run")
-def run_prediction_job(job_id: str, service: PredictionService = Depends(get_prediction_service)):
+async def run_prediction_job(job_id: str, service: PredictionService = Depends(get_prediction_service)):
+    return await run_in_job_executor(_run_prediction_job, job_id, service)
+
+
+def _run_prediction_job(job_id: str, service: PredictionService):
     try:
         job = service.run_job(job_id)
     except KeyError:
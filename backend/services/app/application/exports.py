@@ -116,10 +116,7 @@ class ExportService:
         connector_name = "SendGrid" if provider == "sendgrid" else "Braze"
         connector = self.repository.get_connector(connector_name)
         if connector is None:
-            connector = next(
-                (item for item in self.repository.list_connectors() if item.get("type") == provider),
-                None,
-            )
+            connector = next(iter(self.repository.list_connectors(connector_type=provider)), None)
         if connector is None:
             raise ValueError(f"{connector_name} connector is not configured")
 
@@ -5,7 +5,9 @@ import uuid
 from datetime import datetime, timedelta
 from typing import Any, Dict, List
 
-from app.domain.jobs import CheckpointStatus, JobStatus
+from app.application.progress import ProgressThrottle
+from app.core.runtime import is_job_stop_signalled, job_stop_event, release_job_stop_event, signal_job_stop
+from app.domain.jobs import ACTIVE_JOB_STATUSES, TERMINAL_JOB_STATUSES, CheckpointStatus, JobStatus
 from dataflow.pipeline import DataflowNormalizationRunner
 from gcs_service import GcsService
 from ingestion_service import IngestionService
@@ -21,6 +23,7 @@ class ImportService:
         self.repository = repository
         self.settings = settings
         self.bigquery_service = bigquery_service or get_shared_bigquery_service()
+        self._progress_throttle = ProgressThrottle(settings.progress_flush_interval_sec)
 
     def _commit_session(self) -> None:
         session = getattr(self.repository, "session", None)
@@ -44,6 +47,8 @@ class ImportService:
             return None
 
     def _is_stop_requested(self, job_id: str) -> bool:
+        if is_job_stop_signalled(job_id):
+            return True
         job = self.repository.get_import_job(job_id)
         if job is None:
             return False
@@ -84,7 +89,10 @@ class ImportService:
         current_events: int,
         shards_created: int,
         page_size: int,
-    ) -> Dict[str, Any]:
+        final: bool = False,
+    ) -> Dict[str, Any] | None:
+        if not self._progress_throttle.should_flush((job_id, "staging"), final=final):
+            return None
         current_job = self.repository.get_import_job(job_id)
         if current_job is None:
             raise KeyError(job_id)
@@ -122,7 +130,10 @@ class ImportService:
         processed_manifests: int,
         total_manifests: int,
         summary: Dict[str, Any],
-    ) -> Dict[str, Any]:
+    ) -> Dict[str, Any] | None:
+        final = processed_manifests >= total_manifests
+        if not self._progress_throttle.should_flush((job_id, "processing"), final=final):
+            return None
         current_job = self.repository.get_import_job(job_id)
         if current_job is None:
             raise KeyError(job_id)
@@ -158,26 +169,15 @@ class ImportService:
         self._commit_session()
         return updated
 
-    def _parse_timestamp(self, value: Any) -> datetime | None:
-        if not value:
-            return None
-        try:
-            return datetime.fromisoformat(str(value))
-        except ValueError:
-            return None
-
     def cleanup_expired_jobs(self) -> int:
         cutoff = datetime.utcnow() - timedelta(days=max(1, int(self.settings.job_retention_days)))
         removed_count = 0
 
-        for job in self.repository.list_import_jobs():
-            status = str(job.get("status") or "").lower()
-            if status not in {JobStatus.COMPLETED.value, JobStatus.FAILED.value, JobStatus.STOPPED.value}:
-                continue
-            updated_at = self._parse_timestamp(job.get("updated_at"))
-            if updated_at is None or updated_at > cutoff:
-                continue
-
+        expired_jobs = self.repository.list_import_jobs(
+            statuses=TERMINAL_JOB_STATUSES,
+            updated_before=cutoff,
+        )
+        for job in expired_jobs:
             try:
                 self.bigquery_service.delete_data_for_job(job["id"])
                 if self.repository.delete_import_job(job["id"]):
@@ -240,11 +240,7 @@ class ImportService:
 
     def reconcile_jobs_after_restart(self) -> int:
         reconciled_count = 0
-        for job in self.repository.list_import_jobs():
-            status = str(job.get("status") or "").lower()
-            if status not in {JobStatus.QUEUED.value, JobStatus.RUNNING.value, JobStatus.STOPPING.value}:
-                continue
-
+        for job in self.repository.list_import_jobs(statuses=ACTIVE_JOB_STATUSES):
             try:
                 self._discard_job_after_restart(job, "Discarded after server restart before completion.")
             except Exception as exc:
@@ -292,6 +288,7 @@ class ImportService:
             )
             self.repository.record_action("import_job_stop_requested", "import_job", job_id, stopping)
             self._commit_session()
+            signal_job_stop(job_id)
             return stopping
         if status == JobStatus.STOPPING.value:
             return job
@@ -332,6 +329,7 @@ class ImportService:
 
         self.repository.update_import_job(job_id, {"status": JobStatus.RUNNING.value})
         self._commit_session()
+        job_stop_event(job_id)
         try:
             page_size = int(job["spec"].get("page_size") or self.settings.worker_page_size)
             gcs_service = GcsService()
@@ -360,6 +358,15 @@ class ImportService:
             )
             if staged.get("stopped"):
                 return self._mark_stopped(job_id, staged.get("stop_reason") or "Stopped by user.")
+            # Page callbacks are throttled, so record the final staging totals explicitly.
+            self._update_stage_progress(
+                job_id,
+                connector_record,
+                staged["events_staged"],
+                staged["shards_created"],
+                page_size,
+                final=True,
+            )
 
             manifests: List[Dict[str, Any]] = []
             for manifest in staged["shard_manifests"]:
@@ -401,7 +408,11 @@ class ImportService:
             if self._is_stop_requested(job_id):
                 return self._mark_stopped(job_id)
             if self.settings.data_backend_mode == "mock":
-                runner = DataflowNormalizationRunner(gcs_service=gcs_service, bigquery_service=self.bigquery_service)
+                runner = DataflowNormalizationRunner(
+                    gcs_service=gcs_service,
+                    bigquery_service=self.bigquery_service,
+                    should_stop=lambda: self._is_stop_requested(job_id),
+                )
                 processing_stats = runner.process_notifications(
                     manifests,
                     progress_callback=lambda processed_manifests, total_manifests, summary: self._update_processing_progress(
@@ -413,6 +424,8 @@ class ImportService:
                         summary,
                     ),
                 )
+                if processing_stats.get("stopped"):
+                    return self._mark_stopped(job_id)
 
             completed = self.repository.update_import_job(
                 job_id,
@@ -466,3 +479,5 @@ class ImportService:
             except Exception:
                 self.rollback_session()
             raise
+        finally:
+            release_job_stop_event(job_id)
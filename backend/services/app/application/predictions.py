@@ -1,15 +1,28 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 import os
+import threading
 import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from functools import lru_cache
+from itertools import islice
 from typing import Any, Dict, List, Tuple
 
-from app.domain.jobs import JobStatus
-from app.core.runtime import is_shutdown_requested
+from app.application.progress import ProgressThrottle
+from app.domain.jobs import TERMINAL_JOB_STATUSES, JobStatus
+from app.core.runtime import (
+    is_job_stop_signalled,
+    is_shutdown_requested,
+    job_stop_event,
+    release_job_stop_event,
+    signal_job_stop,
+)
 from bigquery_service import BigQueryService, get_shared_bigquery_service
-from cloud_churn_service import CloudChurnService
+from cloud_churn_service import get_shared_cloud_churn_service
 from gemini_client import GeminiClient
 from growth_decision_engine import GrowthDecisionEngine
 from player_modeling_engine import PlayerModelingEngine
@@ -19,11 +32,23 @@ from pubsub_service import PubSubService
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=8)
+def _shared_gemini_client(client_cls, api_key: str, model_name: str | None):
+    # Building a client configures the SDK and the model handle; jobs with the same
+    # credentials reuse one. Construction errors are not cached, so a fix is picked up.
+    return client_cls(api_key=api_key, model_name=model_name)
+
+
 class PredictionService:
     def __init__(self, repository, settings, bigquery_service: BigQueryService | None = None):
         self.repository = repository
         self.settings = settings
         self.bigquery_service = bigquery_service or get_shared_bigquery_service()
+        self._progress_throttle = ProgressThrottle(settings.progress_flush_interval_sec)
+        # One event loop per worker thread, reused across that thread's players.
+        self._estimate_loop = threading.local()
+        self._estimate_runners: List[asyncio.Runner] = []
+        self._estimate_runners_lock = threading.Lock()
 
     def _commit_session(self) -> None:
         session = getattr(self.repository, "session", None)
@@ -47,6 +72,8 @@ class PredictionService:
             return None
 
     def _is_stop_requested(self, job_id: str) -> bool:
+        if is_job_stop_signalled(job_id):
+            return True
         job = self.repository.get_prediction_job(job_id)
         if job is None:
             return False
@@ -130,26 +157,15 @@ class PredictionService:
     def list_results(self, job_id: str, page: int, page_size: int) -> Dict[str, Any]:
         return self.bigquery_service.list_prediction_results(job_id=job_id, page=page, page_size=page_size)
 
-    def _parse_timestamp(self, value: Any) -> datetime | None:
-        if not value:
-            return None
-        try:
-            return datetime.fromisoformat(str(value))
-        except ValueError:
-            return None
-
     def cleanup_expired_jobs(self) -> int:
         cutoff = datetime.utcnow() - timedelta(days=max(1, int(self.settings.job_retention_days)))
         removed_count = 0
 
-        for job in self.repository.list_prediction_jobs():
-            status = str(job.get("status") or "").lower()
-            if status not in {JobStatus.COMPLETED.value, JobStatus.FAILED.value, JobStatus.STOPPED.value}:
-                continue
-            updated_at = self._parse_timestamp(job.get("updated_at"))
-            if updated_at is None or updated_at > cutoff:
-                continue
-
+        expired_jobs = self.repository.list_prediction_jobs(
+            statuses=TERMINAL_JOB_STATUSES,
+            updated_before=cutoff,
+        )
+        for job in expired_jobs:
             try:
                 self.bigquery_service.delete_prediction_results(job["id"])
                 if self.repository.delete_prediction_job(job["id"]):
@@ -196,6 +212,7 @@ class PredictionService:
             )
             self.repository.record_action("prediction_job_stop_requested", "prediction_job", job_id, stopping)
             self._commit_session()
+            signal_job_stop(job_id)
             return stopping
         if status == JobStatus.STOPPING.value:
             return job
@@ -219,19 +236,25 @@ class PredictionService:
         mode = str(job["spec"].get("prediction_mode", "local")).lower()
         self.repository.update_prediction_job(job_id, {"status": JobStatus.RUNNING.value, "error": None})
         self._commit_session()
+        job_stop_event(job_id)
 
         try:
-            gemini_client = self._build_gemini_client()
-            self.bigquery_service.replace_prediction_results(job_id=job_id, rows=[])
-            execution_details = self._prediction_execution_details(mode, gemini_available=gemini_client is not None)
-
-            modeling_engine = PlayerModelingEngine(
-                gemini_client=gemini_client,
-                bigquery_service=self.bigquery_service,
-                job_id=import_job_id,
-            )
-            decision_engine = GrowthDecisionEngine(gemini_client)
-            player_ids = modeling_engine.get_all_player_ids()
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                # Clearing earlier results feeds nothing below, so it overlaps client setup and the player listing.
+                cleared_results = executor.submit(self.bigquery_service.replace_prediction_results, job_id=job_id, rows=[])
+                gemini_client = self._build_gemini_client()
+                execution_details = self._prediction_execution_details(mode, gemini_available=gemini_client is not None)
+
+                modeling_engine = PlayerModelingEngine(
+                    gemini_client=gemini_client,
+                    bigquery_service=self.bigquery_service,
+                    job_id=import_job_id,
+                )
+                decision_engine = GrowthDecisionEngine(gemini_client)
+                player_ids = modeling_engine.get_all_player_ids()
+                bulk_profiles = getattr(modeling_engine, "build_player_profiles_bulk", None)
+                profiles = bulk_profiles(player_ids) if callable(bulk_profiles) else {}
+                cleared_results.result()
             total = len(player_ids)
             rows_written = 0
 
@@ -253,79 +276,104 @@ class PredictionService:
             )
             self._commit_session()
 
-            for index, player_id in enumerate(player_ids, start=1):
-                if self._should_stop(job_id):
-                    return self._mark_stopped(job_id, self._stop_reason())
-
-                profile = modeling_engine.build_player_profile(player_id)
-                if not profile:
-                    self.repository.update_prediction_job(
-                        job_id,
-                        {
-                            "progress": {
-                                "current": index,
-                                "total": total,
-                                "pct": (index / total * 100.0) if total else 100.0,
-                                "details": {
-                                    "rows_written": rows_written,
-                                    "import_job_id": import_job_id,
-                                    "prediction_mode": mode,
-                                    "last_user_id": str(player_id),
-                                    **execution_details,
-                                },
-                            }
-                        },
+            workers = max(1, int(self.settings.prediction_concurrency))
+            executor = ThreadPoolExecutor(max_workers=workers)
+            try:
+                # Player estimates are independent network/IO-bound calls, so a bounded window of
+                # player chunks runs concurrently; results are consumed in order so job state stays
+                # on this thread. With Gemini scoring locally, each chunk is one batched request.
+                def submit(chunk: List[Any]) -> None:
+                    pending.append(
+                        (
+                            chunk,
+                            executor.submit(self._predict_players, mode, modeling_engine, decision_engine, chunk, profiles),
+                        )
                     )
-                    self._commit_session()
-                    continue
-
-                churn_estimate, prediction_source = self._estimate_prediction(mode, modeling_engine, player_id, profile)
-                if self._should_stop(job_id):
-                    return self._mark_stopped(job_id, self._stop_reason())
 
-                next_action = decision_engine.decide_next_action(profile, churn_estimate, "reduce_churn") or {
-                    "content": "No action suggested.",
-                }
-                if self._should_stop(job_id):
-                    return self._mark_stopped(job_id, self._stop_reason())
-
-                row = {
-                    "prediction_job_id": job_id,
-                    "import_job_id": import_job_id,
-                    "completed_at": datetime.utcnow().isoformat(),
-                    "user_id": str(player_id),
-                    "email": profile.get("email"),
-                    "ltv": profile.get("total_revenue", 0.0),
-                    "session_count": profile.get("total_sessions", 0),
-                    "event_count": profile.get("total_events", 0),
-                    "days_since_last_seen": profile.get("days_since_last_seen", 0),
-                    "churn_state": churn_estimate.get("churn_state", profile.get("churn_state", "active")),
-                    "predicted_churn_risk": churn_estimate.get("churn_risk", "unknown"),
-                    "churn_reason": churn_estimate.get("reason", "unknown"),
-                    "top_signals": churn_estimate.get("top_signals", []),
-                    "prediction_source": prediction_source,
-                    "suggested_action": next_action.get("content", "No action suggested."),
-                }
-                self.bigquery_service.append_prediction_results(job_id=job_id, rows=[row])
-                rows_written += 1
-                self.repository.update_prediction_job(
-                    job_id,
-                    {
-                        "progress": {
-                            "current": index,
-                            "total": total,
-                            "pct": (index / total * 100.0) if total else 100.0,
-                            "details": {
-                                "rows_written": rows_written,
-                                "import_job_id": import_job_id,
-                                "prediction_mode": mode,
-                                "last_user_id": str(player_id),
-                                **execution_details,
-                            },
-                        }
-                    },
-                )
-                self._commit_session()
+                # Result rows are buffered and written with each progress flush, so result
+                # storage sees one append per flush interval rather than one per player.
+                buffered_rows: List[Dict[str, Any]] = []
+
+                def flush_rows() -> None:
+                    nonlocal rows_written
+                    if buffered_rows:
+                        self.bigquery_service.append_prediction_results(job_id=job_id, rows=list(buffered_rows))
+                        rows_written += len(buffered_rows)
+                        buffered_rows.clear()
+
+                chunk_size = 1
+                if gemini_client is not None and mode != "cloud":
+                    chunk_size = max(1, int(getattr(modeling_engine, "churn_batch_size", 1)))
+                player_iter = iter(player_ids)
+                chunks = iter(lambda: list(islice(player_iter, chunk_size)), [])
+                pending = deque()
+                for chunk in islice(chunks, workers):
+                    submit(chunk)
+                index = 0
+                # Rows already computed are persisted even when a later chunk fails, as
+                # progress.current may already count them.
+                try:
+                    while pending:
+                        chunk, future = pending.popleft()
+                        if self._should_stop(job_id):
+                            flush_rows()
+                            return self._mark_stopped(job_id, self._stop_reason())
+                        predictions = future.result()
+                        if self._should_stop(job_id):
+                            flush_rows()
+                            return self._mark_stopped(job_id, self._stop_reason())
+                        for next_chunk in islice(chunks, 1):
+                            submit(next_chunk)
+
+                        for player_id, prediction in zip(chunk, predictions):
+                            index += 1
+
+                            if prediction is not None:
+                                profile, churn_estimate, prediction_source, next_action = prediction
+                                row = {
+                                    "prediction_job_id": job_id,
+                                    "import_job_id": import_job_id,
+                                    "completed_at": datetime.utcnow().isoformat(),
+                                    "user_id": str(player_id),
+                                    "email": profile.get("email"),
+                                    "ltv": profile.get("total_revenue", 0.0),
+                                    "session_count": profile.get("total_sessions", 0),
+                                    "event_count": profile.get("total_events", 0),
+                                    "days_since_last_seen": profile.get("days_since_last_seen", 0),
+                                    "churn_state": churn_estimate.get("churn_state", profile.get("churn_state", "active")),
+                                    "predicted_churn_risk": churn_estimate.get("churn_risk", "unknown"),
+                                    "churn_reason": churn_estimate.get("reason", "unknown"),
+                                    "top_signals": churn_estimate.get("top_signals", []),
+                                    "prediction_source": prediction_source,
+                                    "suggested_action": next_action.get("content", "No action suggested."),
+                                }
+                                buffered_rows.append(row)
+                            if self._progress_throttle.should_flush(job_id, final=index == total):
+                                flush_rows()
+                                self.repository.update_prediction_job(
+                                    job_id,
+                                    {
+                                        "progress": {
+                                            "current": index,
+                                            "total": total,
+                                            "pct": (index / total * 100.0) if total else 100.0,
+                                            "details": {
+                                                "rows_written": rows_written,
+                                                "import_job_id": import_job_id,
+                                                "prediction_mode": mode,
+                                                "last_user_id": str(player_id),
+                                                **execution_details,
+                                            },
+                                        }
+                                    },
+                                )
+                                self._commit_session()
+                except Exception:
+                    flush_rows()
+                    raise
+            finally:
+                executor.shutdown(wait=True, cancel_futures=True)
+                self._close_estimate_runners()
 
             completed = self.repository.update_prediction_job(
                 job_id,
@@ -378,6 +426,8 @@ class PredictionService:
                 self.rollback_session()
                 logger.exception("Unable to mark prediction job %s failed.", job_id)
             raise
+        finally:
+            release_job_stop_event(job_id)
 
     def _has_configured_gemini(self) -> bool:
         if self._select_google_connector() is not None:
@@ -405,21 +455,23 @@ class PredictionService:
             model_name = str(config.get("model_name") or "").strip() or None
             if api_key:
                 try:
-                    return GeminiClient(api_key=api_key, model_name=model_name)
+                    return _shared_gemini_client(GeminiClient, api_key, model_name)
                 except Exception:
                     return None
 
+        api_key = (os.getenv("GOOGLE_API_KEY") or "").strip()
+        if not api_key:
+            return None
         try:
-            return GeminiClient()
+            return _shared_gemini_client(GeminiClient, api_key, None)
         except Exception:
             return None
 
     def _select_google_connector(self) -> Dict[str, Any] | None:
         google_connectors = [
             connector
-            for connector in self.repository.list_connectors()
-            if str(connector.get("type") or "").lower() == "google"
-            and str((connector.get("config") or {}).get("api_key") or "").strip()
+            for connector in self.repository.list_connectors(connector_type="google")
+            if str((connector.get("config") or {}).get("api_key") or "").strip()
         ]
         if not google_connectors:
             return None
@@ -436,22 +488,85 @@ class PredictionService:
                 continue
         return datetime.min
 
+    def _predict_player(
+        self,
+        mode: str,
+        modeling_engine: PlayerModelingEngine,
+        decision_engine: GrowthDecisionEngine,
+        player_id: Any,
+        profile: Dict[str, Any] | None = None,
+    ) -> Tuple[Dict[str, Any], Dict[str, Any], str, Dict[str, Any]] | None:
+        profile = profile or modeling_engine.build_player_profile(player_id)
+        if not profile:
+            return None
+        churn_estimate, prediction_source = self._estimate_prediction(mode, modeling_engine, player_id, profile)
+        if is_shutdown_requested():
+            raise RuntimeError("Prediction interrupted by server shutdown.")
+        next_action = decision_engine.decide_next_action(profile, churn_estimate, "reduce_churn") or {
+            "content": "No action suggested.",
+        }
+        return profile, churn_estimate, prediction_source, next_action
+
+    def _predict_players(
+        self,
+        mode: str,
+        modeling_engine: PlayerModelingEngine,
+        decision_engine: GrowthDecisionEngine,
+        player_ids: List[Any],
+        profiles: Dict[str, Dict[str, Any]],
+    ) -> List[Tuple[Dict[str, Any], Dict[str, Any], str, Dict[str, Any]] | None]:
+        if len(player_ids) == 1:
+            return [self._predict_player(mode, modeling_engine, decision_engine, player_ids[0], profiles.get(str(player_ids[0])))]
+
+        players = [
+            (player_id, profiles.get(str(player_id)) or modeling_engine.build_player_profile(player_id))
+            for player_id in player_ids
+        ]
+        local_estimates: List[Dict[str, Any] | None] = [None] * len(players)
+        if mode in {"local", "parallel"}:
+            if is_shutdown_requested():
+                raise RuntimeError("Prediction interrupted by server shutdown.")
+            local_estimates = modeling_engine.estimate_churn_risk_batch(players)
+
+        scored = []
+        for (player_id, profile), local_estimate in zip(players, local_estimates):
+            if not profile:
+                continue
+            churn_estimate, prediction_source = self._estimate_prediction(
+                mode, modeling_engine, player_id, profile, local_estimate=local_estimate
+            )
+            scored.append((player_id, profile, churn_estimate, prediction_source))
+        if is_shutdown_requested():
+            raise RuntimeError("Prediction interrupted by server shutdown.")
+
+        next_actions = iter(
+            decision_engine.decide_next_actions_batch(
+                [(profile, churn_estimate) for _, profile, churn_estimate, _ in scored],
+                objective="reduce_churn",
+            )
+        )
+        predictions = {}
+        for player_id, profile, churn_estimate, prediction_source in scored:
+            next_action = next(next_actions) or {"content": "No action suggested."}
+            predictions[str(player_id)] = (profile, churn_estimate, prediction_source, next_action)
+        return [predictions.get(str(player_id)) for player_id in player_ids]
+
     def _estimate_prediction(
         self,
         mode: str,
         modeling_engine: PlayerModelingEngine,
         player_id: Any,
         profile: Dict[str, Any],
+        local_estimate: Dict[str, Any] | None = None,
     ) -> Tuple[Dict[str, Any], str]:
-        local_estimate = None
-        if mode in {"local", "parallel"}:
+        if mode in {"local", "parallel"} and local_estimate is None:
             local_estimate = self._run_local_estimate(modeling_engine, player_id, profile)
         if mode == "local":
             return local_estimate, "local"
         cloud_estimate = None
         if mode in {"cloud", "parallel"}:
             try:
-                cloud_estimate = CloudChurnService().estimate_churn_risk(player_id, profile)
+                cloud_estimate = get_shared_cloud_churn_service().estimate_churn_risk(player_id, profile)
             except Exception:
                 cloud_estimate = None
         if mode == "cloud" and cloud_estimate:
@@ -461,8 +576,22 @@ class PredictionService:
         return local_estimate or self._run_local_estimate(modeling_engine, player_id, profile), "local"
 
     def _run_local_estimate(self, modeling_engine: PlayerModelingEngine, player_id: Any, profile: Dict[str, Any]) -> Dict[str, Any]:
-        import asyncio
+        return self._run_estimate(modeling_engine.estimate_churn_risk(player_id, profile))
 
+    def _run_estimate(self, coroutine: Any) -> Any:
         if is_shutdown_requested():
+            coroutine.close()
             raise RuntimeError("Prediction interrupted by server shutdown.")
-        return asyncio.run(modeling_engine.estimate_churn_risk(player_id, profile))
+        runner = getattr(self._estimate_loop, "runner", None)
+        if runner is None:
+            runner = asyncio.Runner()
+            self._estimate_loop.runner = runner
+            with self._estimate_runners_lock:
+                self._estimate_runners.append(runner)
+        return runner.run(coroutine)
+
+    def _close_estimate_runners(self) -> None:
+        with self._estimate_runners_lock:
+            runners, self._estimate_runners = self._estimate_runners, []
+        for runner in runners:
+            runner.close()
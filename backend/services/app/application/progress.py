@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+import time
+from typing import Dict, Hashable
+
+
+class ProgressThrottle:
+    """
+    Rate-limits intermediate job progress writes. The first update for a key and
+    any final update are always written; the rest at most once per interval.
+    """
+
+    def __init__(self, interval_sec: float):
+        self.interval_sec = max(0.0, float(interval_sec))
+        self._last_flush: Dict[Hashable, float] = {}
+
+    def should_flush(self, key: Hashable, final: bool = False) -> bool:
+        now = time.monotonic()
+        last = self._last_flush.get(key)
+        if final or last is None or now - last >= self.interval_sec:
+            self._last_flush[key] = now
+            return True
+        return False
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import gzip
+import os
+import threading
+from pathlib import Path
+from typing import Tuple
+
+from fastapi import Request, Response
+
+
+class FrontendShell:
+    """
+    Serves the single-page frontend from memory with a precompressed gzip copy.
+
+    The page is revalidated on every load (Cache-Control: no-cache) so UI updates
+    show up immediately, but an unchanged page costs a 304 instead of a full
+    transfer. The cached copy is refreshed whenever the file's mtime or size changes.
+    """
+
+    def __init__(self, index_path: Path):
+        self.index_path = index_path
+        self._lock = threading.Lock()
+        self._stamp: Tuple[int, int] | None = None
+        self._body = b""
+        self._gzipped = b""
+        self._etag = ""
+
+    def _load(self) -> Tuple[bytes, bytes, str]:
+        stat = os.stat(self.index_path)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            if stamp != self._stamp:
+                body = self.index_path.read_bytes()
+                self._body = body
+                self._gzipped = gzip.compress(body, compresslevel=9)
+                self._etag = f'"{stamp[0]:x}-{stamp[1]:x}"'
+                self._stamp = stamp
+            return self._body, self._gzipped, self._etag
+
+    def response(self, request: Request) -> Response:
+        body, gzipped, etag = self._load()
+        headers = {"Cache-Control": "no-cache", "ETag": etag, "Vary": "Accept-Encoding"}
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers=headers)
+        if "gzip" in request.headers.get("accept-encoding", ""):
+            headers["Content-Encoding"] = "gzip"
+            return Response(gzipped, media_type="text/html", headers=headers)
+        return Response(body, media_type="text/html", headers=headers)
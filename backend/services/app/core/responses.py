@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from itertools import islice
+from typing import Any, Iterable, Iterator
+
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; Starlette's encoder is used instead.
+    orjson = None
+
+# Items serialized per streamed chunk; Starlette pulls each chunk of a sync iterator on a worker thread.
+STREAM_CHUNK_ITEMS = 256
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse rendered with orjson when it is installed.
+
+    Used as the default response class of routers that mostly return plain
+    dicts. Routers whose routes all declare a response_model keep the default
+    response class, since FastAPI then serializes them straight to bytes
+    through Pydantic.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return super().render(content)
+        try:
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+        except TypeError:
+            # e.g. integers wider than 64 bits, which the stdlib encoder accepts.
+            return super().render(content)
+
+
+def _iter_json_list_chunks(key: str, items: Iterable[BaseModel]) -> Iterator[bytes]:
+    yield b'{"' + key.encode("utf-8") + b'":['
+    item_iter = iter(items)
+    separator = b""
+    while True:
+        chunk = list(islice(item_iter, STREAM_CHUNK_ITEMS))
+        if not chunk:
+            break
+        yield separator + b",".join(item.model_dump_json().encode("utf-8") for item in chunk)
+        separator = b","
+    yield b"]}"
+
+
+def stream_json_list(items: Iterable[BaseModel], key: str = "items") -> StreamingResponse:
+    """
+    Streams {key: [...]} for a list of models, encoding them in chunks so large
+    listings are never held in memory as one serialized body.
+    """
+    return StreamingResponse(_iter_json_list_chunks(key, items), media_type="application/json")
@@ -1,9 +1,21 @@
 from __future__ import annotations
 
+import asyncio
 import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, TypeVar
+
+from app.core.settings import get_settings
+
+
+T = TypeVar("T")
 
 
 _shutdown_requested = threading.Event()
+_job_stop_events: Dict[str, threading.Event] = {}
+_job_stop_events_lock = threading.Lock()
+_job_executor: ThreadPoolExecutor | None = None
+_job_executor_lock = threading.Lock()
 
 
 def clear_shutdown_requested() -> None:
@@ -16,3 +28,53 @@ def mark_shutdown_requested() -> None:
 
 def is_shutdown_requested() -> bool:
     return _shutdown_requested.is_set()
+
+
+def job_stop_event(job_id: str) -> threading.Event:
+    """
+    Returns the in-process stop signal for a running job, creating it on first use.
+    Job loops check it between batches; the job's status row stays the source of
+    truth for stops requested from other processes.
+    """
+    with _job_stop_events_lock:
+        event = _job_stop_events.get(job_id)
+        if event is None:
+            event = _job_stop_events[job_id] = threading.Event()
+        return event
+
+
+def is_job_stop_signalled(job_id: str) -> bool:
+    with _job_stop_events_lock:
+        event = _job_stop_events.get(job_id)
+    return event is not None and event.is_set()
+
+
+def signal_job_stop(job_id: str) -> None:
+    with _job_stop_events_lock:
+        event = _job_stop_events.get(job_id)
+    if event is not None:
+        event.set()
+
+
+def release_job_stop_event(job_id: str) -> None:
+    with _job_stop_events_lock:
+        _job_stop_events.pop(job_id, None)
+
+
+def get_job_executor() -> ThreadPoolExecutor:
+    """
+    Returns the pool that runs import, prediction and export jobs. Jobs run for
+    minutes, so they get their own threads instead of holding request threads.
+    """
+    global _job_executor
+    with _job_executor_lock:
+        if _job_executor is None:
+            _job_executor = ThreadPoolExecutor(
+                max_workers=get_settings().job_run_thread_limit,
+                thread_name_prefix="job-run",
+            )
+        return _job_executor
+
+
+async def run_in_job_executor(func: Callable[..., T], *args: Any) -> T:
+    return await asyncio.wrap_future(get_job_executor().submit(func, *args))
@@ -2,6 +2,8 @@ from __future__ import annotations
 
 import os
 from dataclasses import dataclass
+from functools import lru_cache
+from typing import Tuple
 
 from runtime_paths import default_control_plane_database_url, normalize_sqlite_database_url
 
@@ -22,25 +24,63 @@ class Settings:
     export_batch_size: int = 500
     export_retry_attempts: int = 3
     job_retention_days: int = 7
+    request_thread_limit: int = 40
+    progress_flush_interval_sec: float = 1.0
+    prediction_concurrency: int = 8
+    job_run_thread_limit: int = 8
+
+
+_SETTINGS_ENV_KEYS = (
+    "CONTROL_PLANE_DATABASE_URL",
+    "DATABASE_URL",
+    "DATA_BACKEND_MODE",
+    "IMPORT_COMMAND_TOPIC",
+    "PREDICTION_COMMAND_TOPIC",
+    "EXPORT_COMMAND_TOPIC",
+    "PUBSUB_TOPIC_NAME",
+    "DEFAULT_PREDICTION_PAGE_SIZE",
+    "MAX_PREDICTION_PAGE_SIZE",
+    "WORKER_PAGE_SIZE",
+    "EXPORT_BATCH_SIZE",
+    "EXPORT_RETRY_ATTEMPTS",
+    "JOB_RETENTION_DAYS",
+    "JOB_PROGRESS_FLUSH_INTERVAL_SEC",
+    "API_REQUEST_THREAD_LIMIT",
+    "PREDICTION_CONCURRENCY",
+    "JOB_RUN_THREAD_LIMIT",
+)
 
 
 def get_settings() -> Settings:
+    # Settings are rebuilt per request; key the build on one snapshot of the
+    # relevant variables so URL normalization only reruns when they change.
+    env = os.environ
+    return _build_settings(tuple(env.get(key) for key in _SETTINGS_ENV_KEYS))
+
+
+@lru_cache(maxsize=8)
+def _build_settings(values: Tuple[str | None, ...]) -> Settings:
+    env = {key: value for key, value in zip(_SETTINGS_ENV_KEYS, values) if value is not None}
     database_url = normalize_sqlite_database_url(
-        os.getenv("CONTROL_PLANE_DATABASE_URL")
-        or os.getenv("DATABASE_URL")
+        env.get("CONTROL_PLANE_DATABASE_URL")
+        or env.get("DATABASE_URL")
         or default_control_plane_database_url()
     )
     return Settings(
         control_plane_database_url=database_url,
-        data_backend_mode=os.getenv("DATA_BACKEND_MODE", "mock").strip().lower(),
-        import_command_topic=os.getenv("IMPORT_COMMAND_TOPIC", "kairyx-import-jobs"),
-        prediction_command_topic=os.getenv("PREDICTION_COMMAND_TOPIC", "kairyx-prediction-jobs"),
-        export_command_topic=os.getenv("EXPORT_COMMAND_TOPIC", "kairyx-export-jobs"),
-        raw_shard_topic=os.getenv("PUBSUB_TOPIC_NAME", "kairyx-raw-shards"),
-        default_prediction_page_size=max(1, int(os.getenv("DEFAULT_PREDICTION_PAGE_SIZE", "100"))),
-        max_prediction_page_size=max(1, int(os.getenv("MAX_PREDICTION_PAGE_SIZE", "1000"))),
-        worker_page_size=max(1, int(os.getenv("WORKER_PAGE_SIZE", "1000"))),
-        export_batch_size=max(1, int(os.getenv("EXPORT_BATCH_SIZE", "500"))),
-        export_retry_attempts=max(1, int(os.getenv("EXPORT_RETRY_ATTEMPTS", "3"))),
-        job_retention_days=max(1, int(os.getenv("JOB_RETENTION_DAYS", "7"))),
+        data_backend_mode=env.get("DATA_BACKEND_MODE", "mock").strip().lower(),
+        import_command_topic=env.get("IMPORT_COMMAND_TOPIC", "kairyx-import-jobs"),
+        prediction_command_topic=env.get("PREDICTION_COMMAND_TOPIC", "kairyx-prediction-jobs"),
+        export_command_topic=env.get("EXPORT_COMMAND_TOPIC", "kairyx-export-jobs"),
+        raw_shard_topic=env.get("PUBSUB_TOPIC_NAME", "kairyx-raw-shards"),
+        default_prediction_page_size=max(1, int(env.get("DEFAULT_PREDICTION_PAGE_SIZE", "100"))),
+        max_prediction_page_size=max(1, int(env.get("MAX_PREDICTION_PAGE_SIZE", "1000"))),
+        worker_page_size=max(1, int(env.get("WORKER_PAGE_SIZE", "1000"))),
+        export_batch_size=max(1, int(env.get("EXPORT_BATCH_SIZE", "500"))),
+        export_retry_attempts=max(1, int(env.get("EXPORT_RETRY_ATTEMPTS", "3"))),
+        job_retention_days=max(1, int(env.get("JOB_RETENTION_DAYS", "7"))),
+        progress_flush_interval_sec=max(0.0, float(env.get("JOB_PROGRESS_FLUSH_INTERVAL_SEC", "1.0"))),
+        request_thread_limit=max(1, int(env.get("API_REQUEST_THREAD_LIMIT", "40"))),
+        prediction_concurrency=max(1, int(env.get("PREDICTION_CONCURRENCY", "8"))),
+        job_run_thread_limit=max(1, int(env.get("JOB_RUN_THREAD_LIMIT", "8"))),
     )
@@ -18,6 +18,10 @@ class JobStatus(str, Enum):
     FAILED = "failed"
 
 
+ACTIVE_JOB_STATUSES = (JobStatus.QUEUED.value, JobStatus.RUNNING.value, JobStatus.STOPPING.value)
+TERMINAL_JOB_STATUSES = (JobStatus.COMPLETED.value, JobStatus.FAILED.value, JobStatus.STOPPED.value)
+
+
 class CheckpointStatus(str, Enum):
     STAGED = "staged"
     PUBLISHED = "published"
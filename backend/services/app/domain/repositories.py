@@ -1,10 +1,11 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional, Protocol
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Protocol
 
 
 class ConnectorConfigRepository(Protocol):
-    def list_connectors(self) -> List[Dict[str, Any]]:
+    def list_connectors(self, connector_type: Optional[str] = None) -> List[Dict[str, Any]]:
         ...
 
     def get_connector(self, name: str) -> Optional[Dict[str, Any]]:
@@ -29,7 +30,11 @@ class ImportJobRepository(Protocol):
     def create_import_job(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         ...
 
-    def list_import_jobs(self) -> List[Dict[str, Any]]:
+    def list_import_jobs(
+        self,
+        statuses: Optional[Iterable[str]] = None,
+        updated_before: Optional[datetime] = None,
+    ) -> List[Dict[str, Any]]:
         ...
 
     def get_import_job(self, job_id: str) -> Optional[Dict[str, Any]]:
@@ -43,7 +48,11 @@ class PredictionJobRepository(Protocol):
     def create_prediction_job(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         ...
 
-    def list_prediction_jobs(self) -> List[Dict[str, Any]]:
+    def list_prediction_jobs(
+        self,
+        statuses: Optional[Iterable[str]] = None,
+        updated_before: Optional[datetime] = None,
+    ) -> List[Dict[str, Any]]:
         ...
 
     def get_prediction_job(self, job_id: str) -> Optional[Dict[str, Any]]:
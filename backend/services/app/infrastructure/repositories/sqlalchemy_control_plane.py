@@ -2,9 +2,9 @@ from __future__ import annotations
 
 import json
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional
 
-from sqlalchemy import delete, desc, select
+from sqlalchemy import delete, desc, func, select
 from sqlalchemy.orm import Session
 
 from app.infrastructure.db_models import (
@@ -33,8 +33,11 @@ class SqlAlchemyControlPlaneRepository:
     def __init__(self, session: Session):
         self.session = session
 
-    def list_connectors(self) -> List[Dict[str, Any]]:
-        rows = self.session.execute(select(ConnectorConfigModel).order_by(ConnectorConfigModel.name.asc())).scalars().all()
+    def list_connectors(self, connector_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        query = select(ConnectorConfigModel)
+        if connector_type is not None:
+            query = query.where(func.lower(ConnectorConfigModel.connector_type) == connector_type.lower())
+        rows = self.session.execute(query.order_by(ConnectorConfigModel.name.asc())).scalars().all()
         return [self._connector_to_dict(row) for row in rows]
 
     def get_connector(self, name: str) -> Optional[Dict[str, Any]]:
@@ -89,8 +92,13 @@ class SqlAlchemyControlPlaneRepository:
         self.session.flush()
         return self._job_to_dict(row, "import")
 
-    def list_import_jobs(self) -> List[Dict[str, Any]]:
-        rows = self.session.execute(select(ImportJobModel).order_by(desc(ImportJobModel.created_at))).scalars().all()
+    def list_import_jobs(
+        self,
+        statuses: Optional[Iterable[str]] = None,
+        updated_before: Optional[datetime] = None,
+    ) -> List[Dict[str, Any]]:
+        query = self._filter_jobs(select(ImportJobModel), ImportJobModel, statuses, updated_before)
+        rows = self.session.execute(query.order_by(desc(ImportJobModel.created_at))).scalars().all()
         return [self._job_to_dict(row, "import") for row in rows]
 
     def get_import_job(self, job_id: str) -> Optional[Dict[str, Any]]:
@@ -127,8 +135,13 @@ class SqlAlchemyControlPlaneRepository:
         self.session.flush()
         return self._job_to_dict(row, "prediction")
 
-    def list_prediction_jobs(self) -> List[Dict[str, Any]]:
-        rows = self.session.execute(select(PredictionJobModel).order_by(desc(PredictionJobModel.created_at))).scalars().all()
+    def list_prediction_jobs(
+        self,
+        statuses: Optional[Iterable[str]] = None,
+        updated_before: Optional[datetime] = None,
+    ) -> List[Dict[str, Any]]:
+        query = self._filter_jobs(select(PredictionJobModel), PredictionJobModel, statuses, updated_before)
+        rows = self.session.execute(query.order_by(desc(PredictionJobModel.created_at))).scalars().all()
         return [self._job_to_dict(row, "prediction") for row in rows]
 
     def get_prediction_job(self, job_id: str) -> Optional[Dict[str, Any]]:
@@ -305,6 +318,14 @@ class SqlAlchemyControlPlaneRepository:
             "created_at": row.created_at.isoformat(),
         }
 
+    @staticmethod
+    def _filter_jobs(query: Any, model: Any, statuses: Optional[Iterable[str]], updated_before: Optional[datetime]) -> Any:
+        if statuses is not None:
+            query = query.where(model.status.in_(list(statuses)))
+        if updated_before is not None:
+            query = query.where(model.updated_at <= updated_before)
+        return query
+
     def _apply_job_patch(self, row: Any, patch: Dict[str, Any]) -> None:
         if "status" in patch:
             row.status = patch["status"]
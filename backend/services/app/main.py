@@ -3,15 +3,18 @@ from __future__ import annotations
 import logging
 from pathlib import Path
 
-from fastapi import FastAPI
+import anyio.to_thread
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from starlette.responses import FileResponse
+from fastapi.middleware.gzip import GZipMiddleware
 
 from app.api.routers import connectors, experiments, exports, health, imports, mappings, predictions
 from app.application.imports import ImportService
 from app.application.predictions import PredictionService
 from app.core.db import get_session_factory, init_db
+from app.core.frontend import FrontendShell
 from app.core.logging import configure_access_log_filters
+from app.core.responses import FastJSONResponse
 from app.core.runtime import clear_shutdown_requested, mark_shutdown_requested
 from app.core.settings import get_settings
 from app.infrastructure.repositories.sqlalchemy_control_plane import SqlAlchemyControlPlaneRepository
@@ -24,7 +27,7 @@ logger = logging.getLogger(__name__)
 def create_app() -> FastAPI:
     settings = get_settings()
     frontend_dir = Path(__file__).resolve().parents[3] / "frontend"
-    frontend_index = frontend_dir / "index.html"
+    frontend_shell = FrontendShell(frontend_dir / "index.html")
     configure_access_log_filters()
     app = FastAPI(title=settings.app_name)
     app.add_middleware(
@@ -34,6 +37,15 @@ def create_app() -> FastAPI:
         allow_methods=["*"],
         allow_headers=["*"],
     )
+    # Listings and result pages are large, repetitive JSON; the fastest level gets most
+    # of the size reduction. Already-encoded responses (the frontend shell) pass through.
+    app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=1)
+
+    @app.on_event("startup")
+    async def _configure_request_threads() -> None:
+        # Route handlers are sync and run on AnyIO's worker threads; job runs use their
+        # own pool (app.core.runtime), so this only bounds ordinary requests.
+        anyio.to_thread.current_default_thread_limiter().total_tokens = settings.request_thread_limit
 
     @app.on_event("startup")
     def _startup() -> None:
@@ -61,14 +73,10 @@ def create_app() -> FastAPI:
         mark_shutdown_requested()
 
     @app.get("/")
-    def root():
-        response = FileResponse(frontend_index)
-        response.headers["Cache-Control"] = "no-cache, no-store, must-revalidate"
-        response.headers["Pragma"] = "no-cache"
-        response.headers["Expires"] = "0"
-        return response
+    def root(request: Request):
+        return frontend_shell.response(request)
 
-    @app.get("/health")
+    @app.get("/health", response_class=FastJSONResponse)
     def root_health():
         return health.health()
 
@@ -4,13 +4,20 @@ from functools import lru_cache
 import os
 import json
 import threading
-from datetime import datetime
 from pathlib import Path
+import numpy as np
 import pandas as pd
 from typing import List, Dict, Any, Optional
+from json_encoder import make_temp_path
 
 INT64_MAX = 2**63 - 1
 INT64_MIN = -(2**63)
+# Appended batches are written as parquet part files next to the base cache file;
+# once this many parts accumulate the table is compacted back into the base file.
+MOCK_MAX_PARQUET_PARTS = 64
+# String columns whose distinct/total ratio is below this are stored as categoricals.
+CATEGORICAL_MAX_UNIQUE_RATIO = 0.5
+PREDICTION_RESULTS_VIEW_CACHE_SIZE = 16
 
 
 def _is_int_like_scalar(value: Any) -> bool:
@@ -31,17 +38,52 @@ def _sanitize_for_storage(data: Any) -> Any:
     - empty dictionaries -> None
     - oversized integers (outside int64 range) -> str
     """
-    if isinstance(data, dict):
+    data_type = type(data)
+    # Fast path for the common scalar leaves, which never need rewriting.
+    if data is None or data_type is str or data_type is float or data_type is bool:
+        return data
+    if data_type is dict or isinstance(data, dict):
         if not data:
             return None
         return {k: _sanitize_for_storage(v) for k, v in data.items()}
-    if isinstance(data, list):
+    if data_type is list or isinstance(data, list):
         return [_sanitize_for_storage(item) for item in data]
     if _is_oversized_int(data):
         return str(data)
     return data
 
 
+def _column_matches(series: pd.Series, match_value: str) -> pd.Series:
+    """
+    Boolean mask of non-null cells whose string form equals match_value.
+    Categorical columns are compared once per category instead of once per row.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        categories = series.cat.categories
+        return series.isin(categories[[str(category) == match_value for category in categories]])
+    return series.map(lambda value: str(value) == match_value if pd.notna(value) else False).astype(bool)
+
+
+def _coalesce_text_columns(frame: pd.DataFrame, columns: List[str], default: Optional[str]) -> pd.Series:
+    """
+    Per row, the string form of the first of columns holding a non-null, non-empty
+    value, else default. Vectorized replacement for row-wise `a or b or default`.
+    """
+    result = pd.Series(default, index=frame.index, dtype=object)
+    for column in reversed(columns):
+        if column not in frame.columns:
+            continue
+        values = frame[column]
+        text = values.astype(str)
+        result = text.where(values.notna() & (text != ""), result)
+    return result
+
+
+def _revenue_usd_from_properties(properties: Any) -> Any:
+    """The revenue_usd recorded in an event_properties dict, or 0."""
+    return properties.get("revenue_usd", 0) if isinstance(properties, dict) else 0
+
+
 def _shared_service_cache_key() -> tuple[Any, ...]:
     mode = os.getenv("DATA_BACKEND_MODE", "mock").strip().lower()
     if mode == "gcp":
@@ -75,6 +117,20 @@ def clear_shared_bigquery_service_cache() -> None:
     _get_shared_service.cache_clear()
 
 
+def _mock_table_attribute(table_attr: str) -> property:
+    """
+    An in-memory mock table. Appended batches are buffered and concatenated on the
+    next read, so a run of appends does not copy the whole table once per batch.
+    """
+    def _get(self) -> pd.DataFrame:
+        return self._materialize_mock_table(table_attr)
+
+    def _set(self, table: pd.DataFrame):
+        self._set_mock_table(table_attr, table)
+
+    return property(_get, _set)
+
+
 class BigQueryService:
     """
     BigQuery service with dual backend support:
@@ -82,8 +138,25 @@ class BigQueryService:
     - gcp: real Google BigQuery client (prod)
     """
 
+    _table = _mock_table_attribute("_table")
+    _curated_table = _mock_table_attribute("_curated_table")
+    _player_latest_state_table = _mock_table_attribute("_player_latest_state_table")
+    _dead_letter_table = _mock_table_attribute("_dead_letter_table")
+    _prediction_results_table = _mock_table_attribute("_prediction_results_table")
+
     def __init__(self):
         self._lock = threading.RLock()
+        # table attr -> materialized DataFrame, plus appended batches not yet concatenated onto it.
+        self._mock_tables: Dict[str, pd.DataFrame] = {}
+        self._pending_mock_rows: Dict[str, List[pd.DataFrame]] = {}
+        # (table attr, column) -> {str(value): row positions} for the table currently held in
+        # that attribute; entries are dropped by _set_mock_table when the table is replaced.
+        self._identity_index_cache: Dict[tuple, Dict[str, Any]] = {}
+        # parts dir -> (dir mtime_ns, total part bytes); parts are only ever added or cleared.
+        self._part_size_cache: Dict[str, tuple] = {}
+        # prediction job id -> that job's rows sorted newest first; dropped whenever the results table is replaced.
+        self._prediction_results_view_table: Optional[pd.DataFrame] = None
+        self._prediction_results_view_cache: Dict[str, pd.DataFrame] = {}
         self.mode = os.getenv("DATA_BACKEND_MODE", "mock").strip().lower()
         if self.mode not in {"mock", "gcp"}:
             raise ValueError("DATA_BACKEND_MODE must be 'mock' or 'gcp'.")
@@ -143,12 +216,33 @@ class BigQueryService:
         self._prediction_results_table = self._load_mock_table(self._prediction_results_cache_path)
         os.makedirs(os.path.dirname(self._cache_path), exist_ok=True)
 
+    @staticmethod
+    def _parts_dir(cache_path: str) -> Path:
+        path = Path(cache_path)
+        return path.with_name(f"{path.stem}.parts")
+
+    def _list_part_files(self, cache_path: str) -> List[Path]:
+        parts_dir = self._parts_dir(cache_path)
+        if not parts_dir.is_dir():
+            return []
+        return sorted(parts_dir.glob("part-*.parquet"))
+
     def _load_mock_table(self, cache_path: str) -> pd.DataFrame:
-        if os.path.exists(cache_path):
+        frames = []
+        try:
+            base_frame = pd.read_parquet(cache_path)
+        except FileNotFoundError:
+            pass
+        else:
             print(f"Loading BigQuery cache from {cache_path}")
-            table = pd.read_parquet(cache_path)
-            return self._restore_complex_columns_from_parquet(table)
-        return pd.DataFrame()
+            frames.append(self._restore_complex_columns_from_parquet(base_frame))
+        for part_path in self._list_part_files(cache_path):
+            frames.append(self._restore_complex_columns_from_parquet(pd.read_parquet(part_path)))
+        if not frames:
+            return pd.DataFrame()
+        if len(frames) == 1:
+            return self._reduce_memory(frames[0])
+        return self._reduce_memory(pd.concat(frames, ignore_index=True))
 
     def _prepare_for_parquet(self, table: pd.DataFrame) -> pd.DataFrame:
         """
@@ -231,13 +325,92 @@ class BigQueryService:
                 )
         return coerced
 
+    def _clear_part_files(self, cache_path: str):
+        try:
+            entries = os.scandir(self._parts_dir(cache_path))
+        except FileNotFoundError:
+            return
+        with entries:
+            for entry in entries:
+                if entry.name.startswith("part-") and entry.name.endswith(".parquet"):
+                    try:
+                        os.unlink(entry.path)
+                    except FileNotFoundError:
+                        pass
+
+    def _reduce_memory(self, table: pd.DataFrame) -> pd.DataFrame:
+        """
+        Shrinks an in-memory mock table: low-cardinality string columns
+        (event_type, job ids, source, ...) become categoricals and integer
+        columns are downcast. Float columns keep full precision. Applied on load,
+        replace and after appends, so stored tables always have these dtypes;
+        frames handed to callers go through _with_default_dtypes.
+        """
+        if table.empty:
+            return table
+        row_count = len(table.index)
+        for column in table.columns:
+            series = table[column]
+            if pd.api.types.is_bool_dtype(series.dtype):
+                continue
+            if pd.api.types.is_integer_dtype(series.dtype):
+                table[column] = pd.to_numeric(series, downcast="integer")
+                continue
+            if series.dtype != "object" and not pd.api.types.is_string_dtype(series.dtype):
+                continue
+
+            non_null = series[series.notna()]
+            if non_null.empty or not non_null.map(lambda value: isinstance(value, str)).all():
+                continue
+            if non_null.nunique() / row_count < CATEGORICAL_MAX_UNIQUE_RATIO:
+                table[column] = series.astype("category")
+        return table
+
+    @staticmethod
+    def _write_parquet_temp(frame: pd.DataFrame, path: Any) -> str:
+        """
+        Writes frame next to path under a unique temporary name and returns that
+        name; callers os.replace it into place so readers never see a half-written
+        file. The temp file is removed if the write fails.
+        """
+        temp_path = make_temp_path(path)
+        try:
+            frame.to_parquet(temp_path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+        return temp_path
+
     def _persist_mock_table(self, table: pd.DataFrame, cache_path: str):
+        """Rewrites the full cache file for a table and drops any appended parts."""
         if table.empty:
-            if os.path.exists(cache_path):
+            self._clear_part_files(cache_path)
+            try:
                 os.remove(cache_path)
+            except FileNotFoundError:
+                pass
+            return
+        temp_path = self._write_parquet_temp(self._prepare_for_parquet(table), cache_path)
+        self._clear_part_files(cache_path)
+        os.replace(temp_path, cache_path)
+
+    def _persist_mock_rows_append(self, new_rows: pd.DataFrame, table_attr: str, cache_path: str):
+        """
+        Persists only the newly appended rows as a parquet part file, so appends
+        cost O(batch) on disk instead of rewriting the whole cache file.
+        """
+        part_files = self._list_part_files(cache_path)
+        if len(part_files) >= MOCK_MAX_PARQUET_PARTS:
+            full_table = self._coerce_oversized_integer_columns(getattr(self, table_attr))
+            self._persist_mock_table(full_table, cache_path)
+            self._set_mock_table(table_attr, full_table)
             return
-        table_to_persist = self._prepare_for_parquet(table)
-        table_to_persist.to_parquet(cache_path)
+
+        next_index = int(part_files[-1].stem.split("-", 1)[1]) + 1 if part_files else 0
+        parts_dir = self._parts_dir(cache_path)
+        parts_dir.mkdir(parents=True, exist_ok=True)
+        part_path = parts_dir / f"part-{next_index:06d}.parquet"
+        os.replace(self._write_parquet_temp(self._prepare_for_parquet(new_rows), part_path), part_path)
 
     def _target_meta(self, target: str) -> Dict[str, str]:
         mapping = {
@@ -299,10 +472,10 @@ class BigQueryService:
             self._append_rows_unlocked(rows, target=target)
 
     def _append_rows_unlocked(self, rows: List[Dict[str, Any]], target: str = "events_staging"):
-        prepared_events = []
-        for event in rows:
-            event_copy = _sanitize_for_storage(dict(event))
-            prepared_events.append(_sanitize_for_storage(event_copy))
+        # Rows are sanitized once here, before DataFrame construction, so the
+        # existing table never needs a second cell-by-cell pass. Sanitizing
+        # already builds a fresh dict per row, so callers' rows are not mutated.
+        prepared_events = [_sanitize_for_storage(event) for event in rows]
 
         if not prepared_events:
             return
@@ -318,31 +491,21 @@ class BigQueryService:
             return
 
         table_attr = meta["table_attr"]
-        cache_path = meta["cache_path"]
-        current_table = getattr(self, table_attr)
-        new_data_df = pd.DataFrame(prepared_events)
-        if current_table.empty:
-            current_table = new_data_df
-        else:
-            current_table = pd.concat([current_table, new_data_df], ignore_index=True)
-
-        print("Sanitizing DataFrame for Parquet compatibility...")
-        if hasattr(current_table, "map"):
-            current_table = current_table.map(_sanitize_for_storage)
-        else:
-            current_table = current_table.applymap(_sanitize_for_storage)
-        current_table = self._coerce_oversized_integer_columns(current_table)
-        setattr(self, table_attr, current_table)
-
-        print(f"Wrote {len(new_data_df)} rows to local BigQuery mock target '{target}'. Table now has {len(current_table)} total rows.")
-        self._persist_mock_table(current_table, cache_path)
+        new_data_df = self._coerce_oversized_integer_columns(pd.DataFrame(prepared_events))
+        self._pending_mock_rows.setdefault(table_attr, []).append(new_data_df)
+        self._drop_identity_index(table_attr)
+        self._persist_mock_rows_append(new_data_df, table_attr, meta["cache_path"])
+        print(
+            f"Wrote {len(new_data_df)} rows to local BigQuery mock target '{target}'. "
+            f"Table now has {self._mock_table_row_count(table_attr)} total rows."
+        )
 
     def _replace_rows(self, rows: List[Dict[str, Any]], target: str):
         with self._lock:
             self._replace_rows_unlocked(rows, target=target)
 
     def _replace_rows_unlocked(self, rows: List[Dict[str, Any]], target: str):
-        prepared_rows = [_sanitize_for_storage(dict(row)) for row in rows]
+        prepared_rows = [_sanitize_for_storage(row) for row in rows]
         meta = self._target_meta(target)
 
         if self.mode == "gcp":
@@ -353,16 +516,47 @@ class BigQueryService:
             )
             return
 
+        # Rows were sanitized above, before DataFrame construction, so there is
+        # no cell-by-cell pass over the built table.
         table = pd.DataFrame(prepared_rows)
         if not table.empty:
-            if hasattr(table, "map"):
-                table = table.map(_sanitize_for_storage)
-            else:
-                table = table.applymap(_sanitize_for_storage)
             table = self._coerce_oversized_integer_columns(table)
-        setattr(self, meta["table_attr"], table)
+            table = self._reduce_memory(table)
+        self._set_mock_table(meta["table_attr"], table)
         self._persist_mock_table(table, meta["cache_path"])
 
+    def _set_mock_table(self, table_attr: str, table: pd.DataFrame):
+        """Installs a new in-memory table, discarding buffered appends and its identity index."""
+        with self._lock:
+            self._mock_tables[table_attr] = table
+            self._pending_mock_rows.pop(table_attr, None)
+            self._drop_identity_index(table_attr)
+
+    def _materialize_mock_table(self, table_attr: str) -> pd.DataFrame:
+        """Returns the in-memory table, first concatenating any buffered appends onto it."""
+        with self._lock:
+            pending = self._pending_mock_rows.pop(table_attr, None)
+            if table_attr not in self._mock_tables:
+                raise AttributeError(table_attr)
+            table = self._mock_tables[table_attr]
+            if not pending:
+                return table
+            frames = ([table] if not table.empty else []) + pending
+            table = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+            # Same dtypes as a table loaded from disk or replaced, whatever its write history.
+            table = self._reduce_memory(table)
+            self._mock_tables[table_attr] = table
+            return table
+
+    def _mock_table_row_count(self, table_attr: str) -> int:
+        with self._lock:
+            pending = self._pending_mock_rows.get(table_attr, ())
+            return len(self._mock_tables[table_attr].index) + sum(len(frame.index) for frame in pending)
+
+    def _drop_identity_index(self, table_attr: str):
+        for cache_key in [key for key in self._identity_index_cache if key[0] == table_attr]:
+            del self._identity_index_cache[cache_key]
+
     def _get_local_rows(self, target: str) -> List[Dict[str, Any]]:
         with self._lock:
             table = getattr(self, self._target_meta(target)["table_attr"])
@@ -379,7 +573,7 @@ class BigQueryService:
         for column in ("job_id", "job_identifier", "last_job_id"):
             if column not in table.columns:
                 continue
-            masks.append(table[column].map(lambda value: str(value) == match_value if pd.notna(value) else False))
+            masks.append(_column_matches(table[column], match_value))
 
         if not masks:
             return table
@@ -389,39 +583,81 @@ class BigQueryService:
             combined_mask = combined_mask | mask
         return table[combined_mask].copy()
 
+    def _identity_row_positions(self, table_attr: str, column: str) -> Dict[str, Any]:
+        """
+        Returns a cached mapping of str(value) -> row positions for an identity
+        column of the table held in table_attr, so per-player lookups avoid
+        scanning the whole table. Callers hold self._lock.
+        """
+        cache_key = (table_attr, column)
+        cached = self._identity_index_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        series = getattr(self, table_attr)[column]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            keys = series.cat.rename_categories([str(category) for category in series.cat.categories])
+        else:
+            keys = series.map(lambda value: str(value) if pd.notna(value) else None)
+        positions = pd.Series(range(len(series)), index=series.index).groupby(keys.values, sort=False, observed=True).indices
+        self._identity_index_cache[cache_key] = positions
+        return positions
+
     def _get_local_events_for_identity(
         self,
         player_id: Any,
-        table: Optional[pd.DataFrame] = None,
+        table_attr: str = "_table",
         job_id: Optional[str] = None,
     ) -> Optional[pd.DataFrame]:
-        current_table = table if table is not None else self._table
-        if current_table.empty:
-            return None
-        current_table = self._filter_table_by_job(current_table, job_id=job_id)
-        if current_table.empty:
-            return None
-
         match_value = str(player_id)
+        identity_rows = []
+        # The table and its index are read together under the lock so a concurrent
+        # append or replace cannot pair one table with another's row positions.
+        with self._lock:
+            current_table = getattr(self, table_attr)
+            if current_table.empty:
+                return None
+            for column in ("player_id", "canonical_user_id"):
+                if column not in current_table.columns:
+                    continue
+                row_positions = self._identity_row_positions(table_attr, column).get(match_value)
+                if row_positions is not None and len(row_positions) > 0:
+                    identity_rows.append(current_table.iloc[row_positions])
+
         candidate_frames = []
-        for column in ("player_id", "canonical_user_id"):
-            if column not in current_table.columns:
-                continue
-            mask = current_table[column].map(lambda value: str(value) == match_value if pd.notna(value) else False)
-            matched = current_table[mask]
+        for rows in identity_rows:
+            matched = self._filter_table_by_job(rows, job_id=job_id)
             if not matched.empty:
                 candidate_frames.append(matched)
 
         if not candidate_frames:
             return None
 
+        # concat and the boolean mask below each allocate a new frame, so the
+        # result is already owned by the caller and needs no defensive copy.
         player_df = pd.concat(candidate_frames, ignore_index=True)
         row_signature = player_df.apply(
             lambda row: json.dumps(_sanitize_for_storage(row.to_dict()), sort_keys=True, default=str),
             axis=1,
         )
-        player_df = player_df.loc[~row_signature.duplicated()].copy()
-        return player_df.copy() if not player_df.empty else None
+        player_df = player_df.loc[~row_signature.duplicated()]
+        return self._with_default_dtypes(player_df) if not player_df.empty else None
+
+    @staticmethod
+    def _with_default_dtypes(frame: pd.DataFrame) -> pd.DataFrame:
+        """
+        Undoes _reduce_memory on a frame returned to callers: categoricals become
+        object columns and downcast integers int64, so callers can group on and
+        assign arbitrary values into the columns.
+        """
+        restored = {}
+        for column in frame.columns:
+            dtype = frame[column].dtype
+            if isinstance(dtype, pd.CategoricalDtype):
+                restored[column] = object
+            elif pd.api.types.is_integer_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype) and dtype.itemsize < 8:
+                restored[column] = "int64"
+        return frame.astype(restored) if restored else frame
 
     def _query_rows_by_identity_gcp(
         self,
@@ -529,34 +765,40 @@ class BigQueryService:
         last_seen = df["event_time"].iloc[-1]
         now = pd.Timestamp.now(tz="UTC")
 
-        def _count_sessions(frame: pd.DataFrame) -> int:
-            if frame.empty:
+        # df is sorted by time, so each window below is a suffix of it and its
+        # sessions are 1 + the session-starting gaps inside that suffix.
+        event_times = df["event_time"].dt.tz_convert(None).to_numpy(dtype="datetime64[ns]")
+        session_breaks = np.diff(event_times) > np.timedelta64(15, "m")
+
+        def _count_sessions_since(cutoff: Optional[pd.Timestamp] = None) -> int:
+            start = 0 if cutoff is None else int(
+                np.searchsorted(event_times, cutoff.tz_convert(None).to_datetime64(), side="left")
+            )
+            if start >= len(event_times):
                 return 0
-            ordered = frame.sort_values(by="event_time")
-            new_sessions = ordered["event_time"].diff() > pd.Timedelta(minutes=15)
-            return int(1 + new_sessions.fillna(False).sum())
+            return int(1 + session_breaks[start:].sum())
 
         total_revenue = 0.0
         if "event_properties" in df.columns and "event_type" in df.columns:
             purchases = df[df["event_type"] == "item_purchased"]
             if not purchases.empty:
-                total_revenue = float(
-                    purchases["event_properties"].apply(
-                        lambda value: (
-                            value.get("revenue_usd", 0)
-                            if isinstance(value, dict)
-                            else 0
-                        )
-                    ).sum()
-                )
+                if "_revenue_usd" in purchases.columns:
+                    revenue = purchases["_revenue_usd"]
+                else:
+                    revenue = purchases["event_properties"].map(_revenue_usd_from_properties)
+                total_revenue = float(revenue.sum())
 
         last_campaign = None
         last_media_source = None
         email = None
         if "event_properties" in df.columns or "user_properties" in df.columns:
-            for _, row in df.iloc[::-1].iterrows():
-                props = row["event_properties"] if isinstance(row.get("event_properties"), dict) else {}
-                user_props = row["user_properties"] if isinstance(row.get("user_properties"), dict) else {}
+            # Walk the two columns newest-first as plain lists; iterrows would build a Series per row.
+            no_values = [None] * len(df)
+            event_props = df["event_properties"].tolist() if "event_properties" in df.columns else no_values
+            user_props_values = df["user_properties"].tolist() if "user_properties" in df.columns else no_values
+            for props, user_props in zip(reversed(event_props), reversed(user_props_values)):
+                props = props if isinstance(props, dict) else {}
+                user_props = user_props if isinstance(user_props, dict) else {}
                 if last_campaign is None and props.get("campaign") is not None:
                     last_campaign = props.get("campaign")
                 if last_media_source is None and props.get("media_source") is not None:
@@ -566,8 +808,6 @@ class BigQueryService:
                 if last_campaign is not None and last_media_source is not None and email is not None:
                     break
 
-        window_7d = df[df["event_time"] >= (now - pd.Timedelta(days=7))]
-        window_30d = df[df["event_time"] >= (now - pd.Timedelta(days=30))]
         canonical_user_id = None
         if "canonical_user_id" in df.columns:
             non_null_canon = df["canonical_user_id"].dropna()
@@ -589,7 +829,7 @@ class BigQueryService:
                     break
         resolved_job_id = str(job_id or last_job_id or "unknown_job")
 
-        total_sessions = _count_sessions(df)
+        total_sessions = _count_sessions_since()
         lifetime_events = int(len(df))
         return {
             "player_id": player_id_value or str(player_id),
@@ -602,8 +842,8 @@ class BigQueryService:
             "lifetime_revenue_usd": total_revenue,
             "total_revenue": total_revenue,
             "total_sessions": total_sessions,
-            "sessions_7d": _count_sessions(window_7d),
-            "sessions_30d": _count_sessions(window_30d),
+            "sessions_7d": _count_sessions_since(now - pd.Timedelta(days=7)),
+            "sessions_30d": _count_sessions_since(now - pd.Timedelta(days=30)),
             "days_since_last_seen": int((now - last_seen).days),
             "last_campaign": last_campaign,
             "last_media_source": last_media_source,
@@ -661,7 +901,8 @@ class BigQueryService:
             event_copy.setdefault("job_id", job_identifier)
             prepared_events.append(event_copy)
 
-        self.write_events_staging(prepared_events, job_id=job_identifier)
+        # Job fields are already set, so skip write_events_staging's second copy of every row.
+        self._append_rows(prepared_events, target="events_staging")
 
     def run_events_curation(self, job_id: Optional[str] = None, event_date: Optional[str] = None) -> Dict[str, Any]:
         with self._lock:
@@ -687,7 +928,7 @@ class BigQueryService:
             )
             return rows
 
-        player_df = self._get_local_events_for_identity(player_id, table=self._curated_table, job_id=job_id)
+        player_df = self._get_local_events_for_identity(player_id, table_attr="_curated_table", job_id=job_id)
         if player_df is None or player_df.empty:
             return []
         return player_df.head(max(1, int(limit))).to_dict(orient="records")
@@ -702,10 +943,10 @@ class BigQueryService:
                 return pd.DataFrame(staging_rows)
             return None
 
-        player_df = self._get_local_events_for_identity(player_id, table=self._curated_table, job_id=job_id)
+        player_df = self._get_local_events_for_identity(player_id, table_attr="_curated_table", job_id=job_id)
         if player_df is not None and not player_df.empty:
             return player_df
-        return self._get_local_events_for_identity(player_id, table=self._table, job_id=job_id)
+        return self._get_local_events_for_identity(player_id, table_attr="_table", job_id=job_id)
 
     def get_all_player_ids(self, job_id: Optional[str] = None) -> List[Any]:
         if self.mode == "gcp":
@@ -761,13 +1002,9 @@ class BigQueryService:
             filtered_table = self._filter_table_by_job(table, job_id=job_id)
             if filtered_table.empty:
                 continue
-            ids: List[str] = []
-            for row in filtered_table.to_dict(orient="records"):
-                value = row.get("player_id") or row.get("canonical_user_id")
-                if value is not None:
-                    ids.append(str(value))
-            if ids:
-                return list(dict.fromkeys(ids))
+            ids = _coalesce_text_columns(filtered_table, ["player_id", "canonical_user_id"], None).dropna()
+            if not ids.empty:
+                return ids.drop_duplicates().tolist()
         return []
 
     def refresh_player_latest_state(self, job_id: Optional[str] = None, event_date: Optional[str] = None) -> Dict[str, Any]:
@@ -784,20 +1021,27 @@ class BigQueryService:
                 }
 
             curated_df = pd.DataFrame(curated_rows)
-            identity_keys = []
-            for row in curated_df.to_dict(orient="records"):
-                canonical = row.get("canonical_user_id")
-                player = row.get("player_id")
-                identity_keys.append(str(canonical or player or "unknown_user"))
-            curated_df["_identity_key"] = identity_keys
-            curated_df["_job_scope"] = curated_df.apply(
-                lambda row: str(row.get("job_identifier") or row.get("job_id") or "unknown_job"),
-                axis=1,
+            if "event_properties" in curated_df.columns:
+                # Pulled out of the property dicts once as a float64 column, so each player
+                # group just sums it. Non-numeric revenue values count as 0.
+                curated_df["_revenue_usd"] = pd.to_numeric(
+                    pd.Series(
+                        [_revenue_usd_from_properties(value) for value in curated_df["event_properties"].tolist()],
+                        index=curated_df.index,
+                        dtype="object",
+                    ),
+                    errors="coerce",
+                ).fillna(0.0).astype("float64")
+            curated_df["_identity_key"] = _coalesce_text_columns(
+                curated_df, ["canonical_user_id", "player_id"], "unknown_user"
+            )
+            curated_df["_job_scope"] = _coalesce_text_columns(
+                curated_df, ["job_identifier", "job_id"], "unknown_job"
             )
 
             latest_state_rows: List[Dict[str, Any]] = []
             for (job_scope, identity_key), group_df in curated_df.groupby(["_job_scope", "_identity_key"], sort=False):
-                latest_state = self._build_latest_state_from_events(identity_key, group_df.copy(), job_id=job_scope)
+                latest_state = self._build_latest_state_from_events(identity_key, group_df, job_id=job_scope)
                 if latest_state:
                     latest_state_rows.append(latest_state)
 
@@ -816,7 +1060,7 @@ class BigQueryService:
             if rows:
                 return rows[0]
         else:
-            latest_state_df = self._get_local_events_for_identity(player_id, table=self._player_latest_state_table, job_id=job_id)
+            latest_state_df = self._get_local_events_for_identity(player_id, table_attr="_player_latest_state_table", job_id=job_id)
             if latest_state_df is not None and not latest_state_df.empty:
                 return latest_state_df.iloc[0].to_dict()
 
@@ -825,6 +1069,29 @@ class BigQueryService:
             return None
         return self._build_latest_state_from_events(player_id, player_df, job_id=job_id)
 
+    def get_player_latest_states(self, job_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Returns every player_latest_state row, optionally scoped to a job."""
+        if self.mode == "gcp":
+            query = f"SELECT * FROM `{self._player_latest_state_table_id}`"
+            job_config = None
+            if job_id:
+                query += " WHERE CAST(job_id AS STRING) = @job_id OR CAST(job_identifier AS STRING) = @job_id"
+                job_config = self._bigquery.QueryJobConfig(
+                    query_parameters=[
+                        self._bigquery.ScalarQueryParameter("job_id", "STRING", str(job_id))
+                    ]
+                )
+            try:
+                return [dict(row.items()) for row in self._client.query(query, job_config=job_config).result()]
+            except Exception:
+                return []
+
+        with self._lock:
+            table = self._filter_table_by_job(self._player_latest_state_table, job_id=job_id)
+            if table.empty:
+                return []
+            return table.to_dict(orient="records")
+
     def get_pipeline_dead_letters(self, job_id: Optional[str] = None, limit: int = 200) -> List[Dict[str, Any]]:
         if self.mode == "gcp":
             query = f"SELECT * FROM `{self._dead_letter_table_id}`"
@@ -848,8 +1115,8 @@ class BigQueryService:
         table = self._dead_letter_table.copy()
         if job_id:
             match_value = str(job_id)
-            job_id_mask = table["job_id"].map(lambda value: str(value) == match_value if pd.notna(value) else False) if "job_id" in table.columns else False
-            job_identifier_mask = table["job_identifier"].map(lambda value: str(value) == match_value if pd.notna(value) else False) if "job_identifier" in table.columns else False
+            job_id_mask = _column_matches(table["job_id"], match_value) if "job_id" in table.columns else False
+            job_identifier_mask = _column_matches(table["job_identifier"], match_value) if "job_identifier" in table.columns else False
             if isinstance(job_id_mask, bool):
                 mask = job_identifier_mask
             elif isinstance(job_identifier_mask, bool):
@@ -891,18 +1158,14 @@ class BigQueryService:
         with self._lock:
             table = self._prediction_results_table.copy()
             if not table.empty and "prediction_job_id" in table.columns:
-                table = table[
-                    table["prediction_job_id"].map(
-                        lambda value: str(value) != resolved_job_id if pd.notna(value) else True
-                    )
-                ].copy()
+                table = table[~_column_matches(table["prediction_job_id"], resolved_job_id)].copy()
             if prepared_rows:
                 new_rows = pd.DataFrame(prepared_rows)
                 if table.empty:
                     table = new_rows
                 else:
                     table = pd.concat([table, new_rows], ignore_index=True)
-            self._prediction_results_table = table
+            self._set_mock_table("_prediction_results_table", table)
             self._persist_mock_table(table, self._prediction_results_cache_path)
 
     def append_prediction_results(self, job_id: str, rows: List[Dict[str, Any]]):
@@ -919,40 +1182,78 @@ class BigQueryService:
     def delete_prediction_results(self, job_id: str) -> None:
         self.replace_prediction_results(job_id=job_id, rows=[])
 
+    def _part_files_size_bytes(self, cache_path: str) -> int:
+        parts_dir = str(self._parts_dir(cache_path))
+        try:
+            mtime_ns = os.stat(parts_dir).st_mtime_ns
+        except FileNotFoundError:
+            return 0
+        cached = self._part_size_cache.get(parts_dir)
+        if cached is not None and cached[0] == mtime_ns:
+            return cached[1]
+        with os.scandir(parts_dir) as entries:
+            size_bytes = sum(
+                entry.stat().st_size
+                for entry in entries
+                if entry.name.startswith("part-") and entry.name.endswith(".parquet")
+            )
+        self._part_size_cache[parts_dir] = (mtime_ns, size_bytes)
+        return size_bytes
+
     def get_local_cache_stats(self) -> Dict[str, Any]:
         if self.mode != "mock":
             return {}
 
-        def _table_stats(table: pd.DataFrame, cache_path: str) -> Dict[str, Any]:
-            path = Path(cache_path)
-            return {
-                "rows": int(len(table.index)) if table is not None else 0,
-                "cache_path": str(path),
-                "size_bytes": int(path.stat().st_size) if path.exists() else 0,
-            }
-
+        tables = {
+            "events_staging": ("_table", self._cache_path),
+            "events_curated": ("_curated_table", self._curated_cache_path),
+            "player_latest_state": ("_player_latest_state_table", self._player_latest_state_cache_path),
+            "pipeline_dead_letters": ("_dead_letter_table", self._dead_letter_cache_path),
+            "prediction_results": ("_prediction_results_table", self._prediction_results_cache_path),
+        }
         with self._lock:
-            return {
-                "retention_days": max(1, int(os.getenv("JOB_RETENTION_DAYS", "7"))),
-                "tables": {
-                    "events_staging": _table_stats(self._table, self._cache_path),
-                    "events_curated": _table_stats(self._curated_table, self._curated_cache_path),
-                    "player_latest_state": _table_stats(self._player_latest_state_table, self._player_latest_state_cache_path),
-                    "pipeline_dead_letters": _table_stats(self._dead_letter_table, self._dead_letter_cache_path),
-                    "prediction_results": _table_stats(self._prediction_results_table, self._prediction_results_cache_path),
-                },
-            }
+            row_counts = {}
+            for name, (table_attr, _) in tables.items():
+                row_counts[name] = self._mock_table_row_count(table_attr)
 
-    def _sort_prediction_result_dicts(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        def _sort_key(item: Dict[str, Any]):
-            raw_completed_at = item.get("completed_at")
+        # Sizes are read outside the lock so health polling never stalls writers on disk IO.
+        stats: Dict[str, Any] = {}
+        for name, (_, cache_path) in tables.items():
             try:
-                completed_at = datetime.fromisoformat(str(raw_completed_at))
-            except (TypeError, ValueError):
-                completed_at = datetime.min
-            return (completed_at, str(item.get("user_id") or ""))
+                size_bytes = int(os.stat(cache_path).st_size)
+            except FileNotFoundError:
+                size_bytes = 0
+            size_bytes += self._part_files_size_bytes(cache_path)
+            stats[name] = {
+                "rows": row_counts[name],
+                "cache_path": str(Path(cache_path)),
+                "size_bytes": size_bytes,
+            }
+        return {
+            "retention_days": max(1, int(os.getenv("JOB_RETENTION_DAYS", "7"))),
+            "tables": stats,
+        }
 
-        return sorted(items, key=_sort_key, reverse=True)
+    @staticmethod
+    def _sort_prediction_result_table(table: pd.DataFrame) -> pd.DataFrame:
+        """
+        Orders prediction results newest completed_at first (unparseable
+        timestamps last), then user_id descending.
+        """
+        if "completed_at" in table.columns:
+            completed_at = pd.to_datetime(table["completed_at"].astype(str), errors="coerce", format="ISO8601")
+        else:
+            completed_at = pd.Series(pd.NaT, index=table.index, dtype="datetime64[ns]")
+        user_ids = table["user_id"] if "user_id" in table.columns else pd.Series("", index=table.index)
+        sort_keys = pd.DataFrame(
+            {
+                "completed_at": completed_at.fillna(pd.Timestamp.min),
+                "user_id": user_ids.astype(object).where(user_ids.notna(), "").astype(str),
+            },
+            index=table.index,
+        )
+        order = sort_keys.sort_values(["completed_at", "user_id"], ascending=False, kind="stable").index
+        return table.loc[order]
 
     def list_prediction_results(self, job_id: str, page: int = 1, page_size: int = 100) -> Dict[str, Any]:
         page = max(1, int(page))
@@ -960,40 +1261,68 @@ class BigQueryService:
         offset = (page - 1) * page_size
 
         if self.mode == "gcp":
-            job_config = self._bigquery.QueryJobConfig(
+            job_id_param = self._bigquery.ScalarQueryParameter("job_id", "STRING", str(job_id))
+            count_config = self._bigquery.QueryJobConfig(query_parameters=[job_id_param])
+            page_config = self._bigquery.QueryJobConfig(
                 query_parameters=[
-                    self._bigquery.ScalarQueryParameter("job_id", "STRING", str(job_id))
+                    job_id_param,
+                    self._bigquery.ScalarQueryParameter("page_limit", "INT64", page_size),
+                    self._bigquery.ScalarQueryParameter("page_offset", "INT64", offset),
                 ]
             )
             count_query = (
                 f"SELECT COUNT(*) AS total FROM `{self._prediction_results_table_id}` "
                 "WHERE CAST(prediction_job_id AS STRING) = @job_id"
             )
+            # Same order as _sort_prediction_result_table, applied server-side so only
+            # the requested page is transferred instead of every row for the job.
             row_query = (
                 f"SELECT * FROM `{self._prediction_results_table_id}` "
-                "WHERE CAST(prediction_job_id AS STRING) = @job_id"
+                "WHERE CAST(prediction_job_id AS STRING) = @job_id "
+                "ORDER BY SAFE_CAST(CAST(completed_at AS STRING) AS TIMESTAMP) DESC NULLS LAST, "
+                "IFNULL(CAST(user_id AS STRING), '') DESC "
+                "LIMIT @page_limit OFFSET @page_offset"
             )
-            total = int(next(iter(self._client.query(count_query, job_config=job_config).result()))["total"])
-            items = [self._deserialize_prediction_row(dict(row.items())) for row in self._client.query(row_query, job_config=job_config).result()]
-            items = self._sort_prediction_result_dicts(items)[offset: offset + page_size]
+            count_job = self._client.query(count_query, job_config=count_config)
+            row_job = self._client.query(row_query, job_config=page_config)
+            total = int(next(iter(count_job.result()))["total"])
+            items = [self._deserialize_prediction_row(dict(row.items())) for row in row_job.result()]
             return {"page": page, "page_size": page_size, "total": total, "items": items}
 
         with self._lock:
-            if self._prediction_results_table.empty:
-                return {"page": page, "page_size": page_size, "total": 0, "items": []}
-            table = self._prediction_results_table.copy()
-            if "prediction_job_id" not in table.columns:
-                return {"page": page, "page_size": page_size, "total": 0, "items": []}
-            table = table[
-                table["prediction_job_id"].map(lambda value: str(value) == str(job_id) if pd.notna(value) else False)
-            ].copy()
+            table = self._sorted_prediction_results_for_job(str(job_id))
             if table.empty:
                 return {"page": page, "page_size": page_size, "total": 0, "items": []}
             total = len(table)
-            items = [self._deserialize_prediction_row(row) for row in table.to_dict(orient="records")]
-            items = self._sort_prediction_result_dicts(items)[offset: offset + page_size]
+            page_rows = table.iloc[offset: offset + page_size]
+            items = [self._deserialize_prediction_row(row) for row in page_rows.to_dict(orient="records")]
             return {"page": page, "page_size": page_size, "total": total, "items": items}
 
+    def _sorted_prediction_results_for_job(self, job_id: str) -> pd.DataFrame:
+        """
+        Returns one job's prediction rows sorted newest first. Paging through a job
+        reuses the filtered, sorted view until the results table is replaced.
+        """
+        table = self._prediction_results_table
+        if self._prediction_results_view_table is not table:
+            self._prediction_results_view_table = table
+            self._prediction_results_view_cache.clear()
+        cached = self._prediction_results_view_cache.get(job_id)
+        if cached is not None:
+            return cached
+
+        if table.empty or "prediction_job_id" not in table.columns:
+            job_table = table.iloc[0:0]
+        else:
+            job_table = table[_column_matches(table["prediction_job_id"], job_id)]
+            if not job_table.empty:
+                job_table = self._sort_prediction_result_table(job_table)
+
+        if len(self._prediction_results_view_cache) >= PREDICTION_RESULTS_VIEW_CACHE_SIZE:
+            self._prediction_results_view_cache.clear()
+        self._prediction_results_view_cache[job_id] = job_table
+        return job_table
+
     def _deserialize_prediction_row(self, row: Dict[str, Any]) -> Dict[str, Any]:
         parsed = dict(row)
         for key, value in list(parsed.items()):
@@ -1024,8 +1353,10 @@ class BigQueryService:
                     WHERE job_identifier = @job_identifier OR job_id = @job_identifier
                 """,
             ]
-            for query in queries:
-                self._client.query(query, job_config=job_config).result()
+            # The two DELETE statements touch different tables; submit both before waiting.
+            query_jobs = [self._client.query(query, job_config=job_config) for query in queries]
+            for query_job in query_jobs:
+                query_job.result()
             self.run_events_curation()
             self.refresh_player_latest_state()
             print(f"Deleted rows from BigQuery for job '{job_identifier}'.")
@@ -1043,9 +1374,9 @@ class BigQueryService:
 
                 masks = []
                 if "job_identifier" in table.columns:
-                    masks.append(table["job_identifier"].map(lambda value: str(value) == str(job_identifier) if pd.notna(value) else False))
+                    masks.append(_column_matches(table["job_identifier"], str(job_identifier)))
                 if "job_id" in table.columns:
-                    masks.append(table["job_id"].map(lambda value: str(value) == str(job_identifier) if pd.notna(value) else False))
+                    masks.append(_column_matches(table["job_id"], str(job_identifier)))
                 if not masks:
                     continue
 
@@ -1057,7 +1388,7 @@ class BigQueryService:
                 filtered = table[~combined_mask].copy()
                 rows_deleted = initial_rows - len(filtered)
                 if rows_deleted > 0:
-                    setattr(self, table_attr, filtered)
+                    self._set_mock_table(table_attr, filtered)
                     print(f"Deleted {rows_deleted} rows from local BigQuery mock target '{target_name}' for job '{job_identifier}'.")
                     self._persist_mock_table(filtered, cache_path)
 
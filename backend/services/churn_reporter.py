@@ -1,28 +1,62 @@
 # churn_reporter.py
 
+import asyncio
+import functools
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
-from typing import List, Any
+from typing import List, Any, Dict, Optional, Tuple
 from player_modeling_engine import PlayerModelingEngine
 from growth_decision_engine import GrowthDecisionEngine
 
+# For the demo, the report stops after this many at-risk players.
+REPORT_PLAYER_LIMIT = 5
+_NO_MORE_PLAYERS = object()
+
+
 class ChurnReporter:
     """
     Generates a CSV report of players predicted to churn, including the
     reason for the prediction and the AI-suggested engagement action.
     """
 
-    def __init__(self, modeling_engine: PlayerModelingEngine, decision_engine: GrowthDecisionEngine):
+    def __init__(
+        self,
+        modeling_engine: PlayerModelingEngine,
+        decision_engine: GrowthDecisionEngine,
+        max_workers: Optional[int] = None,
+    ):
         """
         Initializes the reporter with the necessary engine dependencies.
+
+        Args:
+            max_workers: Players scored concurrently. Defaults to CHURN_REPORT_MAX_WORKERS or 8.
         """
         self.modeling_engine = modeling_engine
         self.decision_engine = decision_engine
+        self.max_workers = max(1, int(max_workers or os.getenv("CHURN_REPORT_MAX_WORKERS", "8")))
         print("ChurnReporter initialized.")
 
+    def _score_player(self, player_id: Any) -> Tuple[Any, Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """
+        Builds the profile and churn estimate for one player. Runs on a worker
+        thread; the estimate is reused by the report so the profile is built once.
+        """
+        player_profile = self.modeling_engine.build_player_profile(player_id)
+        if not player_profile:
+            return player_id, None, None
+        churn_estimate = asyncio.run(self.modeling_engine.estimate_churn_risk(player_id, player_profile))
+        return player_id, player_profile, churn_estimate
+
     async def generate_report(self, player_ids: List[Any], output_filepath: str):
         """
         Analyzes a list of players and generates a CSV report for those at risk of churning.
 
+        When the modeling engine can rank players from the latest-state aggregate,
+        only the top-ranked candidates are scored; otherwise every player is
+        scanned until the demo limit is reached.
+
         Args:
             player_ids: A list of player IDs to analyze.
             output_filepath: The path to save the generated CSV file (e.g., 'churn_report.csv').
@@ -30,29 +64,17 @@ class ChurnReporter:
         report_data = []
         print(f"\nGenerating churn report for {len(player_ids)} players...")
 
-        players_reported = 0
-        for player_id in player_ids:
-            # For the demo, we will stop after finding 5 at-risk players.
-            if players_reported >= 5:
-                print("\nDemo limit of 5 players reached for the report. Halting analysis.")
-                break
-
-            churn_estimate = await self.modeling_engine.estimate_churn_risk(player_id)
-
-            # Only include players with a medium or high churn risk in the report
-            if churn_estimate and churn_estimate.get("churn_risk") in ["medium", "high"]:
-                player_profile = self.modeling_engine.build_player_profile(player_id)
-                next_action = self.decision_engine.decide_next_action(
-                    player_profile, churn_estimate, objective="reduce_churn"
-                )
-
-                report_data.append({
-                    "player_id": player_id,
-                    "churn_risk": churn_estimate.get("churn_risk"),
-                    "reason": churn_estimate.get("reason"),
-                    "suggested_action": next_action.get("content") if next_action else "N/A",
-                })
-                players_reported += 1
+        at_risk_players = await self.modeling_engine.get_at_risk_players(player_ids, limit=REPORT_PLAYER_LIMIT)
+        if at_risk_players is not None:
+            next_actions = await asyncio.to_thread(
+                self.decision_engine.decide_next_actions_batch,
+                [(player_profile, churn_estimate) for _, player_profile, churn_estimate in at_risk_players],
+                objective="reduce_churn",
+            )
+            for (player_id, player_profile, churn_estimate), next_action in zip(at_risk_players, next_actions):
+                report_data.append(self._build_report_row(player_id, churn_estimate, next_action))
+        else:
+            report_data = await self._scan_players(player_ids)
 
         if not report_data:
             print("No players with medium or high churn risk found.")
@@ -61,3 +83,70 @@ class ChurnReporter:
         report_df = pd.DataFrame(report_data)
         report_df.to_csv(output_filepath, index=False)
         print(f"Churn report successfully generated and saved to '{output_filepath}'")
+
+    def _build_report_row(
+        self,
+        player_id: Any,
+        churn_estimate: Dict[str, Any],
+        next_action: Optional[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        return {
+            "player_id": player_id,
+            "churn_risk": churn_estimate.get("churn_risk"),
+            "reason": churn_estimate.get("reason"),
+            "suggested_action": next_action.get("content") if next_action else "N/A",
+        }
+
+    async def _scan_players(self, player_ids: List[Any]) -> List[Dict[str, Any]]:
+        """
+        Fallback when no player aggregate is available: scores players on a
+        thread pool, with at most max_workers in flight, and consumes results in
+        input order so the demo limit applies to the first at-risk players.
+        Gemini calls (scoring and next actions) all run on the pool, never on the
+        event loop; once the limit is reached, queued players are cancelled and
+        in-flight calls are left to finish without being awaited.
+        """
+        report_data = []
+        loop = asyncio.get_running_loop()
+        remaining_ids = iter(player_ids)
+        pending = deque()
+        players_reported = 0
+
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            def _submit_next() -> None:
+                next_player_id = next(remaining_ids, _NO_MORE_PLAYERS)
+                if next_player_id is not _NO_MORE_PLAYERS:
+                    pending.append(loop.run_in_executor(executor, self._score_player, next_player_id))
+
+            for _ in range(self.max_workers):
+                _submit_next()
+
+            while pending:
+                if players_reported >= REPORT_PLAYER_LIMIT:
+                    print(f"\nDemo limit of {REPORT_PLAYER_LIMIT} players reached for the report. Halting analysis.")
+                    break
+
+                player_id, player_profile, churn_estimate = await pending.popleft()
+                _submit_next()
+
+                # Only include players with a medium or high churn risk in the report
+                if churn_estimate and churn_estimate.get("churn_risk") in ["medium", "high"]:
+                    next_action = await loop.run_in_executor(
+                        executor,
+                        functools.partial(
+                            self.decision_engine.decide_next_action,
+                            player_profile,
+                            churn_estimate,
+                            objective="reduce_churn",
+                        ),
+                    )
+                    report_data.append(self._build_report_row(player_id, churn_estimate, next_action))
+                    players_reported += 1
+
+            for future in pending:
+                future.cancel()
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        return report_data
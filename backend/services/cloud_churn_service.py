@@ -1,5 +1,7 @@
 import os
 import requests
+from functools import lru_cache
+from requests.adapters import HTTPAdapter
 from typing import Dict, Any, Optional
 
 
@@ -20,6 +22,12 @@ class CloudChurnService:
         if not self.api_url:
             raise ValueError("Cloud churn service is not configured. Set CHURN_API_URL.")
 
+        # Prediction jobs call this once per player; a pooled session keeps the
+        # TCP/TLS connection alive across those calls.
+        self._session = requests.Session()
+        self._session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=8))
+        self._session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=8))
+
     def estimate_churn_risk(self, player_id: Any, player_profile: Dict[str, Any]) -> Dict[str, Any]:
         payload = {
             "player_id": player_id,
@@ -29,7 +37,7 @@ class CloudChurnService:
         if self.api_token:
             headers["Authorization"] = f"Bearer {self.api_token}"
 
-        response = requests.post(self.api_url, json=payload, headers=headers, timeout=self.timeout_sec)
+        response = self._session.post(self.api_url, json=payload, headers=headers, timeout=self.timeout_sec)
         response.raise_for_status()
         data = response.json() if response.content else {}
 
@@ -39,3 +47,13 @@ class CloudChurnService:
             "reason": data.get("reason", "Cloud predictor returned no reason."),
         }
 
+
+
+@lru_cache(maxsize=8)
+def _shared_cloud_churn_service(api_url: Optional[str], api_token: Optional[str]) -> CloudChurnService:
+    return CloudChurnService(api_url=api_url, api_token=api_token)
+
+
+def get_shared_cloud_churn_service() -> CloudChurnService:
+    """Returns a client for the configured endpoint, reused across jobs."""
+    return _shared_cloud_churn_service(os.getenv("CHURN_API_URL"), os.getenv("CHURN_API_TOKEN"))
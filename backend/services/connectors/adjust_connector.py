@@ -75,12 +75,9 @@ class AdjustConnector:
         return {"events": page, "next_cursor": next_cursor, "has_more": next_cursor is not None}
 
     def iter_event_pages(self, start_date: str, end_date: str, page_size: int | None = None):
-        cursor = None
-        while True:
-            page = self.fetch_events_page(start_date, end_date, cursor=cursor, page_size=page_size)
-            if not page["events"]:
-                break
-            yield page["events"]
-            if not page["has_more"]:
-                break
-            cursor = page["next_cursor"]
+        # The API has no server-side paging: fetch the range once and slice it, rather
+        # than going through fetch_events_page, which re-downloads the range per page.
+        rows = self.fetch_events(start_date, end_date)
+        size = max(1, int(page_size or len(rows) or 1))
+        for start in range(0, len(rows), size):
+            yield rows[start:start + size]
@@ -1,23 +1,33 @@
 from __future__ import annotations
 
+from functools import lru_cache
 from typing import Any, Dict, List
 from amplitude_service import AmplitudeService
 
 
+@lru_cache(maxsize=32)
+def _shared_amplitude_service(api_key: str, secret_key: str) -> AmplitudeService:
+    # Connectors are rebuilt per request; sharing the client keeps its pooled HTTP session warm.
+    return AmplitudeService(api_key=api_key, secret_key=secret_key)
+
+
 class AmplitudeConnector:
     connector_type = "amplitude"
 
     def __init__(self, config: Dict[str, Any]):
-        self.client = AmplitudeService(
-            api_key=config.get("api_key"),
-            secret_key=config.get("secret_key"),
-        )
+        api_key = config.get("api_key")
+        secret_key = config.get("secret_key")
+        if api_key and secret_key:
+            self.client = _shared_amplitude_service(api_key, secret_key)
+        else:
+            # Credentials fall back to the environment, which may change between calls.
+            self.client = AmplitudeService(api_key=api_key, secret_key=secret_key)
 
     def health_check(self) -> Dict[str, Any]:
         return {"ok": True, "connector": self.connector_type}
 
     def fetch_events(self, start_date: str, end_date: str) -> List[Dict[str, Any]]:
-        return self.client.export_events(start_date, end_date)
+        return list(self.client.export_events(start_date, end_date))
 
     def iter_event_pages(self, start_date: str, end_date: str, page_size: int | None = None):
         yield from self.client.iter_export_event_pages(start_date, end_date, page_size=page_size or 1000)
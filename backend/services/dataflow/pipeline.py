@@ -4,11 +4,13 @@ import argparse
 import json
 import logging
 import sqlite3
-from typing import Any, Dict, Iterable, List, Optional
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, List, Optional
 
 from bigquery_service import BigQueryService
 from event_semantic_normalizer import EventSemanticNormalizer
 from gcs_service import GcsService
+from json_encoder import fast_loads_lines
 from local_job_store import resolve_or_create_canonical_user_id
 from pipeline_models import PIPELINE_SCHEMA_VERSION, build_event_fingerprint, derive_event_date
 
@@ -45,8 +47,11 @@ class DataflowNormalizationRunner:
         event_name_map: Optional[Dict[str, str]] = None,
         property_key_map: Optional[Dict[str, str]] = None,
         use_local_identity_store: Optional[bool] = None,
+        should_stop: Optional[Callable[[], bool]] = None,
     ):
         self.gcs_service = gcs_service or GcsService()
+        # Checked between manifests; a stopped run returns early with "stopped" set in its summary.
+        self.should_stop = should_stop
         self.bigquery_service = bigquery_service or BigQueryService()
         self.normalizer = EventSemanticNormalizer(
             event_name_map=event_name_map or {},
@@ -103,7 +108,7 @@ class DataflowNormalizationRunner:
 
         valid_rows: List[Dict[str, Any]] = []
         dead_letters: List[Dict[str, Any]] = []
-        flag_counts: Dict[str, int] = {}
+        flag_counts: Counter = Counter()
 
         for event in normalized_events:
             source = str(event.get("source") or manifest["source"])
@@ -123,8 +128,7 @@ class DataflowNormalizationRunner:
             )
 
             flags = list(event.get("data_quality_flags") or [])
-            for flag in flags:
-                flag_counts[flag] = flag_counts.get(flag, 0) + 1
+            flag_counts.update(flags)
 
             if "missing_player_id" in flags or "invalid_event_time" in flags:
                 event["rejection_reason"] = "critical_quality_failure"
@@ -140,7 +144,7 @@ class DataflowNormalizationRunner:
                 "raw_normalized_events": len(normalized_events),
                 "events_staging_written": len(valid_rows),
                 "pipeline_dead_letters_written": len(dead_letters),
-                "flag_counts": flag_counts,
+                "flag_counts": dict(flag_counts),
             },
         }
 
@@ -167,6 +171,9 @@ class DataflowNormalizationRunner:
         }
         total_manifests = len(manifests)
         for payload in manifests:
+            if callable(self.should_stop) and self.should_stop():
+                summary["stopped"] = True
+                return summary
             stats = self.process_manifest(payload)
             summary["manifests_processed"] += 1
             summary["raw_normalized_events"] += stats["raw_normalized_events"]
@@ -195,14 +202,8 @@ class DataflowNormalizationRunner:
 
 
 def _load_jsonl(path: str) -> List[Dict[str, Any]]:
-    records: List[Dict[str, Any]] = []
-    with open(path, "r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            records.append(json.loads(line))
-    return records
+    with open(path, "rb") as f:
+        return fast_loads_lines(f)
 
 
 def main(argv: Optional[List[str]] = None) -> int:
@@ -1,7 +1,12 @@
 # engagement_executor.py
 
 from typing import Dict, Any, Optional
+import atexit
 import logging
+from logging.handlers import MemoryHandler, QueueHandler, QueueListener
+import os
+import queue
+import threading
 import uuid
 
 from engagement_channels import (
@@ -10,12 +15,49 @@ from engagement_channels import (
     BrazeAdapter,
 )
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    filename='engagement_actions.log',
-    filemode='a'
-)
+ACTION_LOG_PATH = 'engagement_actions.log'
+# Records are buffered in memory and written in batches; ERROR and above flush immediately.
+ACTION_LOG_BUFFER_CAPACITY = 1024
+
+_action_logger = logging.getLogger('engagement_actions')
+_action_log_listener: Optional[QueueListener] = None
+_action_log_lock = threading.Lock()
+
+
+def _get_action_logger() -> logging.Logger:
+    """
+    Returns the action logger, wiring it on first use to a background
+    QueueListener that owns the buffered file handler, so callers never
+    block on file writes.
+    """
+    global _action_log_listener
+    if _action_log_listener is not None:
+        return _action_logger
+
+    with _action_log_lock:
+        if _action_log_listener is None:
+            file_handler = logging.FileHandler(ACTION_LOG_PATH, mode='a', delay=True)
+            file_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+            buffered_handler = MemoryHandler(
+                capacity=ACTION_LOG_BUFFER_CAPACITY,
+                flushLevel=logging.ERROR,
+                target=file_handler,
+            )
+            log_queue: queue.Queue = queue.Queue(-1)
+            listener = QueueListener(log_queue, buffered_handler)
+            listener.start()
+
+            def _shutdown_action_log():
+                listener.stop()
+                buffered_handler.close()
+                file_handler.close()
+
+            atexit.register(_shutdown_action_log)
+            _action_logger.addHandler(QueueHandler(log_queue))
+            _action_logger.setLevel(logging.INFO)
+            _action_logger.propagate = False
+            _action_log_listener = listener
+    return _action_logger
 
 
 class EngagementExecutor:
@@ -24,6 +66,8 @@ class EngagementExecutor:
     """
 
     def __init__(self):
+        # Echoing every logged action to stdout is opt-in; the log file is the record.
+        self.echo_actions = os.getenv("ENGAGEMENT_LOG_ECHO", "false").strip().lower() in {"1", "true", "yes"}
         self.adapters = {
             "push_notification": PushSimulatorAdapter(),
             "email": SendGridEmailAdapter(),  # auto-fallback to simulator
@@ -67,5 +111,6 @@ class EngagementExecutor:
             f"Action {status} - ActionID: {action_id}, PlayerID: {player_id}, "
             f"Channel: {channel}, Provider: {provider}, Content: '{content}', Error: '{error or ''}'"
         )
-        logging.info(log_message)
-        print(f"LOGGED: {log_message}")
+        _get_action_logger().info(log_message)
+        if self.echo_actions:
+            print(f"LOGGED: {log_message}")
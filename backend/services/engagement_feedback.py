@@ -8,6 +8,11 @@ class EngagementFeedback:
     Simulates and retrieves player feedback for engagement actions.
     """
 
+    # Outcome distribution for the simulator (opened 40%, ignored 50%, returned 10%),
+    # stored as cumulative weights so random.choices skips re-accumulating per call.
+    _OUTCOMES = ("opened", "ignored", "returned_to_game")
+    _CUM_WEIGHTS = (0.4, 0.9, 1.0)
+
     def get_engagement_result(self, player_id: Any, action_id: str) -> Dict[str, Any]:
         """
         Simulates a player's response to a specific engagement action.
@@ -25,8 +30,7 @@ class EngagementFeedback:
         """
         # Simulate different outcomes based on random chance.
         # In a real-world scenario, these weights would be informed by actual data.
-        outcomes = ["opened", "ignored", "returned_to_game"]
-        simulated_outcome = random.choices(outcomes, weights=[0.4, 0.5, 0.1], k=1)[0]
+        simulated_outcome = random.choices(self._OUTCOMES, cum_weights=self._CUM_WEIGHTS, k=1)[0]
 
         feedback = {
             "player_id": player_id,
@@ -5,6 +5,9 @@ from __future__ import annotations
 from datetime import datetime
 from typing import List, Dict, Any
 
+import numpy as np
+import pandas as pd
+
 from pipeline_models import (
     PIPELINE_SCHEMA_VERSION,
     build_event_fingerprint,
@@ -12,6 +15,11 @@ from pipeline_models import (
 )
 
 
+PLAYER_ID_KEYS = (
+    "userId", "user_id", "user_Id", "player_id", "player_Id", "PlayerID", "PlayerId", "uid", "PID"
+)
+
+
 class EventSemanticNormalizer:
     """
     Cleans and normalizes raw event data from analytics platforms.
@@ -23,6 +31,9 @@ class EventSemanticNormalizer:
     def __init__(self, event_name_map: Dict[str, str], property_key_map: Dict[str, str]):
         self.event_name_map = event_name_map
         self.property_key_map = property_key_map
+        # With no renames configured (the default pipelines pass {} for both), the
+        # rename lookups are skipped; type coercion and quality checks still run.
+        self._is_identity = not event_name_map and not property_key_map
 
     def _normalize_event_name(self, event_name: str) -> str:
         if not event_name:
@@ -33,11 +44,33 @@ class EventSemanticNormalizer:
         if not isinstance(properties, dict):
             return {}
 
-        normalized_props = {}
-        for key, value in properties.items():
-            new_key = self.property_key_map.get(key, key)
-            normalized_props[new_key] = value
-        return normalized_props
+        if self._is_identity or not self.property_key_map:
+            return dict(properties)
+        get_key = self.property_key_map.get
+        return {get_key(key, key): value for key, value in properties.items()}
+
+    def _normalize_event_names(self, events: List[Any]) -> np.ndarray:
+        """
+        Resolves event names for a whole batch. Names are dictionary-encoded with
+        pandas.factorize so each distinct name is looked up once, then expanded
+        back to one entry per event with a single take.
+        """
+        raw_names = [
+            (event.get('event_type') or event.get('event_name') or None) if isinstance(event, dict) else None
+            for event in events
+        ]
+        if self._is_identity or not self.event_name_map:
+            return np.array(
+                [str(name) if name is not None else "unknown_event" for name in raw_names],
+                dtype=object,
+            )
+        codes, uniques = pd.factorize(pd.Series(raw_names, dtype=object).map(str, na_action='ignore'))
+        lookup = np.array(
+            [self._normalize_event_name(name) for name in uniques] + [self._normalize_event_name(None)],
+            dtype=object,
+        )
+        # factorize marks missing names with -1, which indexes the trailing "unknown" entry.
+        return lookup[codes]
 
     def _to_iso(self, ts: Any) -> tuple[str, bool]:
         if ts is None:
@@ -71,19 +104,23 @@ class EventSemanticNormalizer:
         if not events:
             return []
 
-        player_id_keys = {
-            "userId", "user_id", "user_Id", "player_id", "player_Id", "PlayerID", "PlayerId", "uid", "PID"
-        }
+        event_types = self._normalize_event_names(events)
+
+        # Bound once per batch; these are called for every event below.
+        normalize_properties = self._normalize_properties
+        to_iso = self._to_iso
+        to_float = self._to_float
 
         normalized_events = []
-        for event in events:
+        append_event = normalized_events.append
+        for position, event in enumerate(events):
             if not isinstance(event, dict):
                 continue
 
             new_event = event.copy()
             quality_flags: list[str] = []
 
-            for key in player_id_keys:
+            for key in PLAYER_ID_KEYS:
                 if key in new_event and new_event.get(key) not in (None, ""):
                     new_event['player_id'] = new_event.pop(key)
                     break
@@ -92,19 +129,19 @@ class EventSemanticNormalizer:
                 new_event["player_id"] = "unknown_user"
                 quality_flags.append("missing_player_id")
 
-            new_event['event_type'] = self._normalize_event_name(new_event.get('event_type') or new_event.get('event_name'))
+            new_event['event_type'] = event_types[position]
 
-            props = self._normalize_properties(new_event.get('event_properties', {}))
-            user_props = self._normalize_properties(new_event.get('user_properties', {}))
+            props = normalize_properties(new_event.get('event_properties', {}))
+            user_props = normalize_properties(new_event.get('user_properties', {}))
 
-            event_time_iso, valid_time = self._to_iso(new_event.get("event_time") or new_event.get("timestamp") or new_event.get("time"))
+            event_time_iso, valid_time = to_iso(new_event.get("event_time") or new_event.get("timestamp") or new_event.get("time"))
             new_event["event_time"] = event_time_iso
             if not valid_time:
                 quality_flags.append("invalid_event_time")
 
             # revenue coercion
             raw_revenue = props.get("revenue_usd", props.get("revenue", props.get("value")))
-            revenue, ok_rev = self._to_float(raw_revenue)
+            revenue, ok_rev = to_float(raw_revenue)
             if raw_revenue is not None and not ok_rev:
                 quality_flags.append("malformed_revenue")
             if revenue is not None:
@@ -121,7 +158,7 @@ class EventSemanticNormalizer:
             new_event['event_date'] = derive_event_date(new_event["event_time"])
             new_event['event_fingerprint'] = build_event_fingerprint(new_event)
 
-            normalized_events.append(new_event)
+            append_event(new_event)
 
         print(f"Normalized {len(normalized_events)} events.")
         return normalized_events
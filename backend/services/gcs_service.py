@@ -1,8 +1,25 @@
 # gcs_service.py
 
+import gzip
+import io
+import logging
 import os
-import json
-from typing import List, Dict, Any
+from contextlib import contextmanager
+from typing import BinaryIO, List, Dict, Any, Iterable, Iterator
+
+from json_encoder import fast_dumps_line, fast_loads, fast_loads_lines
+
+logger = logging.getLogger(__name__)
+
+# Buffer size for local shard writes; large buffers keep the write path syscall-light.
+WRITE_BUFFER_BYTES = 1 << 20
+# Approximate bytes of JSON lines decoded per batch when streaming a shard.
+READ_BATCH_BYTES = 4 << 20
+# Resumable-upload chunk size for GCS blob writers (must be a multiple of 256 KiB).
+UPLOAD_CHUNK_BYTES = 8 << 20
+# Level 1 trades a little ratio for near-copy speed on gzip-compressed local shards.
+MOCK_SHARD_COMPRESSLEVEL = 1
+_GZIP_MAGIC = b"\x1f\x8b"
 
 
 class GcsService:
@@ -20,10 +37,10 @@ class GcsService:
         self.bucket_name = os.getenv("GCS_BUCKET_NAME", bucket_name)
         if self.mode == "gcp":
             self._init_gcp_backend()
-            print(f"GcsService initialized in GCP mode (bucket: {self.bucket_name}).")
+            logger.info("GcsService initialized in GCP mode (bucket: %s).", self.bucket_name)
         else:
             self._init_mock_backend()
-            print(f"GcsService initialized in MOCK mode (bucket path: {self._bucket_path}).")
+            logger.info("GcsService initialized in MOCK mode (bucket path: %s).", self._bucket_path)
 
     def _init_gcp_backend(self):
         try:
@@ -41,26 +58,19 @@ class GcsService:
         self._bucket_path = os.path.join(".cache", "raw", self.bucket_name)
         self._legacy_bucket_path = os.path.join(".gcs_bucket", self.bucket_name)
         os.makedirs(self._bucket_path, exist_ok=True)
+        # Raw exports are highly repetitive JSON and shrink several-fold under gzip.
+        self._compress_shards = os.getenv("GCS_MOCK_GZIP_SHARDS", "false").strip().lower() in {"1", "true", "yes"}
 
-    def _encode_raw_events(self, events: List[Dict[str, Any]]) -> str:
-        return "\n".join(json.dumps(event) for event in events)
-
-    def _decode_raw_events(self, payload: str) -> List[Dict[str, Any]]:
+    def _decode_raw_events(self, payload: bytes) -> List[Dict[str, Any]]:
         stripped = payload.strip()
         if not stripped:
             return []
 
-        if stripped.startswith("["):
-            parsed = json.loads(stripped)
+        if stripped.startswith(b"["):
+            parsed = fast_loads(stripped)
             return parsed if isinstance(parsed, list) else []
 
-        events = []
-        for line in stripped.splitlines():
-            line = line.strip()
-            if not line:
-                continue
-            events.append(json.loads(line))
-        return events
+        return fast_loads_lines(stripped.splitlines())
 
     def _resolve_mock_blob_path(self, blob_name: str) -> str:
         candidate_paths = [
@@ -72,37 +82,115 @@ class GcsService:
                 return path
         return candidate_paths[0]
 
-    def upload_raw_events(self, events: List[Dict[str, Any]], destination_blob_name: str) -> str:
-        if not events:
-            return ""
-
-        payload = self._encode_raw_events(events)
+    @contextmanager
+    def open_blob_writer(self, blob_name: str) -> Iterator[BinaryIO]:
+        """
+        Opens a binary writer for a raw blob. In GCP mode this is a resumable
+        upload, so payloads are streamed in chunks rather than built in memory.
+        Local shards are written under a temporary name and renamed into place
+        once complete, so an interrupted write never leaves a truncated shard.
+        """
         if self.mode == "gcp":
-            blob = self._bucket.blob(destination_blob_name)
-            blob.upload_from_string(payload, content_type="application/x-ndjson")
-            gcs_path = f"gs://{self.bucket_name}/{destination_blob_name}"
-            print(f"Uploaded {len(events)} events to GCS at: {gcs_path}")
-            return gcs_path
+            blob = self._bucket.blob(blob_name)
+            with blob.open("wb", content_type="application/x-ndjson", chunk_size=UPLOAD_CHUNK_BYTES) as writer:
+                yield writer
+            return
 
-        file_path = os.path.join(self._bucket_path, destination_blob_name)
+        file_path = os.path.join(self._bucket_path, blob_name)
+        temp_path = f"{file_path}.tmp"
         os.makedirs(os.path.dirname(file_path), exist_ok=True)
-        with open(file_path, "w") as f:
-            f.write(payload)
+        try:
+            with self._open_mock_writer(temp_path) as writer:
+                yield writer
+        except BaseException:
+            try:
+                os.unlink(temp_path)
+            except FileNotFoundError:
+                pass
+            raise
+        os.replace(temp_path, file_path)
+
+    def _open_mock_writer(self, file_path: str) -> BinaryIO:
+        if not self._compress_shards:
+            return open(file_path, "wb", buffering=WRITE_BUFFER_BYTES)
+        return io.BufferedWriter(
+            gzip.open(file_path, "wb", compresslevel=MOCK_SHARD_COMPRESSLEVEL),
+            buffer_size=WRITE_BUFFER_BYTES,
+        )
+
+    @staticmethod
+    def _open_mock_shard(file_path: str) -> BinaryIO:
+        """Opens a local shard for reading, transparently decompressing gzip shards."""
+        f = open(file_path, "rb")
+        if f.read(2) != _GZIP_MAGIC:
+            # Shards written before compression was introduced are plain JSON.
+            f.seek(0)
+            return f
+        f.close()
+        return io.BufferedReader(gzip.open(file_path, "rb"), buffer_size=READ_BATCH_BYTES)
+
+    def upload_raw_events(self, events: Iterable[Dict[str, Any]], destination_blob_name: str) -> str:
+        """
+        Writes events to a JSONL blob one record at a time. Returns the gs:// path,
+        or an empty string when there are no events.
+        """
+        event_iter = iter(events)
+        first_event = next(event_iter, None)
+        if first_event is None:
+            return ""
+
+        event_count = 1
+        with self.open_blob_writer(destination_blob_name) as writer:
+            writer.write(fast_dumps_line(first_event))
+            for event in event_iter:
+                writer.write(fast_dumps_line(event))
+                event_count += 1
 
         gcs_path = f"gs://{self.bucket_name}/{destination_blob_name}"
-        print(f"Uploaded {len(events)} events to local GCS mock at: {gcs_path}")
+        if self.mode == "gcp":
+            logger.info("Uploaded %d events to GCS at: %s", event_count, gcs_path)
+        else:
+            logger.info("Uploaded %d events to local GCS mock at: %s", event_count, gcs_path)
         return gcs_path
 
-    def download_raw_events(self, blob_name: str) -> List[Dict[str, Any]]:
+    def iter_raw_event_batches(self, blob_name: str) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Yields the events of a raw shard in bounded batches. Local JSONL shards are
+        read incrementally so the whole shard is never parsed in one shot.
+        """
         if self.mode == "gcp":
             blob = self._bucket.blob(blob_name)
             if not blob.exists():
                 raise FileNotFoundError(f"Blob not found in GCS: {blob_name}")
-            return self._decode_raw_events(blob.download_as_text())
+            events = self._decode_raw_events(blob.download_as_bytes())
+            if events:
+                yield events
+            return
 
         file_path = self._resolve_mock_blob_path(blob_name)
-        with open(file_path, "r") as f:
-            return self._decode_raw_events(f.read())
+        with self._open_mock_shard(file_path) as f:
+            if f.read(64).lstrip().startswith(b"["):
+                # Legacy shards were written as a single JSON array.
+                f.seek(0)
+                events = self._decode_raw_events(f.read())
+                if events:
+                    yield events
+                return
+
+            f.seek(0)
+            while True:
+                lines = f.readlines(READ_BATCH_BYTES)
+                if not lines:
+                    break
+                events = fast_loads_lines(lines)
+                if events:
+                    yield events
+
+    def download_raw_events(self, blob_name: str) -> List[Dict[str, Any]]:
+        events: List[Dict[str, Any]] = []
+        for batch in self.iter_raw_event_batches(blob_name):
+            events.extend(batch)
+        return events
 
     def delete_data_for_job(self, job_identifier: str):
         """
@@ -114,17 +202,33 @@ class GcsService:
                 if job_fragment not in f"/{blob.name}":
                     continue
                 blob.delete()
-                print(f"Deleted blob '{blob.name}' from GCS.")
+                logger.info("Deleted blob '%s' from GCS.", blob.name)
             return
 
         for root in (self._bucket_path, self._legacy_bucket_path):
-            if not os.path.isdir(root):
+            prefix_len = len(root) + 1
+            for file_to_delete in self._iter_local_files(root):
+                rel_path = file_to_delete[prefix_len:]
+                if job_fragment not in f"/{rel_path}":
+                    continue
+                try:
+                    os.unlink(file_to_delete)
+                except FileNotFoundError:
+                    continue
+                logger.info("Deleted blob '%s' from local GCS mock.", rel_path)
+
+    @staticmethod
+    def _iter_local_files(root: str) -> Iterator[str]:
+        """Yields every file path under root using one scandir pass per directory."""
+        pending = [root]
+        while pending:
+            try:
+                entries = os.scandir(pending.pop())
+            except FileNotFoundError:
                 continue
-            for current_root, _, filenames in os.walk(root):
-                for filename in filenames:
-                    file_to_delete = os.path.join(current_root, filename)
-                    rel_path = os.path.relpath(file_to_delete, root)
-                    if job_fragment not in f"/{rel_path}":
-                        continue
-                    os.remove(file_to_delete)
-                    print(f"Deleted blob '{rel_path}' from local GCS mock.")
+            with entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                    else:
+                        yield entry.path
@@ -3,12 +3,36 @@
 import os
 import json
 import hashlib
+import re
+import threading
 import time
+from collections import OrderedDict
 from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
 from datetime import datetime
 import google.generativeai as genai
 
 from app.core.runtime import is_shutdown_requested
+from json_encoder import fast_loads, locked_json_file, read_json_file
+
+# Errors an AI call site should recover from with its heuristic fallback:
+# GeminiClient raises RuntimeError for shutdown, budget, circuit-breaker and
+# retry exhaustion (API errors are wrapped), OSError for its local cache files,
+# and response parsing raises ValueError (JSON decode or schema mismatch).
+AI_RESPONSE_ERRORS = (RuntimeError, OSError, ValueError)
+
+# Matches a Markdown code fence (optionally tagged json) at either end of a response.
+_FENCE_RE = re.compile(r"^\s*```(?:json)?\s*|\s*```\s*$")
+
+
+def parse_json_response(response_text: str):
+    """
+    Parses a JSON model response. Responses requested with the JSON mime type are
+    parsed directly; fenced Markdown is stripped in a single pass otherwise.
+    """
+    try:
+        return fast_loads(response_text)
+    except ValueError:
+        return fast_loads(_FENCE_RE.sub("", response_text))
 
 class GeminiClient:
     """
@@ -27,11 +51,20 @@ class GeminiClient:
         # Use the model from environment variable, or default to 'gemini-2.5-flash'
         model_name = (model_name or os.getenv("GOOGLE_GEMINI_MODEL") or "gemini-2.5-flash").strip()
         self.model_name = model_name
-        self.model = genai.GenerativeModel(model_name)
+        # Every caller parses the response as JSON, so ask for it directly instead of fenced Markdown.
+        self.json_responses = os.getenv("GOOGLE_GEMINI_JSON_RESPONSES", "true").lower() in ("1", "true", "yes")
+        generation_config = {"response_mime_type": "application/json"} if self.json_responses else None
+        self.model = genai.GenerativeModel(model_name, generation_config=generation_config)
         self._cache_path = ".cache/llm_response_cache.json"
         self._usage_path = ".cache/llm_usage.json"
         self._circuit_path = ".cache/llm_circuit_breaker.json"
         self._cache_ttl_seconds = int(os.getenv("AI_RESPONSE_CACHE_TTL_SEC", "21600"))
+        # In-process LRU copy of cache entries already read or written, so repeated prompts
+        # skip re-reading the whole cache file. Entries keep their TTL.
+        self._memory_cache_size = max(0, int(os.getenv("AI_RESPONSE_MEMORY_CACHE_SIZE", "100000")))
+        self._memory_cache: "OrderedDict[str, dict]" = OrderedDict()
+        # The client is shared by every prediction job in the process.
+        self._memory_cache_lock = threading.Lock()
         self._daily_token_limit = self._read_int_env("AI_DAILY_TOKEN_LIMIT")
         self._monthly_token_limit = self._read_int_env("AI_MONTHLY_TOKEN_LIMIT")
         self._daily_budget_limit = self._read_float_env("AI_DAILY_BUDGET_LIMIT_USD")
@@ -78,9 +111,8 @@ class GeminiClient:
 
     def get_usage_snapshot(self) -> dict:
         """Returns current daily/monthly usage counters and configured limits."""
-        usage = self._load_usage()
-        self._rollover_usage_if_needed(usage)
-        self._save_usage(usage)
+        with self._locked_usage() as usage:
+            self._rollover_usage_if_needed(usage)
         return {
             "model_name": self.model_name,
             "daily_tokens_used": usage.get("daily_tokens_used", 0),
@@ -130,22 +162,32 @@ class GeminiClient:
         return digest.hexdigest()
 
     def _load_cache(self) -> dict:
-        if not os.path.exists(self._cache_path):
-            return {}
+        # A missing cache file surfaces as FileNotFoundError (an OSError) from the read.
         try:
-            with open(self._cache_path, "r") as f:
-                return json.load(f)
+            return read_json_file(self._cache_path)
         except (json.JSONDecodeError, OSError):
             return {}
 
-    def _save_cache(self, cache: dict):
-        os.makedirs(os.path.dirname(self._cache_path), exist_ok=True)
-        with open(self._cache_path, "w") as f:
-            json.dump(cache, f)
+    def _get_memory_cached_entry(self, prompt_hash: str):
+        with self._memory_cache_lock:
+            entry = self._memory_cache.get(prompt_hash)
+            if entry is not None:
+                self._memory_cache.move_to_end(prompt_hash)
+            return entry
+
+    def _set_memory_cached_entry(self, prompt_hash: str, entry: dict):
+        if self._memory_cache_size == 0:
+            return
+        with self._memory_cache_lock:
+            self._memory_cache[prompt_hash] = entry
+            self._memory_cache.move_to_end(prompt_hash)
+            while len(self._memory_cache) > self._memory_cache_size:
+                self._memory_cache.popitem(last=False)
 
     def _get_cached_response(self, prompt_hash: str):
-        cache = self._load_cache()
-        entry = cache.get(prompt_hash)
+        entry = self._get_memory_cached_entry(prompt_hash)
+        if entry is None:
+            entry = self._load_cache().get(prompt_hash)
         if not entry:
             return None
 
@@ -159,16 +201,20 @@ class GeminiClient:
 
         age_seconds = (datetime.utcnow() - created_dt).total_seconds()
         if age_seconds > self._cache_ttl_seconds:
+            with self._memory_cache_lock:
+                self._memory_cache.pop(prompt_hash, None)
             return None
+        self._set_memory_cached_entry(prompt_hash, entry)
         return entry.get("response")
 
     def _set_cached_response(self, prompt_hash: str, response: str):
-        cache = self._load_cache()
-        cache[prompt_hash] = {
+        entry = {
             "created_at": datetime.utcnow().isoformat(),
             "response": response,
         }
-        self._save_cache(cache)
+        with locked_json_file(self._cache_path) as cache:
+            cache[prompt_hash] = entry
+        self._set_memory_cached_entry(prompt_hash, entry)
 
     def _estimate_tokens(self, text: str) -> int:
         # Approximation for quick budget protection: 1 token ~= 4 chars.
@@ -176,33 +222,19 @@ class GeminiClient:
             return 0
         return max(1, int(len(text) / 4))
 
-    def _load_usage(self) -> dict:
-        if not os.path.exists(self._usage_path):
-            return {
-                "daily_date": datetime.utcnow().strftime("%Y-%m-%d"),
-                "monthly_period": datetime.utcnow().strftime("%Y-%m"),
-                "daily_tokens_used": 0,
-                "monthly_tokens_used": 0,
-                "daily_budget_used_usd": 0.0,
-                "monthly_budget_used_usd": 0.0,
-            }
-        try:
-            with open(self._usage_path, "r") as f:
-                return json.load(f)
-        except (json.JSONDecodeError, OSError):
-            return {
-                "daily_date": datetime.utcnow().strftime("%Y-%m-%d"),
-                "monthly_period": datetime.utcnow().strftime("%Y-%m"),
-                "daily_tokens_used": 0,
-                "monthly_tokens_used": 0,
-                "daily_budget_used_usd": 0.0,
-                "monthly_budget_used_usd": 0.0,
-            }
+    @staticmethod
+    def _empty_usage() -> dict:
+        return {
+            "daily_date": datetime.utcnow().strftime("%Y-%m-%d"),
+            "monthly_period": datetime.utcnow().strftime("%Y-%m"),
+            "daily_tokens_used": 0,
+            "monthly_tokens_used": 0,
+            "daily_budget_used_usd": 0.0,
+            "monthly_budget_used_usd": 0.0,
+        }
 
-    def _save_usage(self, usage: dict):
-        os.makedirs(os.path.dirname(self._usage_path), exist_ok=True)
-        with open(self._usage_path, "w") as f:
-            json.dump(usage, f, indent=2)
+    def _locked_usage(self):
+        return locked_json_file(self._usage_path, default_factory=self._empty_usage, indent=True)
 
     def _rollover_usage_if_needed(self, usage: dict):
         now = datetime.utcnow()
@@ -219,35 +251,32 @@ class GeminiClient:
             usage["monthly_budget_used_usd"] = 0.0
 
     def _enforce_limits(self, incoming_tokens: int):
-        usage = self._load_usage()
-        self._rollover_usage_if_needed(usage)
-
-        projected_daily_tokens = usage.get("daily_tokens_used", 0) + incoming_tokens
-        projected_monthly_tokens = usage.get("monthly_tokens_used", 0) + incoming_tokens
-        projected_daily_budget = usage.get("daily_budget_used_usd", 0.0) + (incoming_tokens / 1000.0) * self._usd_per_1k_tokens
-        projected_monthly_budget = usage.get("monthly_budget_used_usd", 0.0) + (incoming_tokens / 1000.0) * self._usd_per_1k_tokens
-
-        if self._daily_token_limit is not None and projected_daily_tokens > self._daily_token_limit:
-            raise RuntimeError("AI daily token limit reached.")
-        if self._monthly_token_limit is not None and projected_monthly_tokens > self._monthly_token_limit:
-            raise RuntimeError("AI monthly token limit reached.")
-        if self._daily_budget_limit is not None and projected_daily_budget > self._daily_budget_limit:
-            raise RuntimeError("AI daily budget limit reached.")
-        if self._monthly_budget_limit is not None and projected_monthly_budget > self._monthly_budget_limit:
-            raise RuntimeError("AI monthly budget limit reached.")
-
-        self._save_usage(usage)
+        with self._locked_usage() as usage:
+            self._rollover_usage_if_needed(usage)
+
+            projected_daily_tokens = usage.get("daily_tokens_used", 0) + incoming_tokens
+            projected_monthly_tokens = usage.get("monthly_tokens_used", 0) + incoming_tokens
+            projected_daily_budget = usage.get("daily_budget_used_usd", 0.0) + (incoming_tokens / 1000.0) * self._usd_per_1k_tokens
+            projected_monthly_budget = usage.get("monthly_budget_used_usd", 0.0) + (incoming_tokens / 1000.0) * self._usd_per_1k_tokens
+
+            if self._daily_token_limit is not None and projected_daily_tokens > self._daily_token_limit:
+                raise RuntimeError("AI daily token limit reached.")
+            if self._monthly_token_limit is not None and projected_monthly_tokens > self._monthly_token_limit:
+                raise RuntimeError("AI monthly token limit reached.")
+            if self._daily_budget_limit is not None and projected_daily_budget > self._daily_budget_limit:
+                raise RuntimeError("AI daily budget limit reached.")
+            if self._monthly_budget_limit is not None and projected_monthly_budget > self._monthly_budget_limit:
+                raise RuntimeError("AI monthly budget limit reached.")
 
     def _record_usage(self, total_tokens: int):
-        usage = self._load_usage()
-        self._rollover_usage_if_needed(usage)
-        usage["daily_tokens_used"] = int(usage.get("daily_tokens_used", 0) + total_tokens)
-        usage["monthly_tokens_used"] = int(usage.get("monthly_tokens_used", 0) + total_tokens)
+        with self._locked_usage() as usage:
+            self._rollover_usage_if_needed(usage)
+            usage["daily_tokens_used"] = int(usage.get("daily_tokens_used", 0) + total_tokens)
+            usage["monthly_tokens_used"] = int(usage.get("monthly_tokens_used", 0) + total_tokens)
 
-        estimated_cost = (total_tokens / 1000.0) * self._usd_per_1k_tokens
-        usage["daily_budget_used_usd"] = float(usage.get("daily_budget_used_usd", 0.0) + estimated_cost)
-        usage["monthly_budget_used_usd"] = float(usage.get("monthly_budget_used_usd", 0.0) + estimated_cost)
-        self._save_usage(usage)
+            estimated_cost = (total_tokens / 1000.0) * self._usd_per_1k_tokens
+            usage["daily_budget_used_usd"] = float(usage.get("daily_budget_used_usd", 0.0) + estimated_cost)
+            usage["monthly_budget_used_usd"] = float(usage.get("monthly_budget_used_usd", 0.0) + estimated_cost)
 
     def _generate_with_retry(self, prompt: str):
         attempts = max(1, self._max_retries + 1)
@@ -278,23 +307,22 @@ class GeminiClient:
                 raise RuntimeError("Gemini request timed out.")
 
     def _load_circuit_state(self) -> dict:
-        if not os.path.exists(self._circuit_path):
-            return {"failure_count": 0, "open_until": None, "last_error": None}
         try:
-            with open(self._circuit_path, "r") as f:
-                data = json.load(f)
-                return {
-                    "failure_count": int(data.get("failure_count", 0)),
-                    "open_until": data.get("open_until"),
-                    "last_error": data.get("last_error"),
-                }
+            data = read_json_file(self._circuit_path)
+            return {
+                "failure_count": int(data.get("failure_count", 0)),
+                "open_until": data.get("open_until"),
+                "last_error": data.get("last_error"),
+            }
         except (json.JSONDecodeError, OSError, ValueError):
             return {"failure_count": 0, "open_until": None, "last_error": None}
 
-    def _save_circuit_state(self, state: dict):
-        os.makedirs(os.path.dirname(self._circuit_path), exist_ok=True)
-        with open(self._circuit_path, "w") as f:
-            json.dump(state, f, indent=2)
+    def _locked_circuit_state(self):
+        return locked_json_file(
+            self._circuit_path,
+            default_factory=lambda: {"failure_count": 0, "open_until": None, "last_error": None},
+            indent=True,
+        )
 
     def _get_circuit_snapshot(self) -> dict:
         state = self._load_circuit_state()
@@ -322,20 +350,20 @@ class GeminiClient:
             )
 
     def _record_circuit_success(self):
-        state = self._load_circuit_state()
-        state["failure_count"] = 0
-        state["open_until"] = None
-        state["last_error"] = None
-        self._save_circuit_state(state)
+        with self._locked_circuit_state() as state:
+            state["failure_count"] = 0
+            state["open_until"] = None
+            state["last_error"] = None
 
     def _record_circuit_failure(self, error_message: str):
-        state = self._load_circuit_state()
-        failure_count = int(state.get("failure_count", 0)) + 1
-        state["failure_count"] = failure_count
-        state["last_error"] = error_message
-
-        if failure_count >= max(1, self._circuit_failure_threshold):
-            open_until = datetime.utcnow().timestamp() + max(1, self._circuit_open_sec)
-            state["open_until"] = datetime.utcfromtimestamp(open_until).isoformat()
-
-        self._save_circuit_state(state)
+        with self._locked_circuit_state() as state:
+            try:
+                failure_count = int(state.get("failure_count", 0)) + 1
+            except (TypeError, ValueError):
+                failure_count = 1
+            state["failure_count"] = failure_count
+            state["last_error"] = error_message
+
+            if failure_count >= max(1, self._circuit_failure_threshold):
+                open_until = datetime.utcnow().timestamp() + max(1, self._circuit_open_sec)
+                state["open_until"] = datetime.utcfromtimestamp(open_until).isoformat()
@@ -1,9 +1,136 @@
 # growth_decision_engine.py
 
-from typing import Dict, Any, Optional
-import json
-from gemini_client import GeminiClient
-from json_encoder import NpEncoder
+from typing import Callable, Dict, Any, List, Optional, Tuple
+import hashlib
+import logging
+import os
+import textwrap
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from gemini_client import AI_RESPONSE_ERRORS, GeminiClient, parse_json_response
+from json_encoder import fast_dumps_text
+
+logger = logging.getLogger(__name__)
+
+try:
+    import msgspec
+except ImportError:  # msgspec is optional; responses are then validated by hand.
+    msgspec = None
+
+ACTION_RESPONSE_FIELDS = ("decision", "channel", "content")
+
+if msgspec is not None:
+    class ActionResponse(msgspec.Struct):
+        """Schema of the action object Gemini is asked to return."""
+        decision: str
+        channel: str
+        content: str
+
+    class IndexedActionResponse(ActionResponse):
+        index: int
+
+    _ACTION_DECODER = msgspec.json.Decoder(ActionResponse)
+    _ACTION_BATCH_DECODER = msgspec.json.Decoder(List[IndexedActionResponse])
+else:
+    _ACTION_DECODER = None
+    _ACTION_BATCH_DECODER = None
+
+
+def _validated_action(candidate: Any, indexed: bool = False) -> Dict[str, Any]:
+    if not isinstance(candidate, dict):
+        raise ValueError("AI action response is not a JSON object.")
+    fields = ACTION_RESPONSE_FIELDS + (("index",) if indexed else ())
+    action = {}
+    for field in fields:
+        value = candidate.get(field)
+        expected_type = int if field == "index" else str
+        if not isinstance(value, expected_type) or isinstance(value, bool):
+            raise ValueError(f"AI action response field '{field}' is missing or not a {expected_type.__name__}.")
+        action[field] = value
+    return action
+
+
+def parse_action_response(response_text: str) -> Dict[str, Any]:
+    """
+    Decodes one action object into a dict with decision, channel and content,
+    raising ValueError when the response does not match that schema.
+    """
+    if _ACTION_DECODER is not None:
+        try:
+            decoded = _ACTION_DECODER.decode(response_text)
+            return {field: getattr(decoded, field) for field in ACTION_RESPONSE_FIELDS}
+        except msgspec.DecodeError:
+            pass  # e.g. a fenced response; the tolerant path below strips fences and re-validates.
+    return _validated_action(parse_json_response(response_text))
+
+
+def parse_action_batch_response(response_text: str) -> List[Dict[str, Any]]:
+    """Like parse_action_response for a JSON array of index-tagged actions."""
+    if _ACTION_BATCH_DECODER is not None:
+        try:
+            decoded = _ACTION_BATCH_DECODER.decode(response_text)
+            return [
+                {field: getattr(item, field) for field in ACTION_RESPONSE_FIELDS + ("index",)}
+                for item in decoded
+            ]
+        except msgspec.DecodeError:
+            pass
+    candidates = parse_json_response(response_text)
+    if not isinstance(candidates, list):
+        raise ValueError("AI batch response is not a JSON array.")
+    return [_validated_action(candidate, indexed=True) for candidate in candidates]
+
+# Per-player or time-varying fields left out of the decision cache key, so players
+# with the same behavioural context share one generated action.
+DECISION_CACHE_VOLATILE_KEYS = frozenset(
+    {"player_id", "email", "first_seen_date", "last_seen_date", "reason"}
+)
+DECISION_CACHE_FLOAT_DIGITS = 3
+# Players packed into one Gemini request by decide_next_actions_batch, and how
+# many of those requests may be in flight at once across all callers of an engine.
+DECISION_BATCH_SIZE = 16
+DECISION_BATCH_CONCURRENCY = 4
+
+
+CHURN_REDUCTION_PROMPT_TEMPLATE = textwrap.dedent("""
+    As a world-class AI Growth Operator for a mobile game, your goal is to reduce player churn.
+    Based on the player's profile and churn analysis, devise the best engagement action.
+
+    Generate a personalized, concise, and engaging message for a push notification. The message should be friendly and enticing.
+
+    Provide your response as a JSON object with three keys: "decision" (string: "ACT"), "channel" (string: "push_notification"), and "content" (string: the message you generated).
+
+    Player profile and churn analysis:
+    {payload}
+""").strip()
+
+CHURN_REDUCTION_BATCH_PROMPT_TEMPLATE = textwrap.dedent("""
+    As a world-class AI Growth Operator for a mobile game, your goal is to reduce player churn.
+    For each player below, use their profile and churn analysis to devise the best engagement action.
+
+    Generate a personalized, concise, and engaging message for a push notification for each player. Each message should be friendly and enticing.
+
+    Provide your response as a JSON array with exactly {player_count} objects, in the same order as the players. Each object must have four keys: "index" (integer: the player's index), "decision" (string: "ACT"), "channel" (string: "push_notification"), and "content" (string: the message you generated).
+
+    Players:
+    {payload}
+""").strip()
+
+
+def _canonicalize(value: Any) -> Any:
+    if isinstance(value, dict):
+        return [
+            [str(key), _canonicalize(item)]
+            for key, item in sorted(value.items(), key=lambda pair: str(pair[0]))
+            if key not in DECISION_CACHE_VOLATILE_KEYS
+        ]
+    if isinstance(value, (list, tuple)):
+        return [_canonicalize(item) for item in value]
+    if isinstance(value, float):
+        return round(value, DECISION_CACHE_FLOAT_DIGITS)
+    return value
 
 class GrowthDecisionEngine:
     """
@@ -13,6 +140,54 @@ class GrowthDecisionEngine:
 
     def __init__(self, gemini_client: Optional[GeminiClient]):
         self.ai_client = gemini_client
+        self._decision_cache_enabled = os.getenv("AI_DECISION_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+        self._decision_cache_size = max(0, int(os.getenv("AI_DECISION_CACHE_SIZE", "1024")))
+        self._decision_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # One engine serves every worker thread of a prediction job.
+        self._decision_cache_lock = threading.Lock()
+        self._batch_size = max(1, int(os.getenv("AI_DECISION_BATCH_SIZE", str(DECISION_BATCH_SIZE))))
+        self._batch_concurrency = max(1, int(os.getenv("AI_DECISION_BATCH_CONCURRENCY", str(DECISION_BATCH_CONCURRENCY))))
+        # Shared by every caller, so prediction workers calling decide_next_actions_batch
+        # concurrently still have at most _batch_concurrency batch requests in flight.
+        self._batch_executor: Optional[ThreadPoolExecutor] = None
+        self._batch_executor_lock = threading.Lock()
+        # Objective name -> strategy taking (player_profile, churn_estimate).
+        self._strategies: Dict[str, Callable[[Dict[str, Any], Dict[str, Any]], Optional[Dict[str, Any]]]] = {
+            "reduce_churn": self._decide_churn_reduction_action,
+        }
+
+    def _get_batch_executor(self) -> ThreadPoolExecutor:
+        with self._batch_executor_lock:
+            if self._batch_executor is None:
+                self._batch_executor = ThreadPoolExecutor(
+                    max_workers=self._batch_concurrency,
+                    thread_name_prefix="decision-batch",
+                )
+            return self._batch_executor
+
+    def _decision_cache_key(self, player_profile: Dict[str, Any], churn_estimate: Dict[str, Any]) -> str:
+        digest = hashlib.sha256()
+        digest.update(str(getattr(self.ai_client, "model_name", "")).encode("utf-8"))
+        digest.update(b":")
+        digest.update(fast_dumps_text([_canonicalize(player_profile), _canonicalize(churn_estimate)]).encode("utf-8"))
+        return digest.hexdigest()
+
+    def _get_cached_decision(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        with self._decision_cache_lock:
+            cached = self._decision_cache.get(cache_key)
+            if cached is None:
+                return None
+            self._decision_cache.move_to_end(cache_key)
+            return dict(cached)
+
+    def _set_cached_decision(self, cache_key: str, action: Dict[str, Any]):
+        if self._decision_cache_size == 0:
+            return
+        with self._decision_cache_lock:
+            self._decision_cache[cache_key] = dict(action)
+            self._decision_cache.move_to_end(cache_key)
+            while len(self._decision_cache) > self._decision_cache_size:
+                self._decision_cache.popitem(last=False)
 
     def decide_next_action(
         self,
@@ -26,11 +201,112 @@ class GrowthDecisionEngine:
         if not player_profile or not churn_estimate:
             return None
 
-        if objective == 'reduce_churn':
-            return self._decide_churn_reduction_action(player_profile, churn_estimate)
+        strategy = self._strategies.get(objective)
+        if strategy is None:
+            logger.warning("Objective '%s' not recognized. No action taken.", objective)
+            return None
+        return strategy(player_profile, churn_estimate)
+
+    def decide_next_actions_batch(
+        self,
+        players: List[Tuple[Dict[str, Any], Dict[str, Any]]],
+        objective: str = "reduce_churn",
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Decides actions for many (player_profile, churn_estimate) pairs, returning
+        one result per pair in input order. Low-risk and cached players are resolved
+        locally; the rest are packed into Gemini requests of up to
+        AI_DECISION_BATCH_SIZE players each. A batch whose response cannot be
+        matched back to its players falls back to one request per player.
+        """
+        if objective != 'reduce_churn':
+            return [self.decide_next_action(profile, estimate, objective) for profile, estimate in players]
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(players)
+        if not players:
+            return results
+
+        # Partition the cohort up front: players without inputs get no decision and
+        # low-risk players get NO_ACTION, so only the remainder reaches the LLM path.
+        has_inputs = np.array([bool(player_profile) and bool(churn_estimate) for player_profile, churn_estimate in players])
+        churn_risks = np.array(
+            [churn_estimate.get("churn_risk") if churn_estimate else None for _, churn_estimate in players],
+            dtype=object,
+        )
+        low_mask = has_inputs & (churn_risks == "low")
+        for index in np.flatnonzero(low_mask).tolist():
+            results[index] = self._no_action(players[index][0].get("player_id"))
+
+        pending: List[Tuple[int, Optional[str]]] = []
+        for index in np.flatnonzero(has_inputs & ~low_mask).tolist():
+            player_profile, churn_estimate = players[index]
+            if self.ai_client is None:
+                results[index] = self._fallback_action(player_profile, churn_estimate)
+                continue
+
+            cache_key = None
+            if self._decision_cache_enabled:
+                cache_key = self._decision_cache_key(player_profile, churn_estimate)
+                cached_action = self._get_cached_decision(cache_key)
+                if cached_action is not None:
+                    cached_action["player_id"] = player_profile.get("player_id")
+                    cached_action["timing"] = "immediate"
+                    results[index] = cached_action
+                    continue
+            pending.append((index, cache_key))
+
+        batches = [pending[start:start + self._batch_size] for start in range(0, len(pending), self._batch_size)]
+        if not batches:
+            return results
+
+        def request(batch):
+            return self._request_action_batch([players[index] for index, _ in batch])
+
+        if len(batches) == 1:
+            batch_actions = [request(batches[0])]
+        else:
+            batch_actions = self._get_batch_executor().map(request, batches)
+        for batch, actions in zip(batches, batch_actions):
+            for position, (index, cache_key) in enumerate(batch):
+                player_profile, churn_estimate = players[index]
+                if actions is None:
+                    results[index] = self._decide_churn_reduction_action(player_profile, churn_estimate)
+                    continue
+                action = actions[position]
+                if cache_key is not None:
+                    self._set_cached_decision(cache_key, action)
+                action["player_id"] = player_profile.get("player_id")
+                action["timing"] = "immediate"
+                results[index] = action
+        return results
+
+    def _request_action_batch(
+        self,
+        players: List[Tuple[Dict[str, Any], Dict[str, Any]]],
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Returns one action per player from a single Gemini call, or None if the response is unusable."""
+        batch_payload = [
+            {"index": index, "player_profile": player_profile, "churn_analysis": churn_estimate}
+            for index, (player_profile, churn_estimate) in enumerate(players)
+        ]
+        prompt = CHURN_REDUCTION_BATCH_PROMPT_TEMPLATE.format(
+            player_count=len(players),
+            payload=fast_dumps_text(batch_payload),
+        )
+
+        try:
+            logger.info("Asking Gemini to decide next best actions for a batch of %d players...", len(players))
+            ai_response_text = self.ai_client.get_ai_response(prompt)
+            actions = parse_action_batch_response(ai_response_text)
+        except AI_RESPONSE_ERRORS as e:
+            logger.warning("Error processing AI response for batched next actions: %s", e)
+            return None
 
-        print(f"Warning: Objective '{objective}' not recognized. No action taken.")
-        return None
+        by_index = {action.pop("index"): action for action in actions}
+        if len(actions) != len(players) or sorted(by_index) != list(range(len(players))):
+            logger.warning("Batched AI response did not contain one action per player; deciding individually.")
+            return None
+        return [by_index[index] for index in range(len(players))]
 
     def _fallback_action(self, player_profile: Dict[str, Any], churn_estimate: Dict[str, Any]) -> Dict[str, Any]:
         """Deterministic fallback when LLM is unavailable."""
@@ -59,6 +335,13 @@ class GrowthDecisionEngine:
             "reason": "Heuristic fallback action (no LLM).",
         }
 
+    def _no_action(self, player_id: Any) -> Dict[str, Any]:
+        return {
+            "player_id": player_id,
+            "decision": "NO_ACTION",
+            "reason": "AI analysis indicates player is already engaged and has low churn risk."
+        }
+
     def _decide_churn_reduction_action(
         self,
         player_profile: Dict[str, Any],
@@ -70,38 +353,34 @@ class GrowthDecisionEngine:
         player_id = player_profile.get("player_id")
 
         if churn_risk == "low":
-            return {
-                "player_id": player_id,
-                "decision": "NO_ACTION",
-                "reason": "AI analysis indicates player is already engaged and has low churn risk."
-            }
+            return self._no_action(player_id)
 
         if self.ai_client is None:
             return self._fallback_action(player_profile, churn_estimate)
 
-        prompt = f"""
-        As a world-class AI Growth Operator for a mobile game, your goal is to reduce player churn.
-        Based on the player's profile and churn analysis, devise the best engagement action.
+        cache_key = None
+        if self._decision_cache_enabled:
+            cache_key = self._decision_cache_key(player_profile, churn_estimate)
+            cached_action = self._get_cached_decision(cache_key)
+            if cached_action is not None:
+                cached_action["player_id"] = player_id
+                cached_action["timing"] = "immediate"
+                return cached_action
 
-        Generate a personalized, concise, and engaging message for a push notification. The message should be friendly and enticing.
-
-        Provide your response as a JSON object with three keys: "decision" (string: "ACT"), "channel" (string: "push_notification"), and "content" (string: the message you generated).
-
-        Player Profile:
-        {json.dumps(player_profile, indent=2, cls=NpEncoder)}
-
-        Churn Analysis:
-        {json.dumps(churn_estimate, indent=2, cls=NpEncoder)}
-        """
+        # One encoder pass over both inputs, spliced into the prebuilt template.
+        prompt = CHURN_REDUCTION_PROMPT_TEMPLATE.format(
+            payload=fast_dumps_text({"player_profile": player_profile, "churn_analysis": churn_estimate})
+        )
 
         try:
-            print("\nAsking Gemini to decide the next best action and generate content...")
+            logger.info("Asking Gemini to decide the next best action and generate content...")
             ai_response_text = self.ai_client.get_ai_response(prompt)
-            cleaned_json_text = ai_response_text.strip().replace("```json", "").replace("```", "")
-            action = json.loads(cleaned_json_text)
+            action = parse_action_response(ai_response_text)
+            if cache_key is not None:
+                self._set_cached_decision(cache_key, action)
             action["player_id"] = player_id
             action["timing"] = "immediate"
             return action
-        except (json.JSONDecodeError, Exception) as e:
-            print(f"Error processing AI response for next action: {e}")
+        except AI_RESPONSE_ERRORS as e:
+            logger.warning("Error processing AI response for next action: %s", e)
             return self._fallback_action(player_profile, churn_estimate)
@@ -1,18 +1,23 @@
 # ingestion_service.py
 
 import json
+import logging
 import os
 import time
 from pathlib import Path
-from typing import Callable, Dict, Any, Optional, Iterable, List
+from itertools import islice
+from typing import Callable, Dict, Any, Optional, Iterable, Iterator, List
 from datetime import datetime
 
 from gcs_service import GcsService
+from json_encoder import fast_dumps
 from connectors import create_connector
 from pipeline_models import ShardManifest
 from pubsub_service import PubSubService
 from local_job_store import save_ingestion_checkpoint
 
+logger = logging.getLogger(__name__)
+
 
 class IngestionService:
     """
@@ -46,7 +51,7 @@ class IngestionService:
         self.retry_backoff_sec = float(os.getenv("INGEST_RETRY_BACKOFF_SEC", "1.5"))
         self.dlq_path = Path(os.getenv("INGEST_DLQ_FILE", ".cache/ingest_dlq.jsonl"))
         self.dlq_path.parent.mkdir(parents=True, exist_ok=True)
-        print(f"IngestionService initialized for connector={connector_type} (simulating Pub/Sub publisher).")
+        logger.info("IngestionService initialized for connector=%s (simulating Pub/Sub publisher).", connector_type)
 
     def _record_dead_letter(self, start_date: str, end_date: str, error_text: str):
         record = {
@@ -63,16 +68,16 @@ class IngestionService:
         last_error = None
         for attempt in range(1, self.retry_max_attempts + 1):
             try:
-                print(f"[Ingestion:{self.connector_type}] Attempt {attempt}/{self.retry_max_attempts} for {start_date} -> {end_date}")
+                logger.info("[Ingestion:%s] Attempt %d/%d for %s -> %s", self.connector_type, attempt, self.retry_max_attempts, start_date, end_date)
                 return self.connector.fetch_events(start_date, end_date)
             except Exception as e:
                 last_error = e
                 if attempt < self.retry_max_attempts:
                     sleep_sec = self.retry_backoff_sec * (2 ** (attempt - 1))
-                    print(f"[Ingestion:{self.connector_type}] attempt {attempt} failed: {e}. Retrying in {sleep_sec:.1f}s...")
+                    logger.warning("[Ingestion:%s] attempt %d failed: %s. Retrying in %.1fs...", self.connector_type, attempt, e, sleep_sec)
                     time.sleep(sleep_sec)
                 else:
-                    print(f"[Ingestion:{self.connector_type}] final attempt failed: {e}")
+                    logger.error("[Ingestion:%s] final attempt failed: %s", self.connector_type, e)
 
         self._record_dead_letter(start_date, end_date, str(last_error))
         raise RuntimeError(f"Ingestion failed after retries: {last_error}")
@@ -110,17 +115,23 @@ class IngestionService:
             return
 
         raw_events = self._fetch_events_with_retry(start_date, end_date)
-        for chunk in self._chunk_events(raw_events):
-            yield chunk
+        yield from self._chunk_events(raw_events)
 
-    def _chunk_events(self, raw_events):
+    def _chunk_events(self, raw_events: Iterable[Dict[str, Any]]) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Yields shards lazily so only the shard being uploaded is copied out of
+        raw_events, rather than every slice being built up front.
+        """
         if self.gcs_service.mode != "mock":
-            return [raw_events]
+            yield raw_events if isinstance(raw_events, list) else list(raw_events)
+            return
 
-        return [
-            raw_events[index:index + self.local_shard_event_count]
-            for index in range(0, len(raw_events), self.local_shard_event_count)
-        ]
+        event_iter = iter(raw_events)
+        while True:
+            chunk = list(islice(event_iter, self.local_shard_event_count))
+            if not chunk:
+                return
+            yield chunk
 
     def _save_checkpoint(
         self,
@@ -152,8 +163,8 @@ class IngestionService:
         Fetches events from the connector, writes them to raw storage, and returns
         shard metadata without publishing queue notifications.
         """
-        print(f"Fetching events from {self.connector_type} for {start_date} to {end_date}...")
-        timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
+        logger.info("Fetching events from %s for %s to %s...", self.connector_type, start_date, end_date)
+        timestamp = time.strftime('%Y%m%d_%H%M%S', time.gmtime())
         resolved_job_id = job_id or f"{self.connector_type}_{start_date}_{end_date}_{timestamp}"
         shard_manifests = []
         total_events = 0
@@ -241,7 +252,10 @@ class IngestionService:
         Fetches events from connector and publishes notifications to the simulated queue.
         """
         staged = self.fetch_and_stage_events(start_date, end_date, job_id=job_id)
-        for manifest in staged["shard_manifests"]:
+        manifests = staged["shard_manifests"]
+        notifications = []
+        attributes_list = []
+        for manifest in manifests:
             notification = {
                 "gcs_path": manifest["gcs_uri"],
                 "event_count": manifest["event_count"],
@@ -251,18 +265,22 @@ class IngestionService:
                 "shard_index": manifest["shard_index"],
                 "source_config_id": manifest["source_config_id"],
             }
-            self.message_queue_topic.append(json.dumps(notification))
-            message_id = self.pubsub_service.publish(
-                notification,
-                attributes={
+            notifications.append(notification)
+            attributes_list.append(
+                {
                     "job_id": manifest["job_id"],
                     "source": manifest["source"],
                     "shard_index": manifest["shard_index"],
                     "schema_version": manifest["schema_version"],
-                },
+                }
             )
+            self.message_queue_topic.append(fast_dumps(notification))
+
+        message_ids = self.pubsub_service.publish_many(notifications, attributes_list) if notifications else []
+        for manifest, message_id in zip(manifests, message_ids):
             self.published_message_ids.append(message_id)
             self._save_checkpoint(manifest, publish_status="published", published_message_id=message_id)
-            print(f"Published notification for {manifest['event_count']} events to the message queue.")
+        if manifests:
+            logger.info("Published notifications for %d shards to the message queue.", len(manifests))
 
         return int(staged["events_staged"])
@@ -1,18 +1,284 @@
 # json_encoder.py
 
+import base64
+import functools
 import json
+import os
+import tempfile
+from contextlib import contextmanager
 import numpy as np
 
+try:
+    import fcntl
+except ImportError:  # Not available on Windows; locked_json_file then runs unlocked.
+    fcntl = None
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; the stdlib encoder is used instead.
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # msgspec is optional; lines are then decoded one at a time.
+    msgspec = None
+
+_NDJSON_BATCH_DECODER = msgspec.json.Decoder(list) if msgspec is not None else None
+
+
+def fast_loads(data):
+    """Parses a JSON document from str or bytes, using orjson when installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def fast_dumps(obj) -> bytes:
+    """Serializes obj to UTF-8 JSON bytes, using orjson when installed."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj)
+        except TypeError:
+            # orjson rejects values the stdlib accepts (e.g. integers wider than 64 bits).
+            pass
+    return json.dumps(obj).encode("utf-8")
+
+
+def fast_dumps_line(obj) -> bytes:
+    """Serializes obj as one newline-terminated JSON-lines record."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+        except TypeError:
+            pass
+    return json.dumps(obj).encode("utf-8") + b"\n"
+
+
+def read_json_file(path: str):
+    """Reads and parses a JSON file as bytes, using orjson when installed."""
+    with open(path, "rb") as f:
+        return fast_loads(f.read())
+
+
+def _encode_json_file(obj, indent: bool) -> bytes:
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+        except TypeError:
+            pass
+    return json.dumps(obj, indent=2 if indent else None).encode("utf-8")
+
+
+def make_temp_path(path) -> str:
+    """
+    Creates an empty, uniquely named temporary file next to path and returns its
+    name, so concurrent writers of the same path never share a temp file.
+    """
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.fspath(path)) or None, suffix=".tmp")
+    os.close(fd)
+    os.chmod(temp_path, 0o644)
+    return temp_path
+
+
+def write_bytes_atomic(path: str, payload: bytes) -> None:
+    """
+    Writes payload to a unique temp file and renames it over path, so readers
+    only ever see the previous or the new complete file.
+    """
+    temp_path = make_temp_path(path)
+    try:
+        with open(temp_path, "wb") as f:
+            f.write(payload)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def write_json_file(path: str, obj, indent: bool = False) -> None:
+    """
+    Writes obj as JSON in one bytes write, using orjson when installed. The file
+    is written atomically via write_bytes_atomic, so a crash never leaves it
+    half-written.
+    """
+    write_bytes_atomic(path, _encode_json_file(obj, indent))
+
+
+@contextmanager
+def locked_json_file(path: str, default_factory=dict, indent: bool = False):
+    """
+    Read-modify-write of a JSON file under an exclusive flock on path + ".lock",
+    so concurrent workers cannot interleave and lose updates. Yields the parsed
+    document (default_factory() if the file is missing, empty or unreadable) and,
+    when the block exits without an error, writes it back atomically, so readers
+    that skip the lock never see a truncated document.
+    """
+    parent = os.path.dirname(path)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+    with open(f"{path}.lock", "a+b") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            data = read_json_file(path)
+        except (FileNotFoundError, ValueError):
+            data = default_factory()
+        yield data
+        write_bytes_atomic(path, _encode_json_file(data, indent))
+
+
+def _ndarray_to_list(obj):
+    if np.iscomplexobj(obj):
+        return [[value.real, value.imag] for value in obj.ravel().tolist()]
+    return obj.tolist()
+
+
+def _complex_to_pair(obj):
+    return [float(obj.real), float(obj.imag)]
+
+
+def _bytes_to_base64(obj):
+    return base64.b64encode(obj).decode("ascii")
+
+
+def _to_isoformat(obj):
+    return obj.isoformat()
+
+
+@functools.lru_cache(maxsize=None)
+def _default_handler(obj_type):
+    """
+    Resolves the fallback converter for a type once; later values of the same
+    type cost a single cache lookup instead of an isinstance chain.
+    """
+    if issubclass(obj_type, np.ndarray):
+        return _ndarray_to_list
+    if issubclass(obj_type, (complex, np.complexfloating)):
+        return _complex_to_pair
+    if issubclass(obj_type, np.generic):
+        return np.generic.item
+    if issubclass(obj_type, (bytes, bytearray)):
+        return _bytes_to_base64
+    if issubclass(obj_type, (set, frozenset)):
+        return list
+    if hasattr(obj_type, "isoformat"):
+        return _to_isoformat
+    return None
+
+
+def _encode_default(obj):
+    """
+    Fallback for values neither encoder handles natively: NumPy scalars and
+    arrays (complex values become [real, imag]), timestamps, bytes and sets.
+    """
+    handler = _default_handler(type(obj))
+    if handler is None:
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+    return handler(obj)
+
+
+def dumps_np(obj, *, indent: bool = False) -> bytes:
+    """
+    Serializes obj, which may contain NumPy values, to UTF-8 JSON bytes. With
+    orjson installed NumPy scalars and arrays are encoded natively. Output is
+    compact unless indent=True, which matches json.dumps(indent=2).
+    """
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(obj, default=_encode_default, option=option)
+        except TypeError:
+            # e.g. integers wider than 64 bits, which the stdlib still accepts.
+            pass
+    encoder = _NP_ENCODER_INDENTED if indent else _NP_ENCODER_COMPACT
+    return encoder.encode(obj).encode("utf-8")
+
+
+# Prompt payloads keep this many decimal places; more digits only add tokens.
+PROMPT_FLOAT_DIGITS = 4
+# Numeric arrays longer than this are summarized rather than embedded in prompts.
+PROMPT_ARRAY_MAX_ELEMENTS = 1024
+
+
+def _summarize_array(values: np.ndarray) -> dict:
+    flat = values.astype(float).ravel()
+    return {
+        "count": int(flat.size),
+        "mean": round(float(np.mean(flat)), PROMPT_FLOAT_DIGITS),
+        "std": round(float(np.std(flat)), PROMPT_FLOAT_DIGITS),
+        "p95": round(float(np.percentile(flat, 95)), PROMPT_FLOAT_DIGITS),
+    }
+
+
+def _compact_for_prompt(value):
+    """
+    Shrinks a payload for embedding in an LLM prompt: floats are rounded to
+    PROMPT_FLOAT_DIGITS places, boolean arrays (e.g. activity masks) become
+    strings of 0/1 characters (one string per row for N-D arrays), and numeric
+    arrays above PROMPT_ARRAY_MAX_ELEMENTS are replaced by a count/mean/std/p95
+    summary.
+    """
+    if isinstance(value, np.ndarray):
+        if value.dtype == np.bool_:
+            if value.ndim > 1:
+                return [_compact_for_prompt(row) for row in value]
+            return (value.astype(np.uint8) + ord("0")).tobytes().decode("ascii")
+        if value.dtype.kind in "iuf":
+            if value.size > PROMPT_ARRAY_MAX_ELEMENTS:
+                return _summarize_array(value)
+            if value.dtype.kind == "f":
+                return np.round(value, PROMPT_FLOAT_DIGITS)
+        return value
+    if isinstance(value, (float, np.floating)):
+        return round(float(value), PROMPT_FLOAT_DIGITS)
+    if isinstance(value, dict):
+        return {key: _compact_for_prompt(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_compact_for_prompt(item) for item in value]
+    return value
+
+
+def fast_dumps_text(obj, indent: bool = False) -> str:
+    """
+    dumps_np returning str, for embedding in LLM prompts. The payload is first
+    compacted by _compact_for_prompt to keep prompts short.
+    """
+    return dumps_np(_compact_for_prompt(obj), indent=indent).decode("utf-8")
+
+
+def fast_loads_lines(lines) -> list:
+    """
+    Parses a batch of JSON-lines records (bytes) into a list, skipping blank lines.
+    With msgspec installed the batch is decoded in a single pass as one JSON array.
+    """
+    records = [line for line in lines if line.strip()]
+    if not records:
+        return []
+    if _NDJSON_BATCH_DECODER is not None:
+        return _NDJSON_BATCH_DECODER.decode(b"[" + b",".join(records) + b"]")
+    return [fast_loads(line) for line in records]
+
+
 class NpEncoder(json.JSONEncoder):
     """
     Custom JSON encoder to handle NumPy data types.
-    Converts NumPy integers and floats to their Python equivalents.
+    Kept for existing json.dumps(cls=NpEncoder) callers; new code should use
+    dumps_np, which shares this fallback but avoids per-value Python dispatch.
     """
     def default(self, obj):
-        if isinstance(obj, np.integer):
-            return int(obj)
-        if isinstance(obj, np.floating):
-            return float(obj)
-        if isinstance(obj, np.ndarray):
-            return obj.tolist()
-        return super(NpEncoder, self).default(obj)
\ No newline at end of file
+        try:
+            return _encode_default(obj)
+        except TypeError:
+            return super(NpEncoder, self).default(obj)
+
+
+# Shared encoder instances for dumps_np's stdlib path, so each call skips
+# constructing and configuring a new NpEncoder. Like orjson, they emit UTF-8
+# text rather than \u escapes.
+_NP_ENCODER_INDENTED = NpEncoder(indent=2, ensure_ascii=False)
+_NP_ENCODER_COMPACT = NpEncoder(separators=(",", ":"), ensure_ascii=False)
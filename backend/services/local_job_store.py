@@ -95,11 +95,10 @@ def init_db() -> None:
 def save_import_jobs(jobs: List[Dict[str, Any]]) -> None:
     with _conn() as c:
         c.execute("DELETE FROM import_jobs")
-        for j in jobs:
-            c.execute(
-                "INSERT OR REPLACE INTO import_jobs(name, payload) VALUES (?, ?)",
-                (j.get("name"), json.dumps(j)),
-            )
+        c.executemany(
+            "INSERT OR REPLACE INTO import_jobs(name, payload) VALUES (?, ?)",
+            [(j.get("name"), json.dumps(j)) for j in jobs],
+        )
 
 
 def load_import_jobs() -> List[Dict[str, Any]]:
@@ -111,11 +110,10 @@ def load_import_jobs() -> List[Dict[str, Any]]:
 def save_prediction_jobs(jobs: List[Dict[str, Any]]) -> None:
     with _conn() as c:
         c.execute("DELETE FROM prediction_jobs")
-        for j in jobs:
-            c.execute(
-                "INSERT OR REPLACE INTO prediction_jobs(id, payload) VALUES (?, ?)",
-                (j.get("id"), json.dumps(j)),
-            )
+        c.executemany(
+            "INSERT OR REPLACE INTO prediction_jobs(id, payload) VALUES (?, ?)",
+            [(j.get("id"), json.dumps(j)) for j in jobs],
+        )
 
 
 def load_prediction_jobs() -> List[Dict[str, Any]]:
@@ -4,6 +4,9 @@ import asyncio
 from typing import List, Dict, Any
 from player_modeling_engine import PlayerModelingEngine
 
+# Gemini churn batches estimated concurrently while building cohorts.
+COHORT_ESTIMATE_CONCURRENCY = 4
+
 class PlayerCohortService:
     """
     Analyzes player data to create distinct player cohorts based on behavior.
@@ -39,23 +42,31 @@ class PlayerCohortService:
 
         cohorts = {name: [] for name in COHORT_DEFINITIONS.keys()}
 
-        # Build profiles and estimate churn risk concurrently for better performance
-        async def process_player(player_id):
-            profile = self.modeling_engine.build_player_profile(player_id)
-            if not profile:
-                return None
-            
-            churn_estimate = await self.modeling_engine.estimate_churn_risk(player_id)
-            profile["predicted_churn_risk"] = churn_estimate.get("churn_risk", "unknown") if churn_estimate else "unknown"
-            return profile
+        # Profiles come from one read of the latest-state aggregate; only players
+        # missing from it are built individually.
+        bulk_profiles = self.modeling_engine.build_player_profiles_bulk(player_ids)
+        players = []
+        for player_id in player_ids:
+            profile = bulk_profiles.get(str(player_id)) or self.modeling_engine.build_player_profile(player_id)
+            if profile:
+                players.append((player_id, profile))
+
+        # Gemini calls inside a batch are blocking, so batches run on worker threads,
+        # a few at a time. gather keeps results in player order for stable cohorts.
+        batch_size = max(1, int(getattr(self.modeling_engine, "churn_batch_size", 1)))
+        semaphore = asyncio.Semaphore(COHORT_ESTIMATE_CONCURRENCY)
 
-        tasks = [process_player(player_id) for player_id in player_ids]
-        all_profiles = await asyncio.gather(*tasks)
+        async def estimate_batch(batch):
+            async with semaphore:
+                return await asyncio.to_thread(self.modeling_engine.estimate_churn_risk_batch, batch)
+
+        batch_results = await asyncio.gather(
+            *(estimate_batch(players[start:start + batch_size]) for start in range(0, len(players), batch_size))
+        )
+        churn_estimates = [estimate for batch in batch_results for estimate in batch]
+        for (_, profile), churn_estimate in zip(players, churn_estimates):
+            profile["predicted_churn_risk"] = churn_estimate.get("churn_risk", "unknown") if churn_estimate else "unknown"
 
-        for profile in all_profiles:
-            if not profile:
-                continue
-            
             # Assign player to the first matching cohort
             for name, condition in COHORT_DEFINITIONS.items():
                 if condition(profile):
@@ -1,13 +1,69 @@
 # player_modeling_engine.py
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
-import json
+import asyncio
+import logging
+import os
+import textwrap
+import numpy as np
 import pandas as pd
-from gemini_client import GeminiClient
-from json_encoder import NpEncoder
+from gemini_client import AI_RESPONSE_ERRORS, GeminiClient, parse_json_response
+from json_encoder import fast_dumps_text
 from bigquery_service import BigQueryService
 
+logger = logging.getLogger(__name__)
+
+CHURN_RISK_PROMPT_TEMPLATE = textwrap.dedent("""
+    As a world-class mobile game analyst, analyze the following ACTIVE player profile and estimate churn risk.
+    Provide JSON with keys:
+    - churn_risk: "low" | "medium" | "high"
+    - reason: short plain explanation
+    - top_signals: array of up to 3 objects {{"signal": string, "value": number|string}}
+
+    Player Profile:
+    {profile}
+""").strip()
+
+CHURN_RISK_BATCH_PROMPT_TEMPLATE = textwrap.dedent("""
+    As a world-class mobile game analyst, analyze the following ACTIVE player profiles and estimate churn risk for each player.
+    Provide your response as a JSON array with exactly {player_count} objects, in the same order as the players. Each object must have keys:
+    - index: integer, the player's index
+    - churn_risk: "low" | "medium" | "high"
+    - reason: short plain explanation
+    - top_signals: array of up to 3 objects {{"signal": string, "value": number|string}}
+
+    Players:
+    {payload}
+""").strip()
+
+# Active players packed into one Gemini request by estimate_churn_risk_batch.
+CHURN_ESTIMATE_BATCH_SIZE = 16
+
+# Heuristic churn-risk scoring, shared by _estimate_churn_risk_heuristic and its
+# vectorized form _heuristic_risk_scores. Tiers are (threshold, score, signal),
+# strongest first: inactivity tiers apply from that many days since last seen,
+# session tiers up to that many sessions.
+INACTIVITY_RISK_TIERS = ((7, 45.0, "inactive_7d_plus"), (3, 20.0, "inactive_3d_plus"))
+LOW_SESSION_RISK_TIERS = ((2, 20.0, "very_low_sessions"), (5, 10.0, "low_sessions"))
+HIGH_VALUE_REVENUE_USD = 100.0
+HIGH_VALUE_RISK_CREDIT = 10.0
+
+# Minimum heuristic score for each churn risk level; "high" takes the strongest
+# inactivity and low-session signals together.
+RISK_SCORE_THRESHOLDS = {
+    "medium": 35.0,
+    "high": INACTIVITY_RISK_TIERS[0][1] + LOW_SESSION_RISK_TIERS[0][1],
+}
+AT_RISK_LEVELS = {"medium": ("medium", "high"), "high": ("high",)}
+
+# Active players below the weakest inactivity tier and above the weakest session
+# tier carry no heuristic risk signal; with triage enabled they are scored "low"
+# without asking Gemini.
+CHURN_TRIAGE_MAX_DAYS_SINCE_LAST_SEEN = INACTIVITY_RISK_TIERS[-1][0]
+CHURN_TRIAGE_MIN_SESSIONS = LOW_SESSION_RISK_TIERS[-1][0]
+
+
 class PlayerModelingEngine:
     """
     Analyzes player event data to build intelligence profiles, including
@@ -31,6 +87,10 @@ class PlayerModelingEngine:
         self.db_client = bigquery_service
         self.churn_inactive_days = max(1, int(churn_inactive_days))
         self.job_id = job_id
+        self.churn_batch_size = max(1, int(os.getenv("AI_CHURN_BATCH_SIZE", str(CHURN_ESTIMATE_BATCH_SIZE))))
+        self.churn_triage = os.getenv("AI_CHURN_TRIAGE", "true").lower() in ("1", "true", "yes")
+        # Player IDs are listed from the warehouse once per engine (i.e. once per run).
+        self._player_ids: Optional[List[Any]] = None
 
     def _get_player_latest_state(self, player_id: Any) -> Optional[Dict[str, Any]]:
         getter = getattr(self.db_client, "get_player_latest_state", None)
@@ -47,6 +107,9 @@ class PlayerModelingEngine:
         latest_state = self._get_player_latest_state(player_id)
         if not latest_state:
             return None
+        return self._profile_from_latest_state_row(player_id, latest_state)
+
+    def _profile_from_latest_state_row(self, player_id: Any, latest_state: Dict[str, Any]) -> Optional[Dict[str, Any]]:
 
         first_seen = latest_state.get("first_seen_at") or latest_state.get("first_seen_date")
         last_seen = latest_state.get("last_seen_at") or latest_state.get("last_seen_date")
@@ -102,7 +165,9 @@ class PlayerModelingEngine:
         
         # Parse timestamps in tolerant mode (supports both
         # '2024-01-01 12:34:56.123456' and '2024-01-01T12:34:56.123456').
-        df['event_time'] = pd.to_datetime(df['event_time'], errors='coerce', utc=False)
+        # Warehouse TIMESTAMP columns already arrive as datetime64 and are used as-is.
+        if not pd.api.types.is_datetime64_any_dtype(df['event_time']):
+            df['event_time'] = pd.to_datetime(df['event_time'], errors='coerce', utc=False)
 
         # Drop invalid timestamps to avoid downstream format exceptions.
         before = len(df)
@@ -132,9 +197,35 @@ class PlayerModelingEngine:
 
         player_events = self._get_and_preprocess_player_data(player_id)
 
+        if player_events is None or player_events.empty:
+            return None
+        return self._profile_from_events(player_id, player_events)
+
+    def build_player_intelligence(self, player_id: Any) -> Optional[Dict[str, Any]]:
+        """
+        Builds a player's profile and engagement patterns from a single fetch of
+        their events, for callers that need both.
+
+        Args:
+            player_id: The unique identifier for the player.
+
+        Returns:
+            A dictionary with "profile" and "event_counts" (event type -> count),
+            or None if the player has no events.
+        """
+        player_events = self._get_and_preprocess_player_data(player_id)
         if player_events is None or player_events.empty:
             return None
 
+        profile = self._build_profile_from_latest_state(player_id) or self._profile_from_events(player_id, player_events)
+        event_counts = self._event_type_counts(player_events)
+        return {
+            "profile": profile,
+            "event_counts": {str(event_type): int(count) for event_type, count in event_counts.items()},
+        }
+
+    def _profile_from_events(self, player_id: Any, player_events: pd.DataFrame) -> Dict[str, Any]:
+        """Summarizes a player's preprocessed events into a profile."""
         # Sort events by time to correctly calculate sessions and identify first/last seen
         player_events = player_events.sort_values(by='event_time')
 
@@ -144,9 +235,11 @@ class PlayerModelingEngine:
         # Calculate sessions based on inactivity.
         # A new session starts with the first event, or if the time gap between
         # consecutive events is greater than 15 minutes.
-        time_diffs = player_events['event_time'].diff()
-        is_new_session = time_diffs > pd.Timedelta(minutes=15)
-        # The total number of sessions is 1 (for the very first event) + the number of times a new session was started.        
+        event_times = player_events['event_time']
+        if event_times.dt.tz is not None:
+            event_times = event_times.dt.tz_convert(None)
+        is_new_session = np.diff(event_times.to_numpy(dtype="datetime64[ns]")) > np.timedelta64(15, "m")
+        # The total number of sessions is 1 (for the very first event) + the number of times a new session was started.
         total_sessions = int(1 + is_new_session.sum()) # Ensure total_sessions is a standard Python int
         
         # Calculate total revenue from 'item_purchased' events
@@ -184,8 +277,143 @@ class PlayerModelingEngine:
         }
         return profile
 
+    def _match_latest_states(self, player_ids: List[Any]) -> Optional[Tuple[List[Dict[str, Any]], List[Any]]]:
+        """
+        Fetches the player_latest_state aggregate in one call and pairs its rows
+        with the requested player IDs. Returns None when no aggregate is available.
+        """
+        getter = getattr(self.db_client, "get_player_latest_states", None)
+        if not callable(getter):
+            return None
+        try:
+            latest_states = getter(job_id=self.job_id)
+        except Exception:
+            return None
+        if not latest_states:
+            return None
+
+        requested = {str(player_id): player_id for player_id in player_ids}
+        rows: List[Dict[str, Any]] = []
+        row_player_ids: List[Any] = []
+        seen_keys = set()
+        for latest_state in latest_states:
+            for column in ("player_id", "canonical_user_id"):
+                value = latest_state.get(column)
+                key = str(value) if value is not None else None
+                if key in requested and key not in seen_keys:
+                    seen_keys.add(key)
+                    rows.append(latest_state)
+                    row_player_ids.append(requested[key])
+                    break
+        return rows, row_player_ids
+
+    def build_player_profiles_bulk(self, player_ids: List[Any]) -> Dict[str, Dict[str, Any]]:
+        """
+        Builds profiles for many players from a single read of the latest-state
+        aggregate, keyed by str(player_id). Players missing from the aggregate are
+        left out; callers fall back to build_player_profile for those.
+        """
+        matched = self._match_latest_states(player_ids)
+        if matched is None:
+            return {}
+        profiles: Dict[str, Dict[str, Any]] = {}
+        for player_id, latest_state in zip(matched[1], matched[0]):
+            profile = self._profile_from_latest_state_row(player_id, latest_state)
+            if profile:
+                profiles[str(player_id)] = profile
+        return profiles
+
+    def _heuristic_risk_scores(self, states: pd.DataFrame) -> np.ndarray:
+        """
+        Vectorized form of the scoring in _estimate_churn_risk_heuristic over a
+        frame of latest-state rows. Churned players score -inf since they are
+        reported as already_churned rather than at risk.
+        """
+        def _first_numeric(*columns: str) -> np.ndarray:
+            values = pd.Series(np.nan, index=states.index)
+            for column in columns:
+                if column in states.columns:
+                    values = values.fillna(pd.to_numeric(states[column], errors="coerce"))
+            return values.fillna(0).to_numpy(dtype=float)
+
+        days = _first_numeric("days_since_last_seen")
+        for column in ("last_seen_at", "last_seen_date"):
+            if "days_since_last_seen" not in states.columns and column in states.columns:
+                last_seen = pd.to_datetime(states[column], errors="coerce", utc=True)
+                days = (pd.Timestamp.now(tz="UTC") - last_seen).dt.days.fillna(0).to_numpy(dtype=float)
+                break
+        sessions = _first_numeric("total_sessions", "sessions_30d")
+        revenue = _first_numeric("total_revenue", "lifetime_revenue_usd")
+
+        scores = (
+            np.select([days >= min_days for min_days, _, _ in INACTIVITY_RISK_TIERS],
+                      [score for _, score, _ in INACTIVITY_RISK_TIERS], 0.0)
+            + np.select([sessions <= max_sessions for max_sessions, _, _ in LOW_SESSION_RISK_TIERS],
+                        [score for _, score, _ in LOW_SESSION_RISK_TIERS], 0.0)
+            - np.where(revenue >= HIGH_VALUE_REVENUE_USD, HIGH_VALUE_RISK_CREDIT, 0.0)
+        )
+        return np.where(days >= self.churn_inactive_days, -np.inf, scores)
+
+    async def get_at_risk_players(
+        self,
+        player_ids: List[Any],
+        limit: int,
+        min_risk: str = "medium",
+    ) -> Optional[List[Tuple[Any, Dict[str, Any], Dict[str, Any]]]]:
+        """
+        Finds up to `limit` players among player_ids whose churn risk is at least
+        min_risk, returning (player_id, profile, churn_estimate) tuples.
+
+        Active players are ranked with one vectorized heuristic pass over the
+        player_latest_state aggregate and estimated highest-scoring first, in
+        slices of churn_batch_size through estimate_churn_risk_batch on a worker
+        thread, stopping once `limit` players qualify. The heuristic only orders
+        them: every active player stays a candidate, since Gemini may rate a
+        low-scoring player at risk. Churned players are skipped, as they are
+        always reported already_churned. Returns None when no aggregate is
+        available and callers must scan players individually.
+        """
+        matched = self._match_latest_states(player_ids)
+        if matched is None:
+            return None
+        rows, row_player_ids = matched
+        if not rows:
+            return []
+
+        scores = self._heuristic_risk_scores(pd.DataFrame(rows))
+        qualifying_levels = AT_RISK_LEVELS.get(min_risk, AT_RISK_LEVELS["medium"])
+        candidates = np.flatnonzero(np.isfinite(scores))
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+
+        at_risk: List[Tuple[Any, Dict[str, Any], Dict[str, Any]]] = []
+        for start in range(0, len(candidates), self.churn_batch_size):
+            if len(at_risk) >= limit:
+                break
+            players = []
+            for position in candidates[start:start + self.churn_batch_size]:
+                player_id = row_player_ids[position]
+                player_profile = self._profile_from_latest_state_row(player_id, rows[position])
+                if player_profile:
+                    players.append((player_id, player_profile))
+            churn_estimates = await asyncio.to_thread(self.estimate_churn_risk_batch, players)
+            for (player_id, player_profile), churn_estimate in zip(players, churn_estimates):
+                if churn_estimate and churn_estimate.get("churn_risk") in qualifying_levels:
+                    at_risk.append((player_id, player_profile, churn_estimate))
+        return at_risk[:limit]
+
+    def _is_clear_low_churn_risk(self, player_profile: Dict[str, Any]) -> bool:
+        """
+        True for active profiles with no inactivity or low-session signal, which
+        the heuristic always scores "low"; only the rest need a Gemini estimate.
+        """
+        if not self.churn_triage or player_profile.get("churn_state") == "churned":
+            return False
+        days_since_last_seen = float(player_profile.get("days_since_last_seen", 0) or 0)
+        total_sessions = float(player_profile.get("total_sessions", 0) or 0)
+        return days_since_last_seen < CHURN_TRIAGE_MAX_DAYS_SINCE_LAST_SEEN and total_sessions > CHURN_TRIAGE_MIN_SESSIONS
+
     def _estimate_churn_risk_heuristic(self, player_id: Any, player_profile: Dict[str, Any]) -> Dict[str, Any]:
-        """Deterministic fallback when LLM is unavailable."""
+        """Deterministic fallback when LLM is unavailable, and the estimate for clear-cut low-risk players."""
         days_since_last_seen = float(player_profile.get("days_since_last_seen", 0) or 0)
         total_sessions = float(player_profile.get("total_sessions", 0) or 0)
         total_revenue = float(player_profile.get("total_revenue", 0.0) or 0.0)
@@ -205,27 +433,25 @@ class PlayerModelingEngine:
 
         score = 0.0
         signals = []
-        if days_since_last_seen >= 7:
-            score += 45
-            signals.append({"signal": "inactive_7d_plus", "value": days_since_last_seen})
-        elif days_since_last_seen >= 3:
-            score += 20
-            signals.append({"signal": "inactive_3d_plus", "value": days_since_last_seen})
-
-        if total_sessions <= 2:
-            score += 20
-            signals.append({"signal": "very_low_sessions", "value": total_sessions})
-        elif total_sessions <= 5:
-            score += 10
-            signals.append({"signal": "low_sessions", "value": total_sessions})
-
-        if total_revenue >= 100:
-            score -= 10
+        for min_days, tier_score, signal in INACTIVITY_RISK_TIERS:
+            if days_since_last_seen >= min_days:
+                score += tier_score
+                signals.append({"signal": signal, "value": days_since_last_seen})
+                break
+
+        for max_sessions, tier_score, signal in LOW_SESSION_RISK_TIERS:
+            if total_sessions <= max_sessions:
+                score += tier_score
+                signals.append({"signal": signal, "value": total_sessions})
+                break
+
+        if total_revenue >= HIGH_VALUE_REVENUE_USD:
+            score -= HIGH_VALUE_RISK_CREDIT
             signals.append({"signal": "high_value_user", "value": total_revenue})
 
-        if score >= 70:
+        if score >= RISK_SCORE_THRESHOLDS["high"]:
             churn_risk = "high"
-        elif score >= 35:
+        elif score >= RISK_SCORE_THRESHOLDS["medium"]:
             churn_risk = "medium"
         else:
             churn_risk = "low"
@@ -258,29 +484,24 @@ class PlayerModelingEngine:
 
         if not player_profile:
             return None
+        return self._estimate_churn_risk_for_profile(player_id, player_profile)
 
+    def _estimate_churn_risk_for_profile(self, player_id: Any, player_profile: Dict[str, Any]) -> Dict[str, Any]:
+        """Blocking body of estimate_churn_risk for an already-built profile."""
         if player_profile.get("churn_state") == "churned":
             return self._estimate_churn_risk_heuristic(player_id, player_profile)
 
-        if self.ai_client is None:
+        if self.ai_client is None or self._is_clear_low_churn_risk(player_profile):
             return self._estimate_churn_risk_heuristic(player_id, player_profile)
 
-        prompt = f"""
-        As a world-class mobile game analyst, analyze the following ACTIVE player profile and estimate churn risk.
-        Provide JSON with keys:
-        - churn_risk: "low" | "medium" | "high"
-        - reason: short plain explanation
-        - top_signals: array of up to 3 objects {{"signal": string, "value": number|string}}
-
-        Player Profile:
-        {json.dumps(player_profile, indent=2, cls=NpEncoder)}
-        """
+        prompt = CHURN_RISK_PROMPT_TEMPLATE.format(profile=fast_dumps_text(player_profile))
 
         try:
-            print("\nAsking Gemini to estimate churn risk...")
+            logger.info("Asking Gemini to estimate churn risk...")
             ai_response_text = self.ai_client.get_ai_response(prompt)
-            cleaned_json_text = ai_response_text.strip().replace("```json", "").replace("```", "")
-            ai_analysis = json.loads(cleaned_json_text)
+            ai_analysis = parse_json_response(ai_response_text)
+            if not isinstance(ai_analysis, dict):
+                raise ValueError("AI churn analysis is not a JSON object.")
             return {
                 "player_id": player_id,
                 "churn_state": "active",
@@ -288,10 +509,78 @@ class PlayerModelingEngine:
                 "reason": ai_analysis.get("reason", "AI analysis failed."),
                 "top_signals": ai_analysis.get("top_signals", []),
             }
-        except (json.JSONDecodeError, Exception) as e:
-            print(f"Error processing AI response for churn risk: {e}")
+        except AI_RESPONSE_ERRORS as e:
+            logger.warning("Error processing AI response for churn risk: %s", e)
             return self._estimate_churn_risk_heuristic(player_id, player_profile)
 
+    def estimate_churn_risk_batch(
+        self,
+        players: List[Tuple[Any, Optional[Dict[str, Any]]]],
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Estimates churn risk for many (player_id, player_profile) pairs, returning
+        one result per pair in input order. Churned players, clear-cut low-risk
+        players and runs without an AI client use the heuristic; other active
+        players are packed into Gemini requests of up to AI_CHURN_BATCH_SIZE
+        players. A batch whose response cannot be matched back to its players
+        falls back to one request per player. Gemini calls block, so async
+        callers should run this via asyncio.to_thread.
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(players)
+        pending: List[int] = []
+        for index, (player_id, player_profile) in enumerate(players):
+            if not player_profile:
+                continue
+            if (
+                self.ai_client is None
+                or player_profile.get("churn_state") == "churned"
+                or self._is_clear_low_churn_risk(player_profile)
+            ):
+                results[index] = self._estimate_churn_risk_heuristic(player_id, player_profile)
+            else:
+                pending.append(index)
+
+        for start in range(0, len(pending), self.churn_batch_size):
+            batch = pending[start:start + self.churn_batch_size]
+            estimates = self._request_churn_risk_batch([players[index][1] for index in batch])
+            for position, index in enumerate(batch):
+                player_id, player_profile = players[index]
+                if estimates is None:
+                    results[index] = self._estimate_churn_risk_for_profile(player_id, player_profile)
+                    continue
+                ai_analysis = estimates[position]
+                results[index] = {
+                    "player_id": player_id,
+                    "churn_state": "active",
+                    "churn_risk": ai_analysis.get("churn_risk", "unknown"),
+                    "reason": ai_analysis.get("reason", "AI analysis failed."),
+                    "top_signals": ai_analysis.get("top_signals", []),
+                }
+        return results
+
+    def _request_churn_risk_batch(self, profiles: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
+        """Returns one churn analysis per profile from a single Gemini call, or None if the response is unusable."""
+        payload = [{"index": index, "player_profile": profile} for index, profile in enumerate(profiles)]
+        prompt = CHURN_RISK_BATCH_PROMPT_TEMPLATE.format(player_count=len(profiles), payload=fast_dumps_text(payload))
+        try:
+            logger.info("Asking Gemini to estimate churn risk for a batch of %d players", len(profiles))
+            analyses = parse_json_response(self.ai_client.get_ai_response(prompt))
+            if not isinstance(analyses, list):
+                raise ValueError("AI batch churn analysis is not a JSON array.")
+        except AI_RESPONSE_ERRORS as e:
+            logger.warning("Error processing AI response for batched churn risk: %s", e)
+            return None
+
+        by_index = {
+            analysis.get("index"): analysis
+            for analysis in analyses
+            if isinstance(analysis, dict) and isinstance(analysis.get("index"), int)
+        }
+        if len(analyses) != len(profiles) or sorted(by_index) != list(range(len(profiles))):
+            logger.warning("Batched AI churn analysis did not contain one result per player; estimating individually.")
+            return None
+        return [by_index[index] for index in range(len(profiles))]
+
     def get_player_engagement_patterns(self, player_id: Any) -> Optional[pd.Series]:
         """
         Analyzes a player's engagement patterns, like top events.
@@ -306,18 +595,26 @@ class PlayerModelingEngine:
         if player_events is None or player_events.empty:
             return None
         
+        return self._event_type_counts(player_events)
+
+    @staticmethod
+    def _event_type_counts(player_events: pd.DataFrame) -> pd.Series:
         # Return a count of each event type for this player
         return player_events['event_type'].value_counts()
 
     def get_all_player_ids(self) -> List[Any]:
         """
-        Retrieves a list of all unique player IDs from the data source.
+        Retrieves a list of all unique player IDs from the data source. The
+        warehouse is queried on the first call only.
 
         Returns:
             A list of unique player IDs.
         """
-        print("Fetching all unique player IDs from the data warehouse...")
-        try:
-            return self.db_client.get_all_player_ids(job_id=self.job_id)
-        except TypeError:
-            return self.db_client.get_all_player_ids()
+        if self._player_ids is None:
+            print("Fetching all unique player IDs from the data warehouse...")
+            try:
+                player_ids = self.db_client.get_all_player_ids(job_id=self.job_id)
+            except TypeError:
+                player_ids = self.db_client.get_all_player_ids()
+            self._player_ids = list(player_ids or [])
+        return list(self._player_ids)
@@ -0,0 +1,113 @@
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from growth_decision_engine import GrowthDecisionEngine
+
+
+class BatchAI:
+    """Answers batched prompts with one action per player, or with a fixed response."""
+
+    def __init__(self, batch_response=None):
+        self.batch_response = batch_response
+        self.prompts = []
+
+    def get_ai_response(self, prompt: str):
+        self.prompts.append(prompt)
+        if 'JSON array' not in prompt:
+            return '{"decision":"ACT","channel":"push_notification","content":"single"}'
+        if self.batch_response is not None:
+            return self.batch_response
+        players = json.loads(prompt.split('Players:', 1)[1])
+        return json.dumps([
+            {
+                'index': player['index'],
+                'decision': 'ACT',
+                'channel': 'push_notification',
+                'content': 'batch ' + player['player_profile']['player_id'],
+            }
+            for player in players
+        ])
+
+
+def _player(player_id, churn_risk, sessions=1):
+    return {'player_id': player_id, 'total_sessions': sessions}, {'churn_risk': churn_risk}
+
+
+def test_decide_next_actions_batch_parses_one_action_per_player():
+    ai = BatchAI()
+    engine = GrowthDecisionEngine(ai)
+
+    actions = engine.decide_next_actions_batch([_player('a', 'high', 1), _player('b', 'medium', 2)])
+
+    assert len(ai.prompts) == 1
+    assert [action['content'] for action in actions] == ['batch a', 'batch b']
+    assert [action['player_id'] for action in actions] == ['a', 'b']
+    assert all(action['timing'] == 'immediate' and 'index' not in action for action in actions)
+
+
+def test_decide_next_actions_batch_falls_back_on_index_mismatch():
+    ai = BatchAI('[{"index":0,"decision":"ACT","channel":"push_notification","content":"only a"}]')
+    engine = GrowthDecisionEngine(ai)
+
+    actions = engine.decide_next_actions_batch([_player('a', 'high', 1), _player('b', 'medium', 2)])
+
+    assert len(ai.prompts) == 3
+    assert [action['content'] for action in actions] == ['single', 'single']
+    assert [action['player_id'] for action in actions] == ['a', 'b']
+
+
+def test_decide_next_actions_batch_reuses_cached_actions():
+    ai = BatchAI()
+    engine = GrowthDecisionEngine(ai)
+    engine.decide_next_actions_batch([_player('a', 'high')])
+
+    # Same behavioural context under another player id: served from the cache.
+    actions = engine.decide_next_actions_batch([_player('z', 'high')])
+
+    assert len(ai.prompts) == 1
+    assert actions[0]['content'] == 'batch a'
+    assert actions[0]['player_id'] == 'z'
+
+
+def test_decide_next_actions_batch_partitions_low_risk_and_missing_inputs():
+    ai = BatchAI()
+    engine = GrowthDecisionEngine(ai)
+
+    actions = engine.decide_next_actions_batch([
+        _player('low', 'low'),
+        ({'player_id': 'none'}, None),
+        _player('high', 'high'),
+    ])
+
+    assert actions[0]['decision'] == 'NO_ACTION'
+    assert actions[0]['player_id'] == 'low'
+    assert actions[1] is None
+    assert actions[2]['content'] == 'batch high'
+    assert '"low"' not in ai.prompts[0]
+
+
+def test_decide_next_actions_batch_bounds_concurrency_across_callers(monkeypatch):
+    monkeypatch.setenv('AI_DECISION_BATCH_SIZE', '1')
+    monkeypatch.setenv('AI_DECISION_BATCH_CONCURRENCY', '2')
+    in_flight = []
+    peak = []
+    lock = threading.Lock()
+
+    class SlowAI(BatchAI):
+        def get_ai_response(self, prompt: str):
+            with lock:
+                in_flight.append(prompt)
+                peak.append(len(in_flight))
+            threading.Event().wait(0.01)
+            with lock:
+                in_flight.remove(prompt)
+            return super().get_ai_response(prompt)
+
+    engine = GrowthDecisionEngine(SlowAI())
+    cohorts = [[_player(f'{worker}-{index}', 'high', index) for index in range(4)] for worker in range(4)]
+    with ThreadPoolExecutor(max_workers=4) as workers:
+        results = list(workers.map(engine.decide_next_actions_batch, cohorts))
+
+    assert max(peak) <= 2
+    assert [action['player_id'] for action in results[3]] == ['3-0', '3-1', '3-2', '3-3']
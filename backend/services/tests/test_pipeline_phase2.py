@@ -42,6 +42,20 @@ def test_ingestion_service_writes_local_jsonl_shards(monkeypatch, tmp_path):
     assert "[" not in local_files[0].read_text()
 
 
+def test_gcs_mock_round_trips_gzip_shards(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("DATA_BACKEND_MODE", "mock")
+    monkeypatch.setenv("GCS_MOCK_GZIP_SHARDS", "true")
+
+    gcs_service = GcsService(bucket_name="test-bucket")
+    events = [{"player_id": f"player-{idx}", "event_name": "session_start"} for idx in range(3)]
+    gcs_service.upload_raw_events(events, "raw_events/job-1/shard-0.jsonl")
+
+    shard_path = pathlib.Path(".cache/raw/test-bucket/raw_events/job-1/shard-0.jsonl")
+    assert shard_path.read_bytes()[:2] == b"\x1f\x8b"
+    assert gcs_service.download_raw_events("raw_events/job-1/shard-0.jsonl") == events
+
+
 def test_processing_pipeline_consumes_local_shards_incrementally(monkeypatch, tmp_path):
     class DummyConnector:
         def fetch_events(self, start_date, end_date):
@@ -1,3 +1,5 @@
+import pandas as pd
+
 from bigquery_service import BigQueryService
 from player_modeling_engine import PlayerModelingEngine
 
@@ -193,3 +195,107 @@ def test_player_modeling_engine_prefers_aggregate_latest_state(monkeypatch, tmp_
     assert profile["player_id"] == "player-1"
     assert profile["email"] == "player1@example.com"
     assert profile["total_events"] == 1
+
+
+def test_bigquery_service_appends_staging_batches_without_rewriting_cache(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("DATA_BACKEND_MODE", "mock")
+    monkeypatch.setenv("KAIRYX_LOCAL_DB_PATH", str(tmp_path / "phase5_append.db"))
+
+    service = BigQueryService()
+    for batch_index in range(3):
+        service.write_events_staging(
+            [
+                {
+                    "source": "dummy",
+                    "player_id": f"player-{batch_index}",
+                    "source_event_id": f"evt-{batch_index}",
+                    "event_type": "session_start",
+                    "event_time": "2026-03-05T00:00:00",
+                    "event_properties": {"campaign": "spring_sale"},
+                    "user_properties": {},
+                }
+            ],
+            job_id="job-phase5-append",
+        )
+
+    part_files = sorted((tmp_path / ".cache" / "bigquery_table.parts").glob("part-*.parquet"))
+    assert len(part_files) == 3
+    assert not (tmp_path / ".cache" / "bigquery_table.parquet").exists()
+
+    reloaded = BigQueryService()
+    assert len(reloaded._table) == 3
+    assert list(reloaded._table["player_id"]) == ["player-0", "player-1", "player-2"]
+    assert isinstance(reloaded._table["job_id"].dtype, pd.CategoricalDtype)
+    assert len(reloaded.get_events_for_player("player-1", job_id="job-phase5-append")) == 1
+    assert reloaded.get_local_cache_stats()["tables"]["events_staging"]["size_bytes"] > 0
+
+
+def test_bigquery_service_identity_index_follows_appends(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("DATA_BACKEND_MODE", "mock")
+    monkeypatch.setenv("KAIRYX_LOCAL_DB_PATH", str(tmp_path / "phase5_index.db"))
+
+    service = BigQueryService()
+
+    def write_event(source_event_id):
+        service.write_events_staging(
+            [
+                {
+                    "source": "dummy",
+                    "player_id": "player-1",
+                    "source_event_id": source_event_id,
+                    "event_type": "session_start",
+                    "event_time": "2026-03-05T00:00:00",
+                    "event_properties": {},
+                    "user_properties": {},
+                }
+            ],
+            job_id="job-phase5-index",
+        )
+
+    write_event("evt-1")
+    assert len(service.get_events_for_player("player-1")) == 1
+    assert ("_table", "player_id") in service._identity_index_cache
+
+    write_event("evt-2")
+    assert ("_table", "player_id") not in service._identity_index_cache
+    assert len(service.get_events_for_player("player-1")) == 2
+    # Only row positions are cached, never the table itself.
+    assert all(isinstance(positions, dict) for positions in service._identity_index_cache.values())
+
+
+def test_bigquery_service_appended_tables_match_reloaded_dtypes(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("DATA_BACKEND_MODE", "mock")
+    monkeypatch.setenv("KAIRYX_LOCAL_DB_PATH", str(tmp_path / "phase5_dtypes.db"))
+
+    service = BigQueryService()
+    event_types = ["session_start", "item_purchased"] * 3 + ["session_start"]
+    for batch_index, event_type in enumerate(event_types):
+        service.write_events_staging(
+            [
+                {
+                    "source": "dummy",
+                    "player_id": "player-2" if batch_index == len(event_types) - 1 else "player-1",
+                    "source_event_id": f"evt-{batch_index}",
+                    "event_type": event_type,
+                    "event_time": "2026-03-05T00:00:00",
+                    "event_properties": {},
+                    "user_properties": {},
+                }
+            ],
+            job_id="job-phase5-dtypes",
+        )
+
+    appended_dtypes = service._table.dtypes.to_dict()
+    assert isinstance(appended_dtypes["event_type"], pd.CategoricalDtype)
+    reloaded_dtypes = BigQueryService()._table.dtypes.to_dict()
+    assert {column: str(dtype) for column, dtype in appended_dtypes.items()} == {
+        column: str(dtype) for column, dtype in reloaded_dtypes.items()
+    }
+
+    frame = service.get_events_for_player("player-2")
+    assert frame["event_type"].groupby(frame["event_type"]).size().to_dict() == {"session_start": 1}
+    frame.loc[frame.index[0], "event_type"] = "brand_new_type"
+    assert frame["event_type"].tolist() == ["brand_new_type"]
@@ -1,4 +1,5 @@
 import asyncio
+import threading
 import pandas as pd
 
 from player_modeling_engine import PlayerModelingEngine
@@ -33,3 +34,117 @@ def test_estimate_churn_risk_accepts_iso_and_space_timestamps():
     assert out is not None
     assert out['churn_state'] == 'active'
     assert out['churn_risk'] == 'medium'
+
+
+class LatestStateBQ:
+    def get_player_latest_states(self, job_id=None):
+        def row(player_id, days, sessions):
+            return {
+                'player_id': player_id,
+                'first_seen_at': '2026-01-01T00:00:00',
+                'last_seen_at': '2026-01-01T00:00:00',
+                'days_since_last_seen': days,
+                'total_sessions': sessions,
+                'total_revenue': 0.0,
+            }
+
+        return [row('idle', 10, 1), row('new', 2, 1), row('gone', 30, 1)]
+
+
+class PlayerRatingAI:
+    """Rates 'new' high and every other player medium."""
+
+    def get_ai_response(self, prompt: str):
+        risk = 'high' if '"new"' in prompt else 'medium'
+        return '{"churn_risk":"%s","reason":"test","top_signals":[]}' % risk
+
+
+def _at_risk_ids(engine, min_risk):
+    at_risk = asyncio.run(engine.get_at_risk_players(['idle', 'new', 'gone'], limit=5, min_risk=min_risk))
+    return [player_id for player_id, _, _ in at_risk]
+
+
+def test_get_at_risk_players_heuristic_reaches_both_levels():
+    engine = PlayerModelingEngine(gemini_client=None, bigquery_service=LatestStateBQ(), churn_inactive_days=14)
+    # 'idle' carries the strongest inactivity and session signals, so the heuristic rates it high.
+    assert _at_risk_ids(engine, 'medium') == ['idle']
+    assert _at_risk_ids(engine, 'high') == ['idle']
+
+
+def test_get_at_risk_players_only_orders_candidates_by_heuristic():
+    engine = PlayerModelingEngine(gemini_client=PlayerRatingAI(), bigquery_service=LatestStateBQ(), churn_inactive_days=14)
+    # 'new' scores low on the heuristic but is still estimated, and Gemini rates it high.
+    assert _at_risk_ids(engine, 'medium') == ['idle', 'new']
+    assert _at_risk_ids(engine, 'high') == ['new']
+
+
+class BatchAI:
+    """Answers batched prompts with the given array and single-player prompts with 'medium'."""
+
+    def __init__(self, batch_response):
+        self.batch_response = batch_response
+        self.prompts = []
+
+    def get_ai_response(self, prompt: str):
+        self.prompts.append(prompt)
+        if 'JSON array' in prompt:
+            return self.batch_response
+        return '{"churn_risk":"medium","reason":"single","top_signals":[]}'
+
+
+def _batch_players():
+    def profile(days, sessions):
+        return {'churn_state': 'active', 'days_since_last_seen': days, 'total_sessions': sessions, 'total_revenue': 0.0}
+
+    return [
+        ('a', profile(4, 1)),
+        ('steady', profile(0, 20)),
+        ('b', profile(5, 2)),
+        ('c', {'churn_state': 'churned', 'days_since_last_seen': 30, 'total_sessions': 1, 'total_revenue': 0.0}),
+        ('missing', None),
+    ]
+
+
+def test_estimate_churn_risk_batch_parses_one_result_per_player():
+    ai = BatchAI(
+        '[{"index":1,"churn_risk":"high","reason":"b","top_signals":[]},'
+        '{"index":0,"churn_risk":"low","reason":"a","top_signals":[]}]'
+    )
+    engine = PlayerModelingEngine(gemini_client=ai, bigquery_service=DummyBQ())
+
+    results = engine.estimate_churn_risk_batch(_batch_players())
+
+    assert len(ai.prompts) == 1
+    assert [result and result['churn_risk'] for result in results] == ['low', 'low', 'high', 'already_churned', None]
+    assert [result['reason'] for result in (results[0], results[2])] == ['a', 'b']
+    assert results[1]['reason'] != 'single'
+
+
+def test_estimate_churn_risk_batch_falls_back_on_index_mismatch():
+    ai = BatchAI('[{"index":0,"churn_risk":"high","reason":"a","top_signals":[]}]')
+    engine = PlayerModelingEngine(gemini_client=ai, bigquery_service=DummyBQ())
+
+    results = engine.estimate_churn_risk_batch(_batch_players())
+
+    assert len(ai.prompts) == 3
+    assert [results[0]['reason'], results[2]['reason']] == ['single', 'single']
+    assert [results[0]['player_id'], results[2]['player_id']] == ['a', 'b']
+
+
+def test_get_at_risk_players_estimates_in_batches_off_the_loop_until_limit(monkeypatch):
+    monkeypatch.setenv('AI_CHURN_BATCH_SIZE', '1')
+    threads = []
+
+    class ThreadRecordingAI(BatchAI):
+        def get_ai_response(self, prompt: str):
+            threads.append(threading.current_thread())
+            return super().get_ai_response(prompt)
+
+    ai = ThreadRecordingAI('[{"index":0,"churn_risk":"high","reason":"batch","top_signals":[]}]')
+    engine = PlayerModelingEngine(gemini_client=ai, bigquery_service=LatestStateBQ(), churn_inactive_days=14)
+
+    at_risk = asyncio.run(engine.get_at_risk_players(['idle', 'new', 'gone'], limit=1, min_risk='high'))
+
+    assert [player_id for player_id, _, _ in at_risk] == ['idle']
+    assert len(ai.prompts) == 1
+    assert threading.main_thread() not in threads
@@ -9,6 +9,7 @@ from app.core import db as db_module
 from app.core.logging import PredictionPollingAccessFilter
 from app.main import create_app
 from bigquery_service import clear_shared_bigquery_service_cache, get_shared_bigquery_service
+from json_encoder import locked_json_file, read_json_file, write_json_file
 import local_job_store
 from local_job_store import list_identity_links, resolve_or_create_canonical_user_id
 
@@ -134,3 +135,29 @@ def test_prediction_polling_access_filter_logs_only_first_request_per_job():
     assert log_filter.filter(build_record("/api/v1/predictions/pred_abc123/results?page=1&page_size=500")) is False
     assert log_filter.filter(build_record("/api/v1/predictions/pred_other/results?page=1&page_size=500")) is True
     assert log_filter.filter(build_record("/api/v1/health")) is True
+
+
+def test_locked_json_file_replaces_document_atomically(tmp_path):
+    path = tmp_path / "usage.json"
+    write_json_file(str(path), {"requests": 1})
+    original_inode = path.stat().st_ino
+
+    with locked_json_file(str(path)) as usage:
+        usage["requests"] += 1
+        # Lock-free readers still see the previous complete document mid-update.
+        assert read_json_file(str(path)) == {"requests": 1}
+
+    assert read_json_file(str(path)) == {"requests": 2}
+    assert path.stat().st_ino != original_inode
+    assert sorted(child.name for child in tmp_path.iterdir()) == ["usage.json", "usage.json.lock"]
+
+
+def test_write_json_file_removes_temp_file_on_failure(tmp_path):
+    path = tmp_path / "state.json"
+    try:
+        write_json_file(str(path), {"bad": object()})
+    except TypeError:
+        pass
+    else:
+        raise AssertionError("expected TypeError")
+    assert list(tmp_path.iterdir()) == []
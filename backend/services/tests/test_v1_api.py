@@ -414,6 +414,90 @@ def test_prediction_streams_partial_rows_and_can_be_stopped(client, monkeypatch)
     assert final_payload["items"][0]["suggested_action"] == "message for player-1"
 
 
+def test_prediction_failure_keeps_rows_computed_before_it(client, monkeypatch):
+    # Rows are buffered between progress flushes; a long interval keeps player-2 buffered.
+    monkeypatch.setenv("JOB_PROGRESS_FLUSH_INTERVAL_SEC", "60")
+    connector_resp = client.post(
+        "/api/v1/connectors",
+        json={
+            "name": "Adjust Source",
+            "type": "adjust",
+            "config": {"api_token": "adjust-token"},
+        },
+    )
+    assert connector_resp.status_code == 201
+
+    create_import = client.post(
+        "/api/v1/imports",
+        json={
+            "source_name": "Adjust Source",
+            "start_date": "20260301",
+            "end_date": "20260302",
+        },
+    )
+    assert create_import.status_code == 201
+    import_job = create_import.json()
+
+    class FakePlayerModelingEngine:
+        def __init__(self, gemini_client, bigquery_service, churn_inactive_days=14, job_id=None):
+            self.job_id = job_id
+
+        def get_all_player_ids(self):
+            return ["player-1", "player-2", "player-3"]
+
+        def build_player_profile(self, player_id):
+            return {
+                "player_id": player_id,
+                "email": f"{player_id}@example.com",
+                "total_sessions": 4,
+                "total_events": 12,
+                "total_revenue": 9.99,
+                "days_since_last_seen": 1,
+                "churn_state": "active",
+            }
+
+        async def estimate_churn_risk(self, player_id, player_profile=None):
+            if player_id == "player-3":
+                raise RuntimeError("scoring backend unavailable")
+            return {
+                "player_id": player_id,
+                "churn_state": "active",
+                "churn_risk": "medium",
+                "reason": f"scored {player_id}",
+                "top_signals": [],
+            }
+
+    class FakeDecisionEngine:
+        def __init__(self, gemini_client):
+            self.gemini_client = gemini_client
+
+        def decide_next_action(self, player_profile, churn_estimate, objective):
+            return {"content": f"message for {player_profile['player_id']}"}
+
+    monkeypatch.setattr("app.application.predictions.PlayerModelingEngine", FakePlayerModelingEngine)
+    monkeypatch.setattr("app.application.predictions.GrowthDecisionEngine", FakeDecisionEngine)
+
+    create_prediction = client.post(
+        "/api/v1/predictions",
+        json={
+            "import_job_id": import_job["id"],
+            "prediction_mode": "local",
+        },
+    )
+    assert create_prediction.status_code == 201
+    prediction_job = create_prediction.json()
+
+    with TestClient(client.app, raise_server_exceptions=False) as runner_client:
+        runner_client.post(prediction_job["links"]["self"] + "/run")
+
+    failed_state = client.get(prediction_job["links"]["self"])
+    assert failed_state.json()["status"] == "failed"
+
+    results = client.get(prediction_job["links"]["results"])
+    assert results.status_code == 200
+    assert sorted(item["user_id"] for item in results.json()["items"]) == ["player-1", "player-2"]
+
+
 def test_prediction_results_are_returned_newest_first(client, monkeypatch):
     connector_resp = client.post(
         "/api/v1/connectors",